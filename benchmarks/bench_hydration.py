@@ -0,0 +1,118 @@
+"""
+Скорость восстановления кандидатов из хранилища: get_all() с доверенным чтением
+(Candidate.trusted, без валидации) против строгого режима (полная валидация Pydantic).
+
+С --threads N каждый замер выполняют N потоков одновременно, каждый со своим соединением;
+скорость считается по всем прочитанным строкам. --no-gc выключает циклический сборщик мусора
+на время замеров (только в процессе бенчмарка): показывает, какую долю времени восстановления
+большого списка занимают проходы сборщика по заведомо живым объектам.
+
+Запуск:
+    python benchmarks/bench_hydration.py --rows 100000
+    python benchmarks/bench_hydration.py --rows 50000 --threads 4 --no-gc
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from hrm.core.model import Candidate, CandidateSex, CandidateStatus
+from hrm.core.persistence import JsonCandidateRepository, SqliteCandidateRepository
+
+
+def _make_candidates(rows: int) -> List[Candidate]:
+    return [
+        Candidate(
+            first_name=f"Имя{index}",
+            last_name=f"Фамилия{index}",
+            phone="+79001234567",
+            birth_date=datetime.datetime(1990, 1, 1) + datetime.timedelta(days=index % 10000),
+            sex=CandidateSex.MALE if index % 2 else CandidateSex.FEMALE,
+            status=CandidateStatus.REGISTERED,
+            comments="Кандидат для бенчмарка",
+        )
+        for index in range(rows)
+    ]
+
+
+def _best_rate(rows: int, repeat: int, action: Callable[[], object]) -> float:
+    """Лучшая из repeat попыток, строк в секунду"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - started)
+    return rows / best if best > 0 else float("inf")
+
+
+def _in_threads(threads: int, make_action: Callable[[], Callable[[], object]]) -> Callable[[], None]:
+    """
+    Действие, выполняющее threads копий одновременно. Подготовка копий (make_action)
+    выполняется заранее и в замер не входит.
+    """
+    if threads == 1:
+        return make_action()
+    actions = [make_action() for _ in range(threads)]
+
+    def run() -> None:
+        barrier = threading.Barrier(threads)
+
+        def worker(action):
+            barrier.wait()
+            action()
+
+        workers = [threading.Thread(target=worker, args=(action,)) for action in actions]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Количество кандидатов")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество замеров каждого режима")
+    parser.add_argument("--threads", type=int, default=1, help="Количество одновременно читающих потоков")
+    parser.add_argument("--no-gc", action="store_true", help="Выключить сборщик мусора на время замеров")
+    args = parser.parse_args()
+    threads = max(args.threads, 1)
+
+    candidates = _make_candidates(args.rows)
+    if args.no_gc:
+        gc.disable()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "candidates.db"
+        with SqliteCandidateRepository(db_file) as repository:
+            repository.insert_many(candidates)
+        for strict in (False, True):
+            with contextlib.ExitStack() as stack:
+                def open_reader():
+                    return stack.enter_context(SqliteCandidateRepository(db_file, strict_reads=strict)).get_all
+
+                rate = _best_rate(args.rows * threads, args.repeat, _in_threads(threads, open_reader))
+            results.append(("SQLite get_all", strict, rate))
+
+        json_file = Path(tmp) / "candidates.json"
+        JsonCandidateRepository(json_file).insert_many(candidates)
+        for strict in (False, True):
+            def json_loader():
+                return lambda: JsonCandidateRepository(json_file, strict_reads=strict)
+
+            rate = _best_rate(args.rows * threads, args.repeat, _in_threads(threads, json_loader))
+            results.append(("JSON загрузка", strict, rate))
+
+    print(f"{'Операция':<18}{'режим':>12}{'строк/с':>14}")
+    for name, strict, rate in results:
+        print(f"{name:<18}{'строгий' if strict else 'доверенный':>12}{rate:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Время построения статистики воронки подбора (hrm stats) на большой базе:
+весь период и окно по времени изменения.
+
+Запуск:
+    python benchmarks/bench_statistics.py --rows 1000000
+"""
+import argparse
+import datetime
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from hrm.core.persistence import SqliteCandidateRepository
+
+
+def _fill(db_file: Path, rows: int) -> None:
+    """Заполняет БД напрямую через SQL: вставка через репозиторий заняла бы больше времени, чем сам замер"""
+    SqliteCandidateRepository(db_file).close()
+    started = datetime.datetime(2024, 1, 1)
+    with sqlite3.connect(db_file) as conn:
+        conn.executemany(
+            """
+            INSERT INTO candidates (first_name, last_name, birth_date, sex, status, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    "Иван",
+                    f"Фамилия{index}",
+                    (datetime.datetime(1960, 1, 1) + datetime.timedelta(days=index % 18000)).isoformat(),
+                    index % 3 or None,
+                    index % 4 + 1,
+                    (started + datetime.timedelta(minutes=index)).isoformat(),
+                )
+                for index in range(rows)
+            ),
+        )
+
+
+def _best_time(repeat: int, action) -> float:
+    """Лучшая из repeat попыток, секунд"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Количество кандидатов")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество замеров каждого сценария")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "candidates.db"
+        _fill(db_file, args.rows)
+        since = datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=args.rows // 2)
+        with SqliteCandidateRepository(db_file) as repository:
+            results = [
+                ("весь период", _best_time(args.repeat, repository.statistics)),
+                ("вторая половина", _best_time(args.repeat, lambda: repository.statistics(since=since))),
+            ]
+
+    print(f"{'Статистика':<18}{'строк':>10}{'секунд':>10}")
+    for name, seconds in results:
+        print(f"{name:<18}{args.rows:>10}{seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
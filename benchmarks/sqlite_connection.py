@@ -0,0 +1,96 @@
+"""
+Сравнение пропускной способности SqliteCandidateRepository:
+соединение на каждый вызов (как было раньше) против долгоживущего соединения с PRAGMA.
+
+Запуск:
+    python benchmarks/sqlite_connection.py --operations 2000
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from hrm.core.model import Candidate, CandidateStatus
+from hrm.core.persistence import SqliteCandidateRepository
+
+
+def _make_candidate(index: int) -> Candidate:
+    return Candidate(
+        first_name=f"Имя{index}",
+        last_name=f"Фамилия{index}",
+        phone="+79001234567",
+        status=CandidateStatus.REGISTERED,
+        comments="Кандидат для бенчмарка",
+    )
+
+
+def _legacy_insert(db_file: Path, candidate: Candidate) -> int:
+    """Вставка в стиле прежней реализации: новое соединение и commit на каждый вызов"""
+    with sqlite3.connect(db_file) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO candidates (first_name, last_name, phone, birth_date, sex, status, comments, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            candidate.first_name,
+            candidate.last_name,
+            candidate.phone,
+            None,
+            None,
+            candidate.status.value,
+            candidate.comments,
+            candidate.updated_at.isoformat(),
+        ))
+        conn.commit()
+        return cursor.lastrowid
+
+
+def _legacy_get_by_id(db_file: Path, candidate_id: int) -> tuple:
+    """Чтение в стиле прежней реализации: новое соединение на каждый вызов"""
+    with sqlite3.connect(db_file) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at
+            FROM candidates
+            WHERE id = ?
+        """, (candidate_id,))
+        return cursor.fetchone()
+
+
+def _measure(operations: int, action: Callable[[int], object]) -> float:
+    """Возвращает количество операций в секунду"""
+    started = time.perf_counter()
+    for index in range(operations):
+        action(index)
+    elapsed = time.perf_counter() - started
+    return operations / elapsed if elapsed > 0 else float("inf")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000, help="Количество операций каждого вида")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = Path(tmp) / "legacy.db"
+        # Схема создается репозиторием, после чего соединение сразу закрывается
+        SqliteCandidateRepository(legacy_db, pragmas={name: None for name in SqliteCandidateRepository.DEFAULT_PRAGMAS}).close()
+        legacy_insert = _measure(args.operations, lambda i: _legacy_insert(legacy_db, _make_candidate(i)))
+        legacy_get = _measure(args.operations, lambda i: _legacy_get_by_id(legacy_db, i + 1))
+
+        with SqliteCandidateRepository(Path(tmp) / "tuned.db") as repository:
+            tuned_insert = _measure(args.operations, lambda i: repository.insert_or_update(_make_candidate(i)))
+            tuned_get = _measure(args.operations, lambda i: repository.get_by_id(i + 1))
+
+    print(f"{'Операция':<20}{'было, оп/с':>15}{'стало, оп/с':>15}{'ускорение':>12}")
+    for name, before, after in (
+        ("insert_or_update", legacy_insert, tuned_insert),
+        ("get_by_id", legacy_get, tuned_get),
+    ):
+        print(f"{name:<20}{before:>15.0f}{after:>15.0f}{after / before:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Время холодного запуска CLI: импорт модулей по данным `python -X importtime` и общее время процесса.
+
+Для каждой команды проверяется бюджет:
+- суммарное время импорта (медиана по запускам) не превышает --budget-ms;
+- команда не загружает модули, которые ей не нужны (например, `hrm --help` - Pydantic и sqlite3,
+  `hrm count --json` - Rich).
+При превышении бюджета скрипт завершается с кодом 1, поэтому его можно запускать в CI.
+
+Запуск:
+    python benchmarks/startup.py --runs 10 --budget-ms 400
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Set, Tuple
+
+
+SCENARIOS: Dict[str, Tuple[Sequence[str], Set[str]]] = {
+    "hrm --help": (["--help"], {"pydantic", "sqlite3", "asyncio", "hrm.core.persistence"}),
+    "hrm serve --help": (["serve", "--help"], {"pydantic", "sqlite3", "uvicorn", "fastapi"}),
+    "hrm count": (["count"], {"asyncio", "rich.table", "rich.prompt"}),
+    "hrm count --json": (["count", "--json"], {"asyncio", "rich", "rich.console"}),
+    "hrm list --json": (["list", "--json", "--limit", "10"], {"asyncio", "rich", "rich.console"}),
+}
+"""
+Команда -> (аргументы, модули, которые она не должна импортировать).
+"""
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _run(args: Sequence[str], env: Dict[str, str]) -> Tuple[float, float, Set[str]]:
+    """
+    Запускает CLI в новом процессе.
+    :return: Время процесса (с), суммарное время импорта (с) и множество импортированных модулей.
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "hrm", *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    import_total = 0
+    modules = set()
+    for line in completed.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        modules.add(module)
+        # Верхний уровень дерева импорта (отступ в один пробел) содержит время вложенных импортов
+        if len(indent) == 1:
+            import_total += cumulative
+    return elapsed, import_total / 1_000_000, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Количество запусков каждой команды")
+    parser.add_argument("--budget-ms", type=float, default=400, help="Бюджет суммарного времени импорта, мс")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "HRM_DB_PATH": str(Path(tmp) / "candidates.db")}
+        print(f"{'Команда':<22}{'процесс, мс':>14}{'импорт, мс':>14}{'модулей':>10}")
+        for name, (command, forbidden) in SCENARIOS.items():
+            # Первый запуск прогревает кэш байт-кода и создает базу данных
+            _run(command, env)
+            runs = [_run(command, env) for _ in range(args.runs)]
+            elapsed = statistics.median(run[0] for run in runs) * 1000
+            imports = statistics.median(run[1] for run in runs) * 1000
+            modules = runs[-1][2]
+            print(f"{name:<22}{elapsed:>14.1f}{imports:>14.1f}{len(modules):>10}")
+
+            if imports > args.budget_ms:
+                failures.append(f"{name}: импорт {imports:.1f} мс > {args.budget_ms:.0f} мс")
+            unexpected = sorted(forbidden & modules)
+            if unexpected:
+                failures.append(f"{name}: лишние импорты {', '.join(unexpected)}")
+
+    if failures:
+        print("\nБюджет запуска превышен:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
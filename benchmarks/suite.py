@@ -0,0 +1,240 @@
+"""
+Набор бенчмарков репозиториев: сценарии register/get/edit/accept/list/count/delete через UseCases
+для каждого хранилища и размера базы. Для каждой операции выводятся операции в секунду и задержки
+p50/p99, для каждого прогона - пиковый RSS процесса. Каждая пара хранилище/размер выполняется
+в отдельном процессе, чтобы пиковый RSS не зависел от предыдущих прогонов.
+
+Результаты сохраняются в JSON (--out) и сравниваются с сохраненным базовым прогоном (--baseline):
+если операций в секунду стало меньше или пиковый RSS стал больше, чем на --threshold, выводится
+список регрессий и скрипт завершается с кодом 1.
+
+Запуск:
+    python benchmarks/suite.py --sizes 1000,100000,1000000 --out results.json
+    python benchmarks/suite.py --backends sqlite --sizes 1000 --baseline results.json --threshold 0.2
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from hrm.core.application import UseCases
+from hrm.core.model import Candidate, CandidateSex, CandidateStatus
+from hrm.core.persistence import CandidateRepository, JsonCandidateRepository, SqliteCandidateRepository
+
+
+BACKENDS: Dict[str, Callable[[Path], CandidateRepository]] = {
+    "sqlite": lambda directory: SqliteCandidateRepository(directory / "candidates.db"),
+    "json": lambda directory: JsonCandidateRepository(directory / "candidates.json"),
+    "json-journal": lambda directory: JsonCandidateRepository(directory / "candidates.json", journal=True),
+}
+"""
+Хранилища по имени. Новое хранилище подключается к набору добавлением фабрики репозитория в каталоге.
+"""
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+LIST_PAGE_SIZE = 100
+
+
+def _make_candidate(index: int) -> Candidate:
+    return Candidate(
+        first_name=f"Имя{index}",
+        last_name=f"Фамилия{index}",
+        phone="+79001234567",
+        birth_date=datetime.datetime(1970, 1, 1) + datetime.timedelta(days=index % 15000),
+        sex=CandidateSex.MALE if index % 2 else CandidateSex.FEMALE,
+        status=CandidateStatus.REGISTERED,
+        comments="Кандидат для бенчмарка",
+    )
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Пиковый RSS текущего процесса, МБ; None, если платформа его не сообщает"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает ru_maxrss в килобайтах, macOS - в байтах
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _measure(operation: str, arguments: list, action: Callable) -> dict:
+    """Выполняет action для каждого аргумента и возвращает пропускную способность и задержки"""
+    latencies = []
+    for argument in arguments:
+        started = time.perf_counter()
+        action(argument)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    total = sum(latencies)
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+    return {
+        "operation": operation,
+        "operations": len(latencies),
+        "ops_per_sec": len(latencies) / total if total > 0 else float("inf"),
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def run_workload(backend: str, size: int, operations: int, seed: int = 0) -> List[dict]:
+    """
+    Заполняет пустое хранилище size кандидатами и замеряет каждую операцию.
+    Заполнение в замер не входит.
+    :param backend: Имя хранилища из BACKENDS.
+    :param size: Количество кандидатов в хранилище.
+    :param operations: Количество вызовов каждой операции.
+    :param seed: Начальное значение генератора случайных ID.
+    :return: Результаты по операциям.
+    """
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = BACKENDS[backend](Path(tmp))
+        try:
+            repository.insert_many(_make_candidate(index) for index in range(size))
+            use_cases = UseCases(repository)
+            existing_ids = rng.sample(range(1, size + 1), min(operations, size))
+
+            results = []
+            registered_ids = []
+            results.append(_measure(
+                "register",
+                [_make_candidate(size + index) for index in range(operations)],
+                lambda candidate: registered_ids.append(use_cases.register_candidate(candidate)),
+            ))
+            results.append(_measure("get", existing_ids, use_cases.get_candidate))
+            results.append(_measure(
+                "edit",
+                [candidate.model_copy(update={"comments": "Изменен в бенчмарке"})
+                 for candidate in map(use_cases.get_candidate, existing_ids)],
+                use_cases.edit_candidate,
+            ))
+            results.append(_measure("accept", existing_ids, use_cases.accept_candidate))
+            results.append(_measure(
+                "list",
+                [rng.randrange(size) for _ in range(operations)],
+                lambda after_id: use_cases.find_candidates(limit=LIST_PAGE_SIZE, after_id=after_id),
+            ))
+            results.append(_measure("count", range(operations), lambda _: use_cases.get_total_candidates()))
+            results.append(_measure("delete", registered_ids, use_cases.delete_candidate))
+        finally:
+            repository.close()
+    return results
+
+
+def _run_isolated(backend: str, size: int, operations: int) -> List[dict]:
+    """Выполняет прогон в отдельном процессе и дополняет результаты пиковым RSS этого процесса"""
+    completed = subprocess.run(
+        [sys.executable, __file__, "--worker", backend, str(size), "--operations", str(operations)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Сравнивает прогон с базовым.
+    :param results: Результаты текущего прогона.
+    :param baseline: Результаты базового прогона.
+    :param threshold: Допустимая доля ухудшения, например 0.2 - на 20%.
+    :return: Описания регрессий; пустой список, если их нет.
+    """
+    def key(row: dict) -> tuple:
+        return row["backend"], row["size"], row["operation"]
+
+    previous = {key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in results["results"]:
+        base = previous.get(key(row))
+        if base is None:
+            continue
+        name = "{}/{}/{}".format(*key(row))
+        if row["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {row['ops_per_sec']:.0f} оп/с против {base['ops_per_sec']:.0f} в базовом прогоне"
+            )
+        if row["peak_rss_mb"] and base["peak_rss_mb"] and row["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append(
+                f"{name}: пиковый RSS {row['peak_rss_mb']:.1f} МБ против {base['peak_rss_mb']:.1f} МБ в базовом прогоне"
+            )
+    return regressions
+
+
+def _print_results(results: dict) -> None:
+    print(f"{'Хранилище':<14}{'размер':>10}{'операция':>10}{'оп/с':>12}{'p50, мс':>10}{'p99, мс':>10}{'RSS, МБ':>10}")
+    for row in results["results"]:
+        rss = f"{row['peak_rss_mb']:.1f}" if row["peak_rss_mb"] else "-"
+        print(
+            f"{row['backend']:<14}{row['size']:>10}{row['operation']:>10}{row['ops_per_sec']:>12.0f}"
+            f"{row['p50_ms']:>10.3f}{row['p99_ms']:>10.3f}{rss:>10}"
+        )
+
+
+def _parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",") if size]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Хранилища через запятую")
+    parser.add_argument("--sizes", type=_parse_sizes, default=DEFAULT_SIZES, help="Размеры базы через запятую")
+    parser.add_argument("--operations", type=int, default=200, help="Количество вызовов каждой операции")
+    parser.add_argument("--out", type=Path, help="Файл для сохранения результатов в JSON")
+    parser.add_argument("--baseline", type=Path, help="Результаты базового прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимая доля ухудшения (0.2 - 20%%)")
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        backend, size = args.worker[0], int(args.worker[1])
+        rows = run_workload(backend, size, args.operations)
+        peak_rss = _peak_rss_mb()
+        print(json.dumps([{"backend": backend, "size": size, **row, "peak_rss_mb": peak_rss} for row in rows]))
+        return
+
+    backends = [backend for backend in args.backends.split(",") if backend]
+    unknown = [backend for backend in backends if backend not in BACKENDS]
+    if unknown:
+        parser.error(f"неизвестные хранилища: {', '.join(unknown)}; доступны: {', '.join(BACKENDS)}")
+
+    results = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "operations": args.operations,
+        "results": [
+            row
+            for backend in backends
+            for size in args.sizes
+            for row in _run_isolated(backend, size, args.operations)
+        ],
+    }
+    _print_results(results)
+    if args.out:
+        args.out.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print(f"\nРегрессии относительно {args.baseline} (порог {args.threshold:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nРегрессий относительно {args.baseline} нет (порог {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 """Точка входа для запуска через python -m hrm"""
-from hrm.cli import main
+from hrm.main import main
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,61 @@
+"""Условные запросы HTTP: ETag, If-None-Match, If-Match"""
+import datetime
+import hashlib
+from typing import Optional
+
+
+class PreconditionFailedError(Exception):
+    """
+    Кандидат изменился с момента, когда клиент получил его ETag (If-Match не совпал).
+    """
+
+
+def candidate_etag(candidate_id: int, updated_at: datetime.datetime) -> str:
+    """
+    Строгий ETag кандидата. updated_at меняется при каждом изменении кандидата в UseCases,
+    поэтому пара (ID, updated_at) однозначно определяет версию представления.
+    """
+    return f'"{candidate_id}-{updated_at.isoformat()}"'
+
+
+def collection_etag(
+    total: int,
+    max_id: Optional[int],
+    max_updated_at: Optional[datetime.datetime],
+    query: str = "",
+) -> str:
+    """
+    Строгий ETag списка кандидатов.
+    Строится по признакам изменения всей таблицы (количество, максимальный ID, максимальное updated_at)
+    и параметрам запроса - любое изменение данных делает недействительными все закэшированные страницы.
+    """
+    revision = f"{total}:{max_id}:{max_updated_at.isoformat() if max_updated_at else ''}:{query}"
+    return f'"{hashlib.blake2b(revision.encode(), digest_size=12).hexdigest()}"'
+
+
+def _opaque(tag: str) -> str:
+    """Отбрасывает признак слабого ETag (W/)"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def none_match(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверяет If-None-Match (слабое сравнение, RFC 9110).
+    :return: True, если запрос нужно выполнить; False - если у клиента актуальная копия (ответ 304).
+    """
+    if if_none_match is None:
+        return True
+    if if_none_match.strip() == "*":
+        return False
+    return all(_opaque(tag) != etag for tag in if_none_match.split(","))
+
+
+def match(if_match: Optional[str], etag: str) -> bool:
+    """
+    Проверяет If-Match (строгое сравнение, RFC 9110).
+    :return: True, если изменение можно выполнить; False - ответ 412.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return True
+    return any(tag.strip() == etag for tag in if_match.split(","))
@@ -0,0 +1,81 @@
+"""HTTP API - Composition Root долгоживущего сервиса"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import FastAPI, Request, status as http_status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from hrm.api.routes import router
+from hrm.core.application import AsyncUseCases
+from hrm.core.async_persistence import AsyncCandidateRepository, AsyncSqliteCandidateRepository
+from hrm.core.metrics import Metrics, backend_name, instrument
+
+
+def create_app(
+    repository_factory: Optional[Callable[[], AsyncCandidateRepository]] = None,
+    metrics: bool = True,
+) -> FastAPI:
+    """
+    Создает приложение FastAPI.
+    Репозиторий открывается при запуске и закрывается при остановке приложения, поэтому
+    каждый процесс-воркер uvicorn держит собственные долгоживущие соединения с базой данных.
+    Обработчики асинхронные: запросы к SQLite выполняются потоком-писателем и пулом читателей
+    репозитория и не блокируют цикл событий.
+    :param repository_factory: Фабрика репозитория. По умолчанию - AsyncSqliteCandidateRepository
+                               (путь к базе данных берется из HRM_DB_PATH).
+    :param metrics: Собирать метрики UseCases и репозитория и отдавать их по GET /metrics
+                    в формате Prometheus. Метрики у каждого процесса-воркера свои.
+    :return: Приложение FastAPI.
+    """
+    factory = repository_factory or AsyncSqliteCandidateRepository
+    registry = Metrics() if metrics else None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        repository = factory()
+        if registry is None:
+            app.state.use_cases = AsyncUseCases(repository)
+        else:
+            backend = backend_name(repository)
+            app.state.use_cases = instrument(
+                AsyncUseCases(instrument(repository, registry, "repository", backend)),
+                registry,
+                "use_cases",
+                backend,
+            )
+        try:
+            yield
+        finally:
+            await repository.close()
+
+    app = FastAPI(
+        title="HR Management System API",
+        description="API для управления кандидатами в HR системе",
+        lifespan=lifespan,
+    )
+    app.include_router(router)
+
+    if registry is not None:
+        @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+        async def metrics_endpoint() -> PlainTextResponse:
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    @app.exception_handler(RequestValidationError)
+    async def validation_error_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+        message = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        )
+        return JSONResponse(status_code=http_status.HTTP_400_BAD_REQUEST, content={"detail": message})
+
+    @app.exception_handler(Exception)
+    async def internal_error_handler(request: Request, exc: Exception) -> JSONResponse:
+        return JSONResponse(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": "Внутренняя ошибка сервера"},
+        )
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,290 @@
+"""Маршруты HTTP API для работы с кандидатами"""
+import datetime
+from typing import Callable, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status as http_status
+
+from hrm.api.etag import PreconditionFailedError, candidate_etag, collection_etag, match, none_match
+from hrm.api.schemas import BatchRegistrationResult, CandidateCount, CandidateIds, CandidateInput, CandidatePage
+from hrm.core.application import AsyncUseCases, UseCases
+from hrm.core.model import (
+    Candidate,
+    CandidateStatistics,
+    CandidateStatus,
+    ConcurrentModificationError,
+    StatusChangeResult,
+)
+
+
+MAX_PAGE_SIZE = 1000
+
+router = APIRouter(prefix="/candidates", tags=["Кандидаты"])
+
+
+def get_use_cases(request: Request) -> AsyncUseCases:
+    """Возвращает AsyncUseCases текущего процесса (создаются при запуске приложения)"""
+    return request.app.state.use_cases
+
+
+def _not_modified(etag: str) -> Response:
+    """Ответ 304: тело не передается и не строится"""
+    return Response(status_code=http_status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def _collection_etag(use_cases: AsyncUseCases, request: Request) -> str:
+    total, max_id, max_updated_at = await use_cases.get_candidates_revision()
+    return collection_etag(total, max_id, max_updated_at, f"{request.url.path}?{request.url.query}")
+
+
+async def _change_candidate(
+    use_cases: AsyncUseCases,
+    candidate_id: int,
+    if_match: Optional[str],
+    operation: Callable[[UseCases], Optional[Candidate]],
+    response: Response,
+) -> Optional[Candidate]:
+    """
+    Выполняет изменение кандидата с проверкой If-Match в одной транзакции:
+    между сравнением ETag и записью кандидата никто не может его изменить.
+    Новый ETag кандидата возвращается в заголовке ответа.
+    """
+    def run(transaction: UseCases) -> Optional[Candidate]:
+        if if_match is not None:
+            revision = transaction.get_candidate_revision(candidate_id)
+            if not match(if_match, candidate_etag(candidate_id, revision)):
+                raise PreconditionFailedError(f"Кандидат с ID {candidate_id} был изменен")
+        return operation(transaction)
+
+    try:
+        candidate = await use_cases.run_in_transaction(run)
+    except PreconditionFailedError as e:
+        raise HTTPException(status_code=http_status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+    except ConcurrentModificationError as e:
+        raise HTTPException(status_code=http_status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail=str(e))
+    if candidate is not None:
+        response.headers["ETag"] = candidate_etag(candidate.id, candidate.updated_at)
+    return candidate
+
+
+@router.get("", response_model=CandidatePage, summary="Список кандидатов")
+async def list_candidates(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Максимальное количество кандидатов на странице"),
+    after_id: Optional[int] = Query(None, description="Выводить кандидатов с ID больше указанного"),
+    status: Optional[CandidateStatus] = Query(None, description="Только кандидаты с указанным статусом"),
+    last_name: Optional[str] = Query(None, description="Начало фамилии"),
+    order_by: str = Query("id", description="Сортировка: id, last_name, updated_at (префикс '-' - по убыванию)"),
+    if_none_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> CandidatePage:
+    """
+    Возвращает страницу кандидатов.
+    При сортировке по ID следующая страница запрашивается по next_after_id (keyset-пагинация).
+    Если данные не менялись с момента получения ETag (If-None-Match), возвращается 304.
+    """
+    etag = await _collection_etag(use_cases, request)
+    if not none_match(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    try:
+        items = await use_cases.find_candidates(
+            status=status,
+            last_name_prefix=last_name,
+            order_by=order_by,
+            limit=limit,
+            after_id=after_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+    next_after_id = items[-1].id if len(items) == limit and order_by == "id" else None
+    return CandidatePage(items=items, next_after_id=next_after_id)
+
+
+@router.get("/count", response_model=CandidateCount, summary="Количество кандидатов")
+async def count_candidates(
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> CandidateCount:
+    """Возвращает общее количество кандидатов и разбивку по статусам"""
+    etag = await _collection_etag(use_cases, request)
+    if not none_match(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    by_status = await use_cases.get_total_candidates_by_status()
+    return CandidateCount(
+        total=sum(by_status.values()),
+        by_status={candidate_status.name: total for candidate_status, total in by_status.items()},
+    )
+
+
+@router.get("/stats", response_model=CandidateStatistics, summary="Статистика воронки подбора")
+async def candidate_statistics(
+    request: Request,
+    response: Response,
+    since: Optional[datetime.datetime] = Query(None, description="Кандидаты, измененные начиная с момента"),
+    until: Optional[datetime.datetime] = Query(None, description="Кандидаты, измененные раньше момента"),
+    if_none_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> CandidateStatistics:
+    """
+    Количество кандидатов по статусам, полу и возрастным группам, принятые и отклоненные по неделям.
+    Считается в базе данных одним сгруппированным запросом.
+    """
+    total, max_id, max_updated_at = await use_cases.get_candidates_revision()
+    # Возраст зависит от текущей даты, поэтому она входит в ETag
+    query = f"{request.url.path}?{request.url.query}&as_of={datetime.date.today().isoformat()}"
+    etag = collection_etag(total, max_id, max_updated_at, query)
+    if not none_match(if_none_match, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    try:
+        return await use_cases.get_statistics(since=since, until=until)
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post(
+    "",
+    response_model=Candidate,
+    status_code=http_status.HTTP_201_CREATED,
+    summary="Зарегистрировать кандидата",
+)
+async def register_candidate(body: CandidateInput, use_cases: AsyncUseCases = Depends(get_use_cases)) -> Candidate:
+    """Регистрирует нового кандидата со статусом REGISTERED"""
+    candidate = body.to_candidate()
+    return await use_cases.run_in_transaction(
+        lambda transaction: transaction.get_candidate(transaction.register_candidate(candidate))
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=BatchRegistrationResult,
+    status_code=http_status.HTTP_201_CREATED,
+    summary="Зарегистрировать пачку кандидатов",
+)
+async def register_candidates(
+    body: List[CandidateInput],
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> BatchRegistrationResult:
+    """Регистрирует пачку кандидатов одной транзакцией"""
+    registered = await use_cases.register_candidates([item.to_candidate() for item in body])
+    return BatchRegistrationResult(registered=registered)
+
+
+@router.post("/batch/accept", response_model=StatusChangeResult, summary="Принять нескольких кандидатов")
+async def accept_candidates(body: CandidateIds, use_cases: AsyncUseCases = Depends(get_use_cases)) -> StatusChangeResult:
+    """Меняет статус кандидатов на APPROVED одной транзакцией"""
+    return await use_cases.accept_candidates(body.ids)
+
+
+@router.post("/batch/reject", response_model=StatusChangeResult, summary="Отклонить нескольких кандидатов")
+async def reject_candidates(body: CandidateIds, use_cases: AsyncUseCases = Depends(get_use_cases)) -> StatusChangeResult:
+    """Меняет статус кандидатов на REJECTED одной транзакцией"""
+    return await use_cases.reject_candidates(body.ids)
+
+
+@router.get("/{candidate_id}", response_model=Candidate, summary="Получить кандидата")
+async def get_candidate(
+    candidate_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> Candidate:
+    """
+    Возвращает кандидата по ID.
+    Если у клиента актуальная копия (If-None-Match), возвращается 304: для проверки читается только updated_at.
+    """
+    try:
+        if if_none_match is not None:
+            etag = candidate_etag(candidate_id, await use_cases.get_candidate_revision(candidate_id))
+            if not none_match(if_none_match, etag):
+                return _not_modified(etag)
+        candidate = await use_cases.get_candidate(candidate_id)
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail=str(e))
+    response.headers["ETag"] = candidate_etag(candidate.id, candidate.updated_at)
+    return candidate
+
+
+@router.put("/{candidate_id}", response_model=Candidate, summary="Изменить кандидата")
+async def edit_candidate(
+    candidate_id: int,
+    body: CandidateInput,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> Candidate:
+    """
+    Заменяет данные кандидата; статус кандидата не меняется.
+    С заголовком If-Match изменение выполняется, только если кандидат не менялся (иначе 412).
+    """
+    candidate = body.to_candidate(candidate_id)
+    return await _change_candidate(
+        use_cases, candidate_id, if_match, lambda transaction: transaction.edit_candidate(candidate), response
+    )
+
+
+@router.delete(
+    "/{candidate_id}",
+    status_code=http_status.HTTP_204_NO_CONTENT,
+    response_class=Response,
+    summary="Удалить кандидата",
+)
+async def delete_candidate(
+    candidate_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> None:
+    """Удаляет кандидата по ID (с учетом If-Match)"""
+    await _change_candidate(
+        use_cases, candidate_id, if_match, lambda transaction: transaction.delete_candidate(candidate_id), response
+    )
+
+
+@router.post(
+    "/{candidate_id}/accept",
+    status_code=http_status.HTTP_204_NO_CONTENT,
+    response_class=Response,
+    summary="Принять кандидата",
+)
+async def accept_candidate(
+    candidate_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> None:
+    """
+    Принимает кандидата в качестве нового сотрудника.
+    Меняет статус кандидата на APPROVED.
+    """
+    await _change_candidate(
+        use_cases, candidate_id, if_match, lambda transaction: transaction.accept_candidate(candidate_id), response
+    )
+
+
+@router.post(
+    "/{candidate_id}/reject",
+    status_code=http_status.HTTP_204_NO_CONTENT,
+    response_class=Response,
+    summary="Отклонить кандидата",
+)
+async def reject_candidate(
+    candidate_id: int,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    use_cases: AsyncUseCases = Depends(get_use_cases),
+) -> None:
+    """
+    Отклоняет кандидата.
+    Меняет статус кандидата на REJECTED.
+    """
+    await _change_candidate(
+        use_cases, candidate_id, if_match, lambda transaction: transaction.reject_candidate(candidate_id), response
+    )
@@ -0,0 +1,69 @@
+"""Модели запросов и ответов HTTP API"""
+import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from hrm.core.model import Candidate, CandidateSex, CandidateStatus
+
+
+class CandidateInput(BaseModel):
+    """
+    Данные кандидата, передаваемые клиентом при регистрации и редактировании.
+    ID, статус и время изменения назначает сервер.
+    """
+
+    first_name: str = Field(..., min_length=1, max_length=100, description="Имя")
+
+    last_name: str = Field(..., min_length=1, max_length=100, description="Фамилия")
+
+    phone: Optional[str] = Field(None, max_length=20, description="Контактный телефон")
+
+    birth_date: Optional[datetime.datetime] = Field(None, description="Дата рождения")
+
+    sex: Optional[CandidateSex] = Field(None, description="Пол")
+
+    comments: Optional[str] = Field(None, description="Комментарии")
+
+    def to_candidate(self, candidate_id: Optional[int] = None) -> Candidate:
+        """Создает кандидата со статусом REGISTERED (при редактировании статус сохраняет UseCases)"""
+        return Candidate(id=candidate_id, status=CandidateStatus.REGISTERED, **self.model_dump())
+
+
+class CandidatePage(BaseModel):
+    """
+    Страница списка кандидатов.
+    """
+
+    items: List[Candidate] = Field(default_factory=list, description="Кандидаты страницы")
+
+    next_after_id: Optional[int] = Field(
+        None,
+        description="Значение after_id для запроса следующей страницы; None, если страница последняя"
+    )
+
+
+class CandidateCount(BaseModel):
+    """
+    Количество кандидатов.
+    """
+
+    total: int = Field(..., description="Общее количество кандидатов")
+
+    by_status: Dict[str, int] = Field(default_factory=dict, description="Количество кандидатов по статусам")
+
+
+class BatchRegistrationResult(BaseModel):
+    """
+    Результат пакетной регистрации кандидатов.
+    """
+
+    registered: int = Field(..., description="Количество зарегистрированных кандидатов")
+
+
+class CandidateIds(BaseModel):
+    """
+    Список ID кандидатов для пакетной смены статуса.
+    """
+
+    ids: List[int] = Field(..., min_length=1, description="ID кандидатов")
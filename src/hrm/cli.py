@@ -1,18 +1,72 @@
 """CLI приложение для управления кандидатами в HR системе"""
+import csv
 import datetime
-from typing import Optional
+import io
+import json
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Generic, List, Optional, TypeVar
 
 import typer
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
-from rich.table import Table
 
-from hrm.core.application import UseCases
-from hrm.core.model import Candidate, CandidateSex, CandidateStatus
-from hrm.core.persistence import SqliteCandidateRepository
+# Rich, Pydantic и хранилище импортируются при первом использовании: `hrm --help` и команды,
+# которым они не нужны, не должны платить за их загрузку при каждом запуске
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
 
+    from hrm.core.application import UseCases
+    from hrm.core.metrics import Metrics
+    from hrm.core.model import Candidate, CandidateSex, CandidateStatus, StatusChangeResult
+    from hrm.core.persistence import CandidateRepository
+    from hrm.core.profiling import SlowStatement
 
-def _parse_birth_date(birth_date: Optional[str], console: Console) -> Optional[datetime.datetime]:
+
+T = TypeVar("T")
+
+
+class _Lazy(Generic[T]):
+    """
+    Заместитель объекта, который создается при первом обращении к его атрибутам.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        """
+        :param factory: Функция, создающая объект.
+        """
+        self._factory = factory
+        self._instance: Optional[T] = None
+
+    @property
+    def created(self) -> bool:
+        """Был ли объект уже создан"""
+        return self._instance is not None
+
+    def get(self) -> T:
+        """Возвращает объект, создавая его при первом вызове"""
+        if self._instance is None:
+            self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+
+def _create_console() -> "Console":
+    """Создает консоль Rich"""
+    from rich.console import Console
+
+    return Console()
+
+
+def _print_json(data: Any) -> None:
+    """Выводит одну запись JSON в stdout напрямую, без Rich (машиночитаемый вывод для скриптов)"""
+    sys.stdout.write(json.dumps(data, ensure_ascii=False))
+    sys.stdout.write("\n")
+
+
+def _parse_birth_date(birth_date: Optional[str], console: "Console") -> Optional[datetime.datetime]:
     """Парсит дату рождения из строки"""
     if not birth_date:
         return None
@@ -23,8 +77,10 @@ def _parse_birth_date(birth_date: Optional[str], console: Console) -> Optional[d
         raise typer.Exit(1)
 
 
-def _parse_sex(sex: Optional[str], console: Console) -> Optional[CandidateSex]:
+def _parse_sex(sex: Optional[str], console: "Console") -> Optional["CandidateSex"]:
     """Парсит пол из строки"""
+    from hrm.core.model import CandidateSex
+
     if not sex:
         return None
     sex_upper = sex.upper()
@@ -37,8 +93,55 @@ def _parse_sex(sex: Optional[str], console: Console) -> Optional[CandidateSex]:
         raise typer.Exit(1)
 
 
-def _format_candidate(candidate: Candidate, console: Console) -> None:
+def _parse_status(status: Optional[str], console: "Console") -> Optional["CandidateStatus"]:
+    """Парсит статус кандидата из строки (имя статуса без учета регистра)"""
+    from hrm.core.model import CandidateStatus
+
+    if not status:
+        return None
+    status_upper = status.upper()
+    if status_upper in CandidateStatus.__members__:
+        return CandidateStatus[status_upper]
+    names = ", ".join(CandidateStatus.__members__)
+    console.print(f"[red]Ошибка: Неверный статус. Используйте одно из значений: {names}[/red]")
+    raise typer.Exit(1)
+
+
+def _parse_moment(value: Optional[str], console: "Console") -> Optional[datetime.datetime]:
+    """Парсит момент времени из строки YYYY-MM-DD или ISO 8601"""
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        console.print("[red]Ошибка: Неверный формат даты. Используйте YYYY-MM-DD или ISO 8601[/red]")
+        raise typer.Exit(1)
+
+
+def _collect_ids(candidate_ids: Optional[List[int]], ids_file: Optional[Path], console: "Console") -> List[int]:
+    """Собирает ID кандидатов из опций --id и файла --ids-file (пустые строки и # комментарии пропускаются)"""
+    ids = list(candidate_ids or [])
+    if ids_file is not None:
+        with open(ids_file, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                value = line.split("#", 1)[0].strip()
+                if not value:
+                    continue
+                try:
+                    ids.append(int(value))
+                except ValueError:
+                    console.print(f"[red]Ошибка: Некорректный ID '{value}' в строке {line_number} файла {ids_file}[/red]")
+                    raise typer.Exit(1)
+    if not ids:
+        console.print("[red]Ошибка: Укажите ID кандидата (--id) или файл с ID (--ids-file)[/red]")
+        raise typer.Exit(1)
+    return ids
+
+
+def _format_candidate(candidate: "Candidate", console: "Console") -> None:
     """Форматирует и выводит информацию о кандидате"""
+    from hrm.core.model import CandidateSex
+
     console.print(f"[bold cyan]Информация о кандидате[/bold cyan]")
     console.print()
     console.print(f"ID: {candidate.id}")
@@ -58,9 +161,50 @@ def _format_candidate(candidate: Candidate, console: Console) -> None:
         console.print(f"Последнее изменение: {candidate.updated_at.strftime('%Y-%m-%d %H:%M:%S')}")
 
 
+def _candidates_table(candidates: List["Candidate"], first_page: bool = True) -> "Table":
+    """
+    Строит таблицу для одной страницы кандидатов.
+    Заголовок выводится только для первой страницы, ширина колонок фиксирована,
+    поэтому последовательные страницы выглядят как одна таблица.
+    """
+    from rich.table import Table
+
+    from hrm.core.model import CandidateSex
+
+    table = Table(
+        title="Список кандидатов" if first_page else None,
+        show_header=first_page,
+        header_style="bold cyan",
+    )
+    table.add_column("ID", style="dim", width=6)
+    table.add_column("Имя", width=20)
+    table.add_column("Фамилия", width=20)
+    table.add_column("Телефон", width=15)
+    table.add_column("Дата рождения", width=12)
+    table.add_column("Пол", width=8)
+    table.add_column("Статус", width=12)
+
+    for candidate in candidates:
+        phone = candidate.phone or "-"
+        birth_date = candidate.birth_date.strftime("%Y-%m-%d") if candidate.birth_date else "-"
+        sex = "М" if candidate.sex == CandidateSex.MALE else ("Ж" if candidate.sex == CandidateSex.FEMALE else "-")
+        status = candidate.status.name
+
+        table.add_row(
+            str(candidate.id),
+            candidate.first_name,
+            candidate.last_name,
+            phone,
+            birth_date,
+            sex,
+            status
+        )
+    return table
+
+
 def _register_candidate(
-    use_cases: UseCases,
-    console: Console,
+    use_cases: "UseCases",
+    console: "Console",
     first_name: str,
     last_name: str,
     phone: Optional[str] = None,
@@ -69,6 +213,8 @@ def _register_candidate(
     comments: Optional[str] = None,
 ) -> None:
     """Регистрирует кандидата с валидацией и обработкой ошибок"""
+    from hrm.core.model import Candidate, CandidateStatus
+
     try:
         parsed_birth_date = _parse_birth_date(birth_date, console)
         parsed_sex = _parse_sex(sex, console)
@@ -91,17 +237,36 @@ def _register_candidate(
         raise typer.Exit(1)
 
 
-def create_cli_app(use_cases: UseCases) -> typer.Typer:
-    """Создает CLI приложение с инжектированными зависимостями"""
+def create_cli_app(
+    use_cases: "UseCases",
+    enable_metrics: Optional[Callable[[Path], None]] = None,
+    console_factory: Callable[[], "Console"] = _create_console,
+) -> typer.Typer:
+    """
+    Создает CLI приложение с инжектированными зависимостями.
+    :param use_cases: Бизнес-логика; может быть заместителем _Lazy, тогда хранилище открывается
+                      только командой, которая обращается к данным.
+    :param enable_metrics: Включает сбор метрик операций с записью в указанный файл по завершении команды.
+                           Вызывается до первого обращения к use_cases.
+    :param console_factory: Создает консоль Rich для вывода команд (демон настраивает её под терминал клиента).
+    """
     app = typer.Typer(help="HR Management System - CLI для управления кандидатами")
-    console = Console()
+    console = _Lazy(console_factory)
 
     @app.callback()
-    def main_callback():
+    def main_callback(
+        metrics_out: Optional[Path] = typer.Option(
+            None,
+            "--metrics-out",
+            envvar="HRM_METRICS",
+            help="Записать метрики операций (формат Prometheus) в файл по завершении команды",
+        ),
+    ):
         """
         HR Management System - CLI для управления кандидатами
         """
-        pass
+        if metrics_out is not None and enable_metrics is not None:
+            enable_metrics(metrics_out)
 
     @app.command()
     def add(
@@ -131,6 +296,8 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
         """
         Регистрирует нового кандидата в интерактивном режиме.
         """
+        from rich.prompt import Prompt
+
         console.print("[bold cyan]Регистрация нового кандидата[/bold cyan]")
         console.print()
 
@@ -189,59 +356,223 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
     @app.command()
     def get(
         candidate_id: int = typer.Option(..., "--id", "-i", help="ID кандидата"),
+        json_output: bool = typer.Option(False, "--json", help="Вывод в формате JSON (без форматирования)"),
     ):
         """
         Получает информацию о кандидате по ID.
         """
         try:
             candidate = use_cases.get_candidate(candidate_id)
+            if json_output:
+                _print_json(candidate.model_dump(mode="json"))
+                return
             _format_candidate(candidate, console)
         except Exception as e:
             console.print(f"[red]Ошибка при получении кандидата:\n{str(e)}[/red]")
             raise typer.Exit(1)
 
     @app.command()
-    def list():
+    def list(
+        limit: Optional[int] = typer.Option(None, "--limit", "-n", min=1, help="Максимальное количество кандидатов"),
+        after: Optional[int] = typer.Option(None, "--after", "-a", help="Выводить кандидатов с ID больше указанного"),
+        page_size: int = typer.Option(500, "--page-size", min=1, help="Количество строк, читаемых и выводимых за раз"),
+        status: Optional[str] = typer.Option(None, "--status", help="Только кандидаты с указанным статусом"),
+        name: Optional[str] = typer.Option(None, "--name", help="Начало фамилии"),
+        sort: str = typer.Option("id", "--sort", help="Сортировка: id, last_name, updated_at (префикс '-' - по убыванию)"),
+        json_output: bool = typer.Option(False, "--json", help="Вывод в формате JSON Lines: один кандидат на строку"),
+    ):
         """
-        Выводит список всех кандидатов.
+        Выводит список кандидатов.
+        Строки выводятся страницами по мере чтения из хранилища.
         """
+        from hrm.core.exchange import batched
+
         try:
-            candidates = use_cases.get_all_candidates()
-            
-            if not candidates:
+            parsed_status = _parse_status(status, console)
+            if parsed_status is None and not name and sort == "id":
+                candidates = use_cases.iter_candidates(after_id=after, limit=limit, page_size=page_size)
+            else:
+                candidates = use_cases.find_candidates(
+                    status=parsed_status,
+                    last_name_prefix=name,
+                    order_by=sort,
+                    limit=limit,
+                    after_id=after,
+                )
+
+            if json_output:
+                for candidate in candidates:
+                    _print_json(candidate.model_dump(mode="json"))
+                return
+
+            shown = 0
+            for page in batched(candidates, page_size):
+                console.print(_candidates_table(page, first_page=shown == 0))
+                shown += len(page)
+
+            if shown == 0:
                 console.print("[yellow]Кандидаты не найдены[/yellow]")
                 return
-            
-            table = Table(title="Список кандидатов", show_header=True, header_style="bold cyan")
+
+            console.print(f"\n[dim]Всего кандидатов: {shown}[/dim]")
+
+        except typer.Exit:
+            raise
+        except Exception as e:
+            console.print(f"[red]Ошибка при получении списка кандидатов:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+
+    @app.command("import")
+    def import_candidates(
+        file: Path = typer.Option(..., "--file", help="Файл с кандидатами (.csv или .jsonl)", exists=True, dir_okay=False),
+        batch_size: int = typer.Option(1000, "--batch-size", min=1, help="Количество строк в одной транзакции"),
+        errors_file: Optional[Path] = typer.Option(None, "--errors", help="Файл для полного отчета об ошибках (CSV)"),
+    ):
+        """
+        Массово регистрирует кандидатов из файла CSV или JSON Lines.
+        Строки валидируются и записываются пачками, каждая пачка - одна транзакция.
+        """
+        from hrm.core.exchange import batched, parse_batch, read_records
+
+        max_errors_shown = 20
+        processed = 0
+        imported = 0
+        errors_total = 0
+        errors_out = None
+        errors_writer = None
+        started = time.perf_counter()
+        try:
+            if errors_file is not None:
+                errors_out = open(errors_file, "w", encoding="utf-8", newline="")
+                errors_writer = csv.writer(errors_out)
+                errors_writer.writerow(("line", "error"))
+
+            for batch in batched(read_records(file), batch_size):
+                candidates, errors = parse_batch(batch)
+                imported += use_cases.register_candidates(candidates)
+                processed += len(batch)
+
+                for error in errors:
+                    if errors_total < max_errors_shown:
+                        console.print(f"[red]Строка {error.line}: {error.message}[/red]")
+                    if errors_writer is not None:
+                        errors_writer.writerow((error.line, error.message))
+                    errors_total += 1
+
+                elapsed = time.perf_counter() - started
+                rate = processed / elapsed if elapsed > 0 else 0.0
+                console.print(
+                    f"[dim]Обработано: {processed}, импортировано: {imported}, "
+                    f"ошибок: {errors_total} ({rate:.0f} строк/с)[/dim]"
+                )
+
+        except Exception as e:
+            console.print(f"[red]Ошибка при импорте кандидатов:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+        finally:
+            if errors_out is not None:
+                errors_out.close()
+
+        elapsed = time.perf_counter() - started
+        if errors_total > max_errors_shown:
+            console.print(f"[yellow]Показаны первые {max_errors_shown} ошибок из {errors_total}[/yellow]")
+        console.print(
+            f"[green]Импортировано кандидатов: {imported} из {processed} "
+            f"за {elapsed:.2f} с[/green]"
+        )
+        if errors_total:
+            raise typer.Exit(1)
+
+    @app.command()
+    def export(
+        file_format: str = typer.Option("csv", "--format", help="Формат выгрузки: csv или jsonl"),
+        out: Path = typer.Option(..., "--out", "-o", help="Файл результата", dir_okay=False),
+        status: Optional[str] = typer.Option(None, "--status", help="Выгрузить только кандидатов с указанным статусом"),
+        updated_since: Optional[str] = typer.Option(
+            None, "--updated-since", help="Выгрузить только измененных начиная с момента (YYYY-MM-DD или ISO 8601)"
+        ),
+        compress: bool = typer.Option(False, "--gzip", help="Сжать результат gzip (включается автоматически для .gz)"),
+    ):
+        """
+        Выгружает кандидатов в файл CSV или JSON Lines.
+        Строки читаются и записываются потоково, расход памяти не зависит от объема таблицы.
+        """
+        from hrm.core.exchange import export_to_file
+
+        try:
+            file_format = file_format.lower()
+            if file_format not in ("csv", "jsonl"):
+                console.print("[red]Ошибка: Неверный формат. Используйте csv или jsonl[/red]")
+                raise typer.Exit(1)
+            parsed_status = _parse_status(status, console)
+            parsed_updated_since = None
+            if updated_since:
+                try:
+                    parsed_updated_since = datetime.datetime.fromisoformat(updated_since)
+                except ValueError:
+                    console.print("[red]Ошибка: Неверный формат даты. Используйте YYYY-MM-DD или ISO 8601[/red]")
+                    raise typer.Exit(1)
+
+            started = time.perf_counter()
+            written = export_to_file(
+                use_cases.export_candidates(status=parsed_status, updated_since=parsed_updated_since),
+                out,
+                file_format,
+                compress=compress or out.suffix.lower() == ".gz",
+            )
+            elapsed = time.perf_counter() - started
+            console.print(f"[green]Выгружено кандидатов: {written} в {out} за {elapsed:.2f} с[/green]")
+
+        except typer.Exit:
+            raise
+        except Exception as e:
+            console.print(f"[red]Ошибка при выгрузке кандидатов:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+
+    @app.command()
+    def search(
+        query: str = typer.Argument(..., help="Поисковый запрос, например \"Python опытный\""),
+        limit: int = typer.Option(20, "--limit", "-n", min=1, help="Максимальное количество результатов"),
+        json_output: bool = typer.Option(False, "--json", help="Вывод в формате JSON Lines: один результат на строку"),
+    ):
+        """
+        Ищет кандидатов по имени, фамилии и комментариям.
+        """
+        try:
+            if json_output:
+                for hit in use_cases.search_candidates(query, limit=limit):
+                    _print_json(hit.model_dump(mode="json"))
+                return
+
+            from rich.markup import escape
+            from rich.table import Table
+
+            started = time.perf_counter()
+            hits = use_cases.search_candidates(query, limit=limit, highlight=("\x02", "\x03"))
+            elapsed = time.perf_counter() - started
+
+            if not hits:
+                console.print("[yellow]Кандидаты не найдены[/yellow]")
+                return
+
+            table = Table(title=f"Результаты поиска: {escape(query)}", show_header=True, header_style="bold cyan")
             table.add_column("ID", style="dim", width=6)
-            table.add_column("Имя", width=20)
-            table.add_column("Фамилия", width=20)
-            table.add_column("Телефон", width=15)
-            table.add_column("Дата рождения", width=12)
-            table.add_column("Пол", width=8)
+            table.add_column("Кандидат", width=30)
             table.add_column("Статус", width=12)
-            
-            for candidate in candidates:
-                phone = candidate.phone or "-"
-                birth_date = candidate.birth_date.strftime("%Y-%m-%d") if candidate.birth_date else "-"
-                sex = "М" if candidate.sex == CandidateSex.MALE else ("Ж" if candidate.sex == CandidateSex.FEMALE else "-")
-                status = candidate.status.name
-                
+            table.add_column("Совпадение")
+            for hit in hits:
+                snippet = escape(hit.snippet).replace("\x02", "[bold yellow]").replace("\x03", "[/bold yellow]")
                 table.add_row(
-                    str(candidate.id),
-                    candidate.first_name,
-                    candidate.last_name,
-                    phone,
-                    birth_date,
-                    sex,
-                    status
+                    str(hit.candidate.id),
+                    escape(f"{hit.candidate.first_name} {hit.candidate.last_name}"),
+                    hit.candidate.status.name,
+                    snippet,
                 )
-            
             console.print(table)
-            console.print(f"\n[dim]Всего кандидатов: {len(candidates)}[/dim]")
-            
+            console.print(f"\n[dim]Найдено кандидатов: {len(hits)} за {elapsed * 1000:.1f} мс[/dim]")
+
         except Exception as e:
-            console.print(f"[red]Ошибка при получении списка кандидатов:\n{str(e)}[/red]")
+            console.print(f"[red]Ошибка при поиске кандидатов:\n{str(e)}[/red]")
             raise typer.Exit(1)
 
     @app.command()
@@ -252,6 +583,8 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
         """
         Удаляет кандидата по ID.
         """
+        from rich.prompt import Confirm
+
         try:
             # Получаем информацию о кандидате для отображения
             candidate = use_cases.get_candidate(candidate_id)
@@ -293,10 +626,9 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
         Редактирует существующего кандидата.
         Статус и ID кандидата изменить нельзя.
         """
+        from hrm.core.application import retry_on_conflict
+
         try:
-            # Получаем существующего кандидата
-            existing_candidate = use_cases.get_candidate(candidate_id)
-            
             # Парсим опциональные параметры
             parsed_birth_date = None
             if birth_date:
@@ -306,19 +638,26 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
             if sex:
                 parsed_sex = _parse_sex(sex, console)
             
-            # Создаем обновленный кандидат, сохраняя существующие значения для не указанных полей
-            updated_candidate = existing_candidate.model_copy(update={
-                "first_name": first_name if first_name is not None else existing_candidate.first_name,
-                "last_name": last_name if last_name is not None else existing_candidate.last_name,
-                "phone": phone if phone is not None else existing_candidate.phone,
-                "birth_date": parsed_birth_date if parsed_birth_date is not None else existing_candidate.birth_date,
-                "sex": parsed_sex if parsed_sex is not None else existing_candidate.sex,
-                "comments": comments if comments is not None else existing_candidate.comments,
-                # ID и статус не изменяются - они сохраняются в методе edit_candidate
-            })
+            def apply_changes() -> "Candidate":
+                # Получаем существующего кандидата (заново при каждой попытке)
+                existing_candidate = use_cases.get_candidate(candidate_id)
+                
+                # Создаем обновленный кандидат, сохраняя существующие значения для не указанных полей
+                updated_candidate = existing_candidate.model_copy(update={
+                    "first_name": first_name if first_name is not None else existing_candidate.first_name,
+                    "last_name": last_name if last_name is not None else existing_candidate.last_name,
+                    "phone": phone if phone is not None else existing_candidate.phone,
+                    "birth_date": parsed_birth_date if parsed_birth_date is not None else existing_candidate.birth_date,
+                    "sex": parsed_sex if parsed_sex is not None else existing_candidate.sex,
+                    "comments": comments if comments is not None else existing_candidate.comments,
+                    # ID и статус не изменяются - они сохраняются в методе edit_candidate
+                })
+                
+                # Редактируем кандидата; версия из existing_candidate защищает от параллельных изменений
+                return use_cases.edit_candidate(updated_candidate)
             
-            # Редактируем кандидата
-            edited_candidate = use_cases.edit_candidate(updated_candidate)
+            # Изменяются только переданные поля, поэтому при конфликте их можно применить к свежей версии
+            edited_candidate = retry_on_conflict(apply_changes)
             
             console.print(f"[green]Кандидат [gray]{edited_candidate.first_name} {edited_candidate.last_name}[/gray] успешно обновлен[/green]")
             _format_candidate(edited_candidate, console)
@@ -336,6 +675,10 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
         Редактирует существующего кандидата в интерактивном режиме.
         Статус и ID кандидата изменить нельзя.
         """
+        from rich.prompt import Prompt
+
+        from hrm.core.model import CandidateSex, ConcurrentModificationError
+
         try:
             console.print("[bold cyan]Редактирование кандидата[/bold cyan]")
             console.print()
@@ -441,6 +784,10 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
             console.print()
             _format_candidate(edited_candidate, console)
             
+        except ConcurrentModificationError as e:
+            # Пользователь вносил изменения, глядя на старые данные - молча перезаписывать их нельзя
+            console.print(f"[red]Ошибка: {str(e)}. Откройте кандидата заново и повторите изменения.[/red]")
+            raise typer.Exit(1)
         except ValueError as e:
             console.print(f"[red]Ошибка: {str(e)}[/red]")
             raise typer.Exit(1)
@@ -456,6 +803,8 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
         Очищает репозиторий от всех данных.
         Используется для приемочных тестов.
         """
+        from rich.prompt import Confirm
+
         try:
             # Запрашиваем подтверждение, если не указан флаг --force
             if not force:
@@ -472,64 +821,605 @@ def create_cli_app(use_cases: UseCases) -> typer.Typer:
             raise typer.Exit(1)
 
     @app.command()
-    def count():
+    def count(
+        by_status: bool = typer.Option(False, "--by-status", help="Показать количество кандидатов по статусам"),
+        json_output: bool = typer.Option(False, "--json", help="Вывод в формате JSON (без форматирования)"),
+    ):
         """
         Выводит общее количество кандидатов в системе.
         """
         try:
-            total = use_cases.get_total_candidates()
-            console.print(f"[bold cyan]Общее количество кандидатов: {total}[/bold cyan]")
+            if json_output:
+                if by_status:
+                    totals = use_cases.get_total_candidates_by_status()
+                    _print_json({
+                        "total": sum(totals.values()),
+                        "by_status": {status.name: total for status, total in totals.items()},
+                    })
+                else:
+                    _print_json({"total": use_cases.get_total_candidates()})
+                return
+            if by_status:
+                totals = use_cases.get_total_candidates_by_status()
+                for status, total in totals.items():
+                    console.print(f"{status.name}: {total}")
+                console.print(f"[bold cyan]Общее количество кандидатов: {sum(totals.values())}[/bold cyan]")
+            else:
+                total = use_cases.get_total_candidates()
+                console.print(f"[bold cyan]Общее количество кандидатов: {total}[/bold cyan]")
         except Exception as e:
             console.print(f"[red]Ошибка при получении количества кандидатов:\n{str(e)}[/red]")
             raise typer.Exit(1)
 
     @app.command()
-    def accept(
-        candidate_id: int = typer.Option(..., "--id", "-i", help="ID кандидата"),
+    def stats(
+        since: Optional[str] = typer.Option(None, "--since", help="Кандидаты, измененные начиная с даты (YYYY-MM-DD или ISO 8601)"),
+        until: Optional[str] = typer.Option(None, "--until", help="Кандидаты, измененные до даты, не включая её"),
+        json_output: bool = typer.Option(False, "--json", help="Вывод в формате JSON (без форматирования)"),
     ):
         """
-        Принимает кандидата в качестве нового сотрудника.
-        Меняет статус кандидата на APPROVED.
+        Выводит статистику воронки подбора: кандидаты по статусам, полу и возрасту,
+        принятые и отклоненные по неделям.
         """
         try:
-            candidate = use_cases.get_candidate(candidate_id)
-            use_cases.accept_candidate(candidate_id)
-            console.print(f"[green]Кандидат [gray]{candidate.first_name} {candidate.last_name}[/gray] успешно принят (статус: APPROVED)[/green]")
-        except ValueError as e:
-            console.print(f"[red]Ошибка: {str(e)}[/red]")
+            statistics = use_cases.get_statistics(
+                since=_parse_moment(since, console),
+                until=_parse_moment(until, console),
+            )
+        except typer.Exit:
+            raise
+        except Exception as e:
+            console.print(f"[red]Ошибка при расчете статистики:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+
+        if json_output:
+            _print_json(statistics.model_dump(mode="json"))
+            return
+
+        from rich.table import Table
+
+        console.print(f"[bold cyan]Всего кандидатов: {statistics.total}[/bold cyan]")
+        for title, column, totals in (
+            ("По статусам", "Статус", statistics.by_status),
+            ("По полу", "Пол", statistics.by_sex),
+            ("По возрасту", "Возраст", statistics.by_age),
+        ):
+            table = Table(title=title, show_header=True, header_style="bold cyan")
+            table.add_column(column, width=12)
+            table.add_column("Кандидатов", justify="right", width=12)
+            for name, total in totals.items():
+                table.add_row(name, str(total))
+            console.print(table)
+
+        if statistics.decisions_by_week:
+            table = Table(title="Решения по неделям", show_header=True, header_style="bold cyan")
+            table.add_column("Неделя", width=12)
+            table.add_column("Принято", justify="right", width=10)
+            table.add_column("Отклонено", justify="right", width=10)
+            for decisions in statistics.decisions_by_week:
+                table.add_row(decisions.week.isoformat(), str(decisions.approved), str(decisions.rejected))
+            console.print(table)
+
+    def _report_status_change(result: "StatusChangeResult", action: str) -> None:
+        """Выводит результат смены статуса и завершает команду с ошибкой, если часть ID не обработана"""
+        for candidate in result.changed:
+            console.print(
+                f"[green]Кандидат [gray]{candidate.first_name} {candidate.last_name}[/gray] "
+                f"{action} (статус: {candidate.status.name})[/green]"
+            )
+        for candidate_id in result.missing:
+            console.print(f"[red]Ошибка: Кандидат с ID {candidate_id} не найден[/red]")
+        for candidate_id in result.conflicting:
+            console.print(f"[red]Ошибка: Кандидат с ID {candidate_id} находится в другом статусе[/red]")
+        if len(result.changed) > 1:
+            console.print(f"\n[dim]Обработано кандидатов: {len(result.changed)}[/dim]")
+        if result.missing or result.conflicting:
             raise typer.Exit(1)
+
+    @app.command()
+    def accept(
+        candidate_ids: Optional[List[int]] = typer.Option(None, "--id", "-i", help="ID кандидата (можно указать несколько раз)"),
+        ids_file: Optional[Path] = typer.Option(
+            None, "--ids-file", help="Файл с ID кандидатов (по одному на строку)", exists=True, dir_okay=False
+        ),
+        from_status: Optional[str] = typer.Option(
+            None, "--from-status", help="Менять статус только у кандидатов в указанном статусе"
+        ),
+    ):
+        """
+        Принимает кандидатов в качестве новых сотрудников.
+        Меняет статус кандидатов на APPROVED одной транзакцией.
+        """
+        try:
+            ids = _collect_ids(candidate_ids, ids_file, console)
+            result = use_cases.accept_candidates(ids, _parse_status(from_status, console))
+        except typer.Exit:
+            raise
         except Exception as e:
             console.print(f"[red]Ошибка при принятии кандидата:\n{str(e)}[/red]")
             raise typer.Exit(1)
+        _report_status_change(result, "успешно принят")
 
     @app.command()
     def reject(
-        candidate_id: int = typer.Option(..., "--id", "-i", help="ID кандидата"),
+        candidate_ids: Optional[List[int]] = typer.Option(None, "--id", "-i", help="ID кандидата (можно указать несколько раз)"),
+        ids_file: Optional[Path] = typer.Option(
+            None, "--ids-file", help="Файл с ID кандидатов (по одному на строку)", exists=True, dir_okay=False
+        ),
+        from_status: Optional[str] = typer.Option(
+            None, "--from-status", help="Менять статус только у кандидатов в указанном статусе"
+        ),
     ):
         """
-        Отклоняет кандидата.
-        Меняет статус кандидата на REJECTED.
+        Отклоняет кандидатов.
+        Меняет статус кандидатов на REJECTED одной транзакцией.
         """
         try:
-            candidate = use_cases.get_candidate(candidate_id)
-            use_cases.reject_candidate(candidate_id)
-            console.print(f"[green]Кандидат [gray]{candidate.first_name} {candidate.last_name}[/gray] отклонен (статус: REJECTED)[/green]")
-        except ValueError as e:
-            console.print(f"[red]Ошибка: {str(e)}[/red]")
-            raise typer.Exit(1)
+            ids = _collect_ids(candidate_ids, ids_file, console)
+            result = use_cases.reject_candidates(ids, _parse_status(from_status, console))
+        except typer.Exit:
+            raise
         except Exception as e:
             console.print(f"[red]Ошибка при отклонении кандидата:\n{str(e)}[/red]")
             raise typer.Exit(1)
+        _report_status_change(result, "отклонен")
+
+    db_app = typer.Typer(help="Обслуживание базы данных SQLite")
+    app.add_typer(db_app, name="db")
+
+    @db_app.command("status")
+    def db_status():
+        """
+        Выводит версию схемы базы данных и список миграций.
+        """
+        from hrm.core.migrations import MIGRATIONS
+        from hrm.core.persistence import SqliteCandidateRepository
+
+        try:
+            with SqliteCandidateRepository(auto_migrate=False) as repository:
+                current = repository.schema_version()
+                console.print(f"База данных: {repository.db_file}")
+        except Exception as e:
+            console.print(f"[red]Ошибка при чтении версии схемы:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+
+        console.print(f"Версия схемы: {current} (последняя: {MIGRATIONS[-1].version})")
+        console.print()
+        for migration in MIGRATIONS:
+            mark = "[green]применена[/green]" if migration.version <= current else "[yellow]ожидает[/yellow]"
+            console.print(f"{migration.version:>3}  {mark}  {migration.description}")
+
+    @db_app.command("migrate")
+    def db_migrate(
+        target: Optional[int] = typer.Option(None, "--to", help="Версия схемы (по умолчанию - последняя)"),
+        batch_size: int = typer.Option(1000, "--batch-size", min=1, help="Количество строк в одной порции заполнения данных"),
+    ):
+        """
+        Применяет недостающие миграции схемы одной транзакцией.
+        Заполнение данных в больших таблицах выполняется порциями по --batch-size строк.
+        """
+        from hrm.core.persistence import SqliteCandidateRepository
+
+        try:
+            started = time.perf_counter()
+            with SqliteCandidateRepository(auto_migrate=False) as repository:
+                applied = repository.migrate(target, batch_size=batch_size)
+                current = repository.schema_version()
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            console.print(f"[red]Ошибка при миграции схемы:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+
+        for migration in applied:
+            console.print(f"[green]Применена миграция {migration.version}: {migration.description}[/green]")
+        if not applied:
+            console.print(f"[green]Схема актуальна (версия {current})[/green]")
+        else:
+            console.print(f"\n[dim]Версия схемы: {current}, время: {elapsed:.2f} с[/dim]")
+
+    @db_app.command(
+        "profile",
+        context_settings={"allow_extra_args": True, "ignore_unknown_options": True},
+    )
+    def db_profile(
+        ctx: typer.Context,
+        slow_ms: float = typer.Option(100.0, "--slow-ms", min=0, help="Порог медленного запроса, мс"),
+        top: int = typer.Option(20, "--top", min=1, help="Количество шаблонов запросов в сводке"),
+    ):
+        """
+        Выполняет команду hrm с профилировщиком запросов SQLite, например: hrm db profile --slow-ms 5 -- list.
+        Медленные запросы выводятся по ходу выполнения с типами параметров, количеством строк
+        и планом выполнения, после команды - сводка по шаблонам запросов. Весь вывод профилировщика - в stderr.
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        from hrm.core.application import UseCases
+        from hrm.core.persistence import SqliteCandidateRepository
+        from hrm.core.profiling import StatementProfiler
+
+        if not ctx.args:
+            console.print("[red]Укажите команду для профилирования, например: hrm db profile -- list[/red]")
+            raise typer.Exit(1)
+        report = Console(stderr=True)
+
+        def log_slow(statement: "SlowStatement") -> None:
+            report.print(
+                f"[yellow]Медленный запрос {statement.elapsed * 1000:.1f} мс, строк: {statement.rows}, "
+                f"параметры: {statement.parameters}[/yellow]\n{statement.sql}",
+                markup=True,
+                highlight=False,
+            )
+            for line in statement.plan:
+                report.print(f"  [dim]{line}[/dim]", highlight=False)
+
+        profiler = StatementProfiler(slow_threshold=slow_ms / 1000, on_slow=log_slow)
+        # Без кэша: он скрыл бы повторные чтения (N+1), которые и должен показать профилировщик
+        repository = SqliteCandidateRepository(profiler=profiler)
+        try:
+            # Команда выполняется в этом же процессе поверх профилируемого хранилища
+            exit_code = _run_command(create_cli_app(UseCases(repository)), ctx.args)
+        finally:
+            repository.close()
+
+        table = Table(title="Запросы SQLite по шаблонам")
+        table.add_column("Вызовов", justify="right")
+        table.add_column("Всего, мс", justify="right")
+        table.add_column("Макс., мс", justify="right")
+        table.add_column("Строк", justify="right")
+        table.add_column("Инструкций VM", justify="right")
+        table.add_column("Запрос")
+        for stats in profiler.summary()[:top]:
+            note = " [yellow](N+1?)[/yellow]" if stats.repeated_lookup else ""
+            table.add_row(
+                str(stats.calls),
+                f"{stats.total * 1000:.2f}",
+                f"{stats.max * 1000:.2f}",
+                str(stats.rows),
+                f"~{stats.vm_steps}",
+                f"{stats.fingerprint[:120]}{note}",
+            )
+        report.print(table)
+        raise typer.Exit(exit_code)
+
+    @app.command()
+    def serve(
+        host: str = typer.Option("127.0.0.1", "--host", help="Адрес для входящих соединений"),
+        port: int = typer.Option(8000, "--port", help="Порт HTTP сервера"),
+        workers: int = typer.Option(1, "--workers", "-w", min=1, help="Количество процессов-воркеров"),
+    ):
+        """
+        Запускает HTTP API (uvicorn).
+        Каждый воркер открывает собственное соединение с базой данных из HRM_DB_PATH.
+        """
+        import uvicorn
+
+        console.print(f"[green]HTTP API: http://{host}:{port} (воркеров: {workers})[/green]")
+        uvicorn.run("hrm.api.main:app", host=host, port=port, workers=workers, log_level="warning")
+
+    daemon_app = typer.Typer(help="Демон: прогретое хранилище, которому hrm передает команды через Unix-сокет")
+    app.add_typer(daemon_app, name="daemon")
+
+    @daemon_app.command("start")
+    def daemon_start(
+        foreground: bool = typer.Option(False, "--foreground", help="Не отключаться от терминала (до Ctrl+C)"),
+    ):
+        """
+        Запускает демон для базы данных из HRM_DB_PATH.
+        Пока демон работает, команды hrm для этой базы выполняются в нем; если он не запущен -
+        в процессе hrm, как обычно. HRM_NO_DAEMON=1 отключает передачу команд демону.
+        """
+        from hrm import daemon
+
+        state = daemon.status()
+        if state is not None:
+            console.print(f"[yellow]Демон уже запущен (PID {state['pid']}, сокет {state['socket']})[/yellow]")
+            return
+        try:
+            if foreground:
+                daemon.serve(on_ready=lambda path: console.print(f"[green]Демон принимает команды: {path}[/green]"))
+                return
+            state = daemon.start_background()
+        except Exception as e:
+            console.print(f"[red]Ошибка при запуске демона:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+        console.print(f"[green]Демон запущен (PID {state['pid']}, сокет {state['socket']})[/green]")
+
+    @daemon_app.command("stop")
+    def daemon_stop():
+        """
+        Останавливает демон для базы данных из HRM_DB_PATH.
+        """
+        from hrm import daemon
+
+        try:
+            stopped = daemon.stop()
+        except ConnectionError as e:
+            console.print(f"[red]Ошибка при остановке демона:\n{str(e)}[/red]")
+            raise typer.Exit(1)
+        if stopped:
+            console.print("[green]Демон остановлен[/green]")
+        else:
+            console.print("[yellow]Демон не запущен[/yellow]")
+
+    @daemon_app.command("status")
+    def daemon_status(
+        json_output: bool = typer.Option(False, "--json", help="Вывести состояние в формате JSON"),
+    ):
+        """
+        Выводит состояние демона: время работы, частоту запросов и статистику по командам.
+        """
+        from hrm import daemon
+
+        state = daemon.status()
+        if json_output:
+            _print_json(state)
+            raise typer.Exit(0 if state is not None else 1)
+        if state is None:
+            console.print("[yellow]Демон не запущен[/yellow]")
+            raise typer.Exit(1)
+
+        from rich.table import Table
+
+        console.print(f"PID: {state['pid']}, база данных: {state['db']}, сокет: {state['socket']}")
+        console.print(
+            f"Работает: {state['uptime']:.0f} с, запросов: {state['requests']} (с ошибкой: {state['failed']}), "
+            f"выполняется: {state['in_flight']}",
+            highlight=False,
+        )
+        console.print(
+            f"Запросов в секунду: {state['rate']:.2f} за последнюю минуту, "
+            f"{state['requests'] / max(state['uptime'], 1e-9):.2f} за всё время; "
+            f"среднее время: {state['mean_ms']:.1f} мс",
+            highlight=False,
+        )
+        if not state["commands"]:
+            return
+        table = Table(title="Команды")
+        table.add_column("Команда")
+        table.add_column("Запросов", justify="right")
+        table.add_column("С ошибкой", justify="right")
+        table.add_column("Среднее, мс", justify="right")
+        for command, stats in state["commands"].items():
+            table.add_row(command, str(stats["requests"]), str(stats["failed"]), f"{stats['mean_ms']:.1f}")
+        console.print(table)
+
+    def run_script_line(line: str, report: "Console", totals: "_CommandTotals") -> Optional[int]:
+        """
+        Выполняет строку сценария как команду hrm и выводит её статус.
+        :return: Код завершения или None для пустой строки и комментария.
+        """
+        import shlex
+
+        try:
+            args = shlex.split(line, comments=True)
+        except ValueError as e:
+            report.print(f"[red]✗ {line.strip()}: {e}[/red]", highlight=False)
+            totals.add(2, 0.0)
+            return 2
+        if not args:
+            return None
+        if args[0] in _SESSION_COMMANDS:
+            report.print(f"[red]✗ {line.strip()}: команда {args[0]} недоступна внутри batch/shell[/red]", highlight=False)
+            totals.add(2, 0.0)
+            return 2
+        started = time.perf_counter()
+        try:
+            exit_code = _run_command(app, args)
+        except KeyboardInterrupt:
+            # Прерванная команда учитывается в итогах; shell продолжает работу, batch останавливается
+            totals.add(1, time.perf_counter() - started)
+            report.print(f"[red]✗ {' '.join(args)}: прервано[/red]", highlight=False)
+            raise
+        except Exception as e:
+            from rich.markup import escape
+
+            # Непредвиденная ошибка одной команды не должна завершать весь сценарий
+            totals.add(1, time.perf_counter() - started)
+            report.print(f"[red]✗ код 1 {' '.join(args)}: {escape(f'{type(e).__name__}: {e}')}[/red]", highlight=False)
+            return 1
+        elapsed = time.perf_counter() - started
+        totals.add(exit_code, elapsed)
+        mark = "[green]✓[/green]" if exit_code == 0 else f"[red]✗ код {exit_code}[/red]"
+        report.print(f"{mark} [dim]{' '.join(args)} ({elapsed * 1000:.1f} мс)[/dim]", highlight=False)
+        return exit_code
+
+    @app.command()
+    def batch(
+        script: Optional[Path] = typer.Option(
+            None, "--file", "-f", help="Файл с командами (по умолчанию - stdin)", exists=True, dir_okay=False
+        ),
+        transaction: bool = typer.Option(
+            False, "--transaction", help="Выполнить все команды одной транзакцией: при первой ошибке все изменения откатываются"
+        ),
+        stop_on_error: bool = typer.Option(False, "--stop-on-error", help="Остановиться на первой команде с ошибкой"),
+    ):
+        """
+        Выполняет команды hrm из файла или stdin (по одной на строку, синтаксис как в командной строке)
+        в одном процессе с одним открытым хранилищем. Пустые строки и строки с # пропускаются.
+        Статус каждой команды и итоговая пропускная способность выводятся в stderr.
+        """
+        from rich.console import Console
+
+        report = Console(stderr=True)
+        totals = _CommandTotals()
+        source = script.open(encoding="utf-8") if script is not None else sys.stdin
+        # Подтверждения команд не должны читать следующие строки сценария из stdin
+        stdin, sys.stdin = sys.stdin, io.StringIO()
+
+        def run_all() -> None:
+            for line in source:
+                exit_code = run_script_line(line, report, totals)
+                if exit_code and (transaction or stop_on_error):
+                    raise _BatchAborted(exit_code)
+
+        try:
+            if transaction:
+                with use_cases.transaction():
+                    run_all()
+            else:
+                run_all()
+        except _BatchAborted:
+            if transaction:
+                report.print("[red]Транзакция отменена, изменения всех команд откачены[/red]")
+        finally:
+            sys.stdin = stdin
+            if script is not None:
+                source.close()
+            totals.report(report)
+        if totals.failed:
+            raise typer.Exit(1)
+
+    @app.command()
+    def shell():
+        """
+        Интерактивная оболочка: команды hrm вводятся без префикса hrm и выполняются в одном процессе
+        с одним открытым хранилищем. Выход - exit, quit или Ctrl+D.
+        """
+        from rich.console import Console
+
+        try:
+            # История и редактирование строки, если модуль доступен на платформе
+            import readline  # noqa: F401
+        except ImportError:
+            pass
+
+        report = Console(stderr=True)
+        totals = _CommandTotals()
+        report.print("[bold]HR Management System[/bold]. Команды - как в командной строке без hrm, "
+                     "--help - список команд, exit - выход.")
+        while True:
+            try:
+                line = input("hrm> ")
+            except EOFError:
+                report.print()
+                break
+            except KeyboardInterrupt:
+                report.print()
+                continue
+            if line.strip() in ("exit", "quit"):
+                break
+            try:
+                run_script_line(line, report, totals)
+            except KeyboardInterrupt:
+                continue
+        totals.report(report)
 
     return app
 
 
+_SESSION_COMMANDS = {"batch", "shell", "serve", "daemon"}
+"""
+Команды, которые нельзя выполнять внутри batch и shell.
+"""
+
+
+class _BatchAborted(Exception):
+    """Остановка сценария batch на команде с ошибкой"""
+
+    def __init__(self, exit_code: int):
+        super().__init__(exit_code)
+        self.exit_code = exit_code
+
+
+class _CommandTotals:
+    """
+    Итоги сценария batch или сеанса shell.
+    """
+
+    def __init__(self):
+        self.succeeded = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    def add(self, exit_code: int, elapsed: float) -> None:
+        if exit_code == 0:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self.elapsed += elapsed
+
+    def report(self, console: "Console") -> None:
+        total = self.succeeded + self.failed
+        rate = f", {total / self.elapsed:.1f} команд/с" if self.elapsed > 0 else ""
+        console.print(
+            f"[bold]Выполнено команд: {total}, успешно: {self.succeeded}, с ошибкой: {self.failed}, "
+            f"время: {self.elapsed:.3f} с{rate}[/bold]",
+            highlight=False,
+        )
+
+
+def _run_command(app: typer.Typer, args: List[str]) -> int:
+    """
+    Выполняет команду CLI в текущем процессе.
+    :param app: Приложение CLI.
+    :param args: Аргументы командной строки без имени программы.
+    :return: Код завершения команды.
+    """
+    try:
+        result = app(args, prog_name="hrm", standalone_mode=False)
+    except typer.Abort:
+        return 1
+    except typer.TyperException as e:
+        # Ошибки разбора аргументов: неизвестная команда, неверный параметр
+        e.show()
+        return e.exit_code
+    return result if isinstance(result, int) else 0
+
+
+def _open_repository() -> "CandidateRepository":
+    """Открывает хранилище кандидатов"""
+    from hrm.core.caching import CachingCandidateRepository
+    from hrm.core.persistence import SqliteCandidateRepository
+
+    # Команды вроде edit читают одного и того же кандидата несколько раз за запуск
+    return CachingCandidateRepository(SqliteCandidateRepository())
+
+
 def main():
     """Точка входа в CLI приложение - Composition Root"""
-    repository = SqliteCandidateRepository()
-    use_cases = UseCases(repository)
-    app = create_cli_app(use_cases)
-    app()
+    # Метрики собираются, только если запрошены: иначе UseCases и репозиторий не оборачиваются
+    metrics: Optional["Metrics"] = None
+    metrics_file: Optional[Path] = None
+
+    def enable_metrics(path: Path) -> None:
+        nonlocal metrics, metrics_file
+        from hrm.core.metrics import Metrics
+
+        # Команды batch и shell повторно вызывают корневую команду с тем же HRM_METRICS
+        if metrics is None:
+            metrics, metrics_file = Metrics(), path
+
+    def open_repository() -> "CandidateRepository":
+        repository = _open_repository()
+        if metrics is None:
+            return repository
+        from hrm.core.metrics import instrument
+
+        return instrument(repository, metrics, "repository", "sqlite")
+
+    # База данных открывается только командой, которая обращается к данным:
+    # `hrm --help` и `hrm serve` не создают файл и не выполняют миграции схемы
+    repository: _Lazy["CandidateRepository"] = _Lazy(open_repository)
+
+    def create_use_cases() -> "UseCases":
+        from hrm.core.application import UseCases
+
+        use_cases = UseCases(repository.get())
+        if metrics is None:
+            return use_cases
+        from hrm.core.metrics import instrument
+
+        return instrument(use_cases, metrics, "use_cases", "sqlite")
+
+    try:
+        app = create_cli_app(_Lazy(create_use_cases), enable_metrics)
+        app()
+    finally:
+        if repository.created:
+            repository.close()
+        if metrics is not None:
+            metrics.write(metrics_file)
 
 
 if __name__ == "__main__":
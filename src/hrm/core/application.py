@@ -1,8 +1,64 @@
 import datetime
-from typing import List
+import random
+import time
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
-from hrm.core.model import Candidate, CandidateStatus
-from hrm.core.persistence import CandidateRepository, JsonCandidateRepository
+from hrm.core.model import (
+    Candidate,
+    CandidateSearchHit,
+    CandidateStatistics,
+    CandidateStatus,
+    ConcurrentModificationError,
+    StatusChangeResult,
+    local_time,
+)
+from hrm.core.persistence import DEFAULT_HIGHLIGHT, CandidateRepository, JsonCandidateRepository
+
+if TYPE_CHECKING:
+    # asyncio нужен только HTTP API; CLI не должен платить за его импорт при каждом запуске
+    from hrm.core.async_persistence import AsyncCandidateRepository
+
+
+T = TypeVar("T")
+
+
+def retry_on_conflict(operation: Callable[[], T], attempts: int = 3, backoff: float = 0.01) -> T:
+    """
+    Повторяет операцию чтение-изменение-запись, если её запись отклонена из-за параллельного изменения.
+    Операция должна заново читать кандидата при каждом вызове, иначе повтор снова получит конфликт.
+    Между попытками выдерживается экспоненциальная пауза со случайным разбросом, чтобы конкурирующие
+    писатели не сталкивались повторно.
+    :param operation: Операция без аргументов.
+    :param attempts: Максимальное количество попыток.
+    :param backoff: Базовая пауза между попытками в секундах.
+    :return: Результат операции.
+    :raises ConcurrentModificationError: Если все попытки завершились конфликтом.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except ConcurrentModificationError:
+            if attempt == attempts:
+                raise
+            time.sleep(backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+
+
+def _check_window(since: Optional[datetime.datetime], until: Optional[datetime.datetime]) -> None:
+    """Проверяет, что интервал [since, until) не пуст; моменты с часовым поясом сравниваются в локальном времени"""
+    if since is not None and until is not None and local_time(since) >= local_time(until):
+        raise ValueError("Начало периода должно быть раньше его окончания")
 
 
 class UseCases:
@@ -17,6 +73,14 @@ class UseCases:
         """
         self._repository = repository
 
+    def transaction(self) -> ContextManager[CandidateRepository]:
+        """
+        Единица работы над несколькими сценариями.
+        Вызовы методов UseCases внутри блока with фиксируются вместе
+        и откатываются целиком, если блок завершился исключением.
+        """
+        return self._repository.transaction()
+
     def register_candidate(self, candidate: Candidate) -> int:
         """
         Регистрирует нового кандидата.
@@ -24,6 +88,17 @@ class UseCases:
         """
         return self._repository.insert_or_update(candidate)
 
+    def register_candidates(self, candidates: List[Candidate]) -> int:
+        """
+        Регистрирует пачку новых кандидатов одной операцией записи.
+        Используется при массовом импорте.
+        :param candidates: Новые кандидаты. Их ID игнорируются.
+        :return: Количество зарегистрированных кандидатов.
+        """
+        if not candidates:
+            return 0
+        return self._repository.insert_many(candidates)
+
     def get_candidate(self, candidate_id: int) -> Candidate:
         """
         Возвращает существующего кандидата.
@@ -37,6 +112,23 @@ class UseCases:
         return candidate
 
 
+    def get_candidate_revision(self, candidate_id: int) -> datetime.datetime:
+        """
+        Возвращает время последнего изменения кандидата без загрузки всех его данных.
+        Используется для проверки актуальности копий кандидата (ETag).
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        """
+        revision = self._repository.get_revision(candidate_id)
+        if revision is None:
+            raise ValueError(f"Кандидат с ID {candidate_id} не найден")
+        return revision
+
+    def get_candidates_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        """
+        Возвращает признаки изменения набора кандидатов: количество, максимальный ID и время последнего изменения.
+        """
+        return self._repository.get_collection_revision()
+
     def get_all_candidates(self) -> List[Candidate]:
         """
         Возвращает список всех кандидатов.
@@ -45,29 +137,112 @@ class UseCases:
         return self._repository.get_all()
 
 
+    def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[Candidate]:
+        """
+        Постранично перебирает кандидатов в порядке возрастания ID, не загружая их все в память.
+        :param after_id: Вернуть кандидатов с ID строго больше указанного.
+        :param limit: Максимальное количество кандидатов. None - без ограничения.
+        :param page_size: Размер страницы чтения из репозитория.
+        :return: Итератор по кандидатам.
+        """
+        return self._repository.iter_candidates(after_id=after_id, limit=limit, page_size=page_size)
+
+
+    def find_candidates(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        """
+        Ищет кандидатов по статусу, началу фамилии и времени изменения.
+        :param status: Статус кандидата.
+        :param last_name_prefix: Начало фамилии.
+        :param updated_after: Вернуть кандидатов, измененных позже указанного времени.
+        :param order_by: Поле сортировки (id, last_name, updated_at), префикс "-" - по убыванию.
+        :param limit: Максимальное количество кандидатов.
+        :param after_id: Вернуть кандидатов с ID больше указанного (только для сортировки по id).
+        :return: Список найденных кандидатов.
+        :raises ValueError: Если поле сортировки не поддерживается.
+        """
+        return self._repository.find(
+            status=status,
+            last_name_prefix=last_name_prefix,
+            updated_after=updated_after,
+            order_by=order_by,
+            limit=limit,
+            after_id=after_id,
+        )
+
+
+    def search_candidates(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        """
+        Полнотекстовый поиск кандидатов по имени, фамилии и комментариям.
+        :param query: Поисковый запрос в свободной форме, например "Python опытный".
+        :param limit: Максимальное количество результатов.
+        :param highlight: Маркеры выделения совпадений во фрагменте.
+        :return: Результаты по убыванию релевантности.
+        """
+        return self._repository.search(query, limit=limit, highlight=highlight)
+
+
+    def export_candidates(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+    ) -> Iterator[Candidate]:
+        """
+        Потоково выгружает кандидатов из согласованного снимка данных.
+        :param status: Выгрузить только кандидатов с указанным статусом.
+        :param updated_since: Выгрузить только кандидатов, измененных не раньше указанного времени.
+        :return: Итератор по кандидатам в порядке возрастания ID.
+        """
+        return self._repository.iter_snapshot(status=status, updated_since=updated_since)
+
+
     def edit_candidate(self, candidate: Candidate) -> Candidate:
         """
         Редактирование кандидата.
+        Если у кандидата указана версия (он получен через get_candidate), изменение сохраняется,
+        только если с момента чтения кандидата никто не изменил.
         :param candidate: Изменяемый кандидат.
         :return: Измененный кандидат.
         :raises ValueError: Если кандидат с указанным ID не найден или ID не указан.
+        :raises ConcurrentModificationError: Если кандидат был изменен после чтения.
         """
         if candidate.id is None:
             raise ValueError("ID кандидата должен быть указан для редактирования")
         
-        existing_candidate = self._repository.get_by_id(candidate.id)
-        if existing_candidate is None:
-            raise ValueError(f"Кандидат с ID {candidate.id} не найден")
+        # Чтение, изменение и запись выполняются одной транзакцией
+        with self._repository.transaction():
+            existing_candidate = self._repository.get_by_id(candidate.id)
+            if existing_candidate is None:
+                raise ValueError(f"Кандидат с ID {candidate.id} не найден")
         
-        # Сохраняем ID и статус из существующего кандидата, обновляем время изменения
-        updated_candidate = candidate.model_copy(update={
-            "id": existing_candidate.id,
-            "status": existing_candidate.status,
-            "updated_at": datetime.datetime.now()
-        })
+            # Сохраняем ID и статус из существующего кандидата, обновляем время изменения.
+            # Без версии от вызывающего кода сравниваем с только что прочитанной.
+            updated_candidate = candidate.model_copy(update={
+                "id": existing_candidate.id,
+                "status": existing_candidate.status,
+                "updated_at": datetime.datetime.now(),
+                "version": candidate.version if candidate.version is not None else existing_candidate.version,
+            })
         
-        candidate_id = self._repository.insert_or_update(updated_candidate)
-        return self._repository.get_by_id(candidate_id)
+            candidate_id = self._repository.insert_or_update(updated_candidate)
+            return self._repository.get_by_id(candidate_id)
 
 
     def delete_candidate(self, candidate_id: int) -> None:
@@ -76,10 +251,11 @@ class UseCases:
         :param candidate_id: Уникальный идентификатор.
         :raises ValueError: Если кандидат с указанным ID не найден.
         """
-        candidate = self._repository.get_by_id(candidate_id)
-        if candidate is None:
-            raise ValueError(f"Кандидат с ID {candidate_id} не найден")
-        self._repository.delete(candidate_id)
+        with self._repository.transaction():
+            candidate = self._repository.get_by_id(candidate_id)
+            if candidate is None:
+                raise ValueError(f"Кандидат с ID {candidate_id} не найден")
+            self._repository.delete(candidate_id)
 
     def clear_all_candidates(self) -> None:
         """
@@ -94,40 +270,309 @@ class UseCases:
         Возвращение общего количества кандидатов.
         :return: Общее количество кандидатов в системе.
         """
-        return len(self._repository.get_all())
+        return self._repository.count()
+
+
+    def get_total_candidates_by_status(self) -> Dict[CandidateStatus, int]:
+        """
+        Возвращение количества кандидатов в разрезе статусов.
+        :return: Количество кандидатов для каждого статуса, включая статусы без кандидатов.
+        """
+        return self._repository.count_by_status()
 
 
-    def accept_candidate(self, candidate_id: int) -> None:
+    def get_statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+    ) -> CandidateStatistics:
+        """
+        Статистика воронки подбора: количество кандидатов по статусам, полу и возрастным группам,
+        принятые и отклоненные кандидаты по неделям.
+        :param since: Учитывать только кандидатов, измененных начиная с этого момента.
+        :param until: Учитывать только кандидатов, измененных раньше этого момента.
+        :return: Статистика кандидатов.
+        :raises ValueError: Если since не раньше until.
+        """
+        _check_window(since, until)
+        return self._repository.statistics(since=since, until=until)
+
+
+    def accept_candidate(self, candidate_id: int, expected_version: Optional[int] = None) -> Candidate:
         """
         Принимает кандидата в качестве нового сотрудника.
         Меняет статус кандидата на APPROVED.
         :param candidate_id: Уникальный идентификатор кандидата.
+        :param expected_version: Версия кандидата, которую видел пользователь. Если указана,
+                                 статус меняется, только если кандидата с тех пор не изменяли.
+        :return: Кандидат с новым статусом.
         :raises ValueError: Если кандидат с указанным ID не найден.
+        :raises ConcurrentModificationError: Если версия кандидата не совпадает с expected_version.
         """
-        candidate = self._repository.get_by_id(candidate_id)
-        if candidate is None:
-            raise ValueError(f"Кандидат с ID {candidate_id} не найден")
-        
-        updated_candidate = candidate.model_copy(update={
-            "status": CandidateStatus.APPROVED,
-            "updated_at": datetime.datetime.now()
-        })
-        self._repository.insert_or_update(updated_candidate)
+        return self._change_status(candidate_id, CandidateStatus.APPROVED, expected_version)
 
 
-    def reject_candidate(self, candidate_id: int) -> None:
+    def reject_candidate(self, candidate_id: int, expected_version: Optional[int] = None) -> Candidate:
         """
         Отклоняет кандидата.
         Меняет статус кандидата на REJECTED.
         :param candidate_id: Уникальный идентификатор кандидата.
+        :param expected_version: Версия кандидата, которую видел пользователь. Если указана,
+                                 статус меняется, только если кандидата с тех пор не изменяли.
+        :return: Кандидат с новым статусом.
         :raises ValueError: Если кандидат с указанным ID не найден.
+        :raises ConcurrentModificationError: Если версия кандидата не совпадает с expected_version.
         """
-        candidate = self._repository.get_by_id(candidate_id)
+        return self._change_status(candidate_id, CandidateStatus.REJECTED, expected_version)
+
+
+    def accept_candidates(
+        self,
+        candidate_ids: Iterable[int],
+        expected_status: Optional[CandidateStatus] = None,
+    ) -> StatusChangeResult:
+        """
+        Принимает нескольких кандидатов одной транзакцией.
+        :param candidate_ids: Идентификаторы кандидатов.
+        :param expected_status: Если указан, статус меняется только у кандидатов в этом статусе.
+        :return: Принятые кандидаты, ID, которые не найдены, и ID кандидатов в другом статусе.
+        """
+        return self._repository.set_status(candidate_ids, CandidateStatus.APPROVED, expected_status)
+
+
+    def reject_candidates(
+        self,
+        candidate_ids: Iterable[int],
+        expected_status: Optional[CandidateStatus] = None,
+    ) -> StatusChangeResult:
+        """
+        Отклоняет нескольких кандидатов одной транзакцией.
+        :param candidate_ids: Идентификаторы кандидатов.
+        :param expected_status: Если указан, статус меняется только у кандидатов в этом статусе.
+        :return: Отклоненные кандидаты, ID, которые не найдены, и ID кандидатов в другом статусе.
+        """
+        return self._repository.set_status(candidate_ids, CandidateStatus.REJECTED, expected_status)
+
+
+    def _change_status(
+        self,
+        candidate_id: int,
+        new_status: CandidateStatus,
+        expected_version: Optional[int] = None,
+    ) -> Candidate:
+        """
+        Меняет статус одного кандидата одной атомарной операцией репозитория.
+        С expected_version статус записывается через compare-and-swap по версии (UPDATE ... WHERE version = ?).
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        :raises ConcurrentModificationError: Если версия кандидата не совпадает с expected_version.
+        """
+        result = self._repository.set_status([candidate_id], new_status, expected_version=expected_version)
+        if result.changed:
+            return result.changed[0]
+        if result.conflicting:
+            current = self._repository.get_by_id(candidate_id)
+            raise ConcurrentModificationError(candidate_id, expected_version, current.version if current else None)
+        raise ValueError(f"Кандидат с ID {candidate_id} не найден")
+
+
+class AsyncUseCases:
+    """
+    Бизнес-логика приложения для асинхронного кода (обработчиков HTTP API).
+    Повторяет методы UseCases. Составные сценарии выполняются синхронными UseCases
+    в одной транзакции потока-писателя, поэтому правила предметной области не дублируются.
+    """
+
+    def __init__(self, repository: "AsyncCandidateRepository"):
+        """
+        Инициализация AsyncUseCases.
+        :param repository: Асинхронный репозиторий для работы с кандидатами.
+        """
+        self._repository = repository
+
+    async def run_in_transaction(self, operation: Callable[[UseCases], T]) -> T:
+        """
+        Единица работы: выполняет несколько синхронных сценариев одной транзакцией.
+        :param operation: Функция, получающая UseCases поверх транзакции.
+        :return: Результат операции.
+        """
+        return await self._repository.run_in_transaction(lambda repository: operation(UseCases(repository)))
+
+    async def register_candidate(self, candidate: Candidate) -> int:
+        """
+        Регистрирует нового кандидата.
+        :return: Идентификатор кандидата.
+        """
+        return await self._repository.insert_or_update(candidate)
+
+    async def register_candidates(self, candidates: List[Candidate]) -> int:
+        """
+        Регистрирует пачку новых кандидатов одной операцией записи.
+        :param candidates: Новые кандидаты. Их ID игнорируются.
+        :return: Количество зарегистрированных кандидатов.
+        """
+        if not candidates:
+            return 0
+        return await self._repository.insert_many(candidates)
+
+    async def get_candidate(self, candidate_id: int) -> Candidate:
+        """
+        Возвращает существующего кандидата.
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        """
+        candidate = await self._repository.get_by_id(candidate_id)
         if candidate is None:
             raise ValueError(f"Кандидат с ID {candidate_id} не найден")
-        
-        updated_candidate = candidate.model_copy(update={
-            "status": CandidateStatus.REJECTED,
-            "updated_at": datetime.datetime.now()
-        })
-        self._repository.insert_or_update(updated_candidate)
\ No newline at end of file
+        return candidate
+
+    async def get_candidate_revision(self, candidate_id: int) -> datetime.datetime:
+        """
+        Возвращает время последнего изменения кандидата без загрузки всех его данных.
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        """
+        revision = await self._repository.get_revision(candidate_id)
+        if revision is None:
+            raise ValueError(f"Кандидат с ID {candidate_id} не найден")
+        return revision
+
+    async def get_candidates_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        """Возвращает признаки изменения набора кандидатов"""
+        return await self._repository.get_collection_revision()
+
+    async def get_all_candidates(self) -> List[Candidate]:
+        """Возвращает список всех кандидатов"""
+        return await self._repository.get_all()
+
+    def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> AsyncIterator[Candidate]:
+        """Постранично перебирает кандидатов в порядке возрастания ID"""
+        return self._repository.iter_candidates(after_id=after_id, limit=limit, page_size=page_size)
+
+    async def find_candidates(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        """
+        Ищет кандидатов по статусу, началу фамилии и времени изменения.
+        :raises ValueError: Если поле сортировки не поддерживается.
+        """
+        return await self._repository.find(
+            status=status,
+            last_name_prefix=last_name_prefix,
+            updated_after=updated_after,
+            order_by=order_by,
+            limit=limit,
+            after_id=after_id,
+        )
+
+    async def search_candidates(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        """Полнотекстовый поиск кандидатов по имени, фамилии и комментариям"""
+        return await self._repository.search(query, limit=limit, highlight=highlight)
+
+    def export_candidates(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+    ) -> AsyncIterator[Candidate]:
+        """Потоково выгружает кандидатов из согласованного снимка данных"""
+        return self._repository.iter_snapshot(status=status, updated_since=updated_since)
+
+    async def edit_candidate(self, candidate: Candidate) -> Candidate:
+        """
+        Редактирование кандидата.
+        :raises ValueError: Если кандидат с указанным ID не найден или ID не указан.
+        """
+        return await self.run_in_transaction(lambda use_cases: use_cases.edit_candidate(candidate))
+
+    async def delete_candidate(self, candidate_id: int) -> None:
+        """
+        Удаление кандидата.
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        """
+        await self.run_in_transaction(lambda use_cases: use_cases.delete_candidate(candidate_id))
+
+    async def clear_all_candidates(self) -> None:
+        """Очищает репозиторий от всех данных"""
+        await self._repository.clear_all()
+
+    async def get_total_candidates(self) -> int:
+        """Возвращение общего количества кандидатов"""
+        return await self._repository.count()
+
+    async def get_total_candidates_by_status(self) -> Dict[CandidateStatus, int]:
+        """Возвращение количества кандидатов в разрезе статусов"""
+        return await self._repository.count_by_status()
+
+    async def get_statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+    ) -> CandidateStatistics:
+        """
+        Статистика воронки подбора.
+        :raises ValueError: Если since не раньше until.
+        """
+        _check_window(since, until)
+        return await self._repository.statistics(since=since, until=until)
+
+    async def accept_candidate(self, candidate_id: int, expected_version: Optional[int] = None) -> Candidate:
+        """
+        Принимает кандидата в качестве нового сотрудника.
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        """
+        return await self._change_status(candidate_id, CandidateStatus.APPROVED, expected_version)
+
+    async def reject_candidate(self, candidate_id: int, expected_version: Optional[int] = None) -> Candidate:
+        """
+        Отклоняет кандидата.
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        """
+        return await self._change_status(candidate_id, CandidateStatus.REJECTED, expected_version)
+
+    async def accept_candidates(
+        self,
+        candidate_ids: Iterable[int],
+        expected_status: Optional[CandidateStatus] = None,
+    ) -> StatusChangeResult:
+        """Принимает нескольких кандидатов одной транзакцией (только в статусе expected_status, если он указан)"""
+        return await self._repository.set_status(candidate_ids, CandidateStatus.APPROVED, expected_status)
+
+    async def reject_candidates(
+        self,
+        candidate_ids: Iterable[int],
+        expected_status: Optional[CandidateStatus] = None,
+    ) -> StatusChangeResult:
+        """Отклоняет нескольких кандидатов одной транзакцией (только в статусе expected_status, если он указан)"""
+        return await self._repository.set_status(candidate_ids, CandidateStatus.REJECTED, expected_status)
+
+    async def _change_status(
+        self,
+        candidate_id: int,
+        new_status: CandidateStatus,
+        expected_version: Optional[int] = None,
+    ) -> Candidate:
+        """
+        Меняет статус одного кандидата одной атомарной операцией репозитория.
+        :raises ValueError: Если кандидат с указанным ID не найден.
+        :raises ConcurrentModificationError: Если версия кандидата не совпадает с expected_version.
+        """
+        result = await self._repository.set_status([candidate_id], new_status, expected_version=expected_version)
+        if result.changed:
+            return result.changed[0]
+        if result.conflicting:
+            current = await self._repository.get_by_id(candidate_id)
+            raise ConcurrentModificationError(candidate_id, expected_version, current.version if current else None)
+        raise ValueError(f"Кандидат с ID {candidate_id} не найден")
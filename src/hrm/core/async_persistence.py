@@ -0,0 +1,337 @@
+"""Асинхронный доступ к хранилищу кандидатов"""
+import asyncio
+import datetime
+import itertools
+import queue
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from hrm.core.model import Candidate, CandidateSearchHit, CandidateStatistics, CandidateStatus, StatusChangeResult
+from hrm.core.persistence import DEFAULT_HIGHLIGHT, CandidateRepository, SqliteCandidateRepository
+
+
+T = TypeVar("T")
+
+
+class AsyncCandidateRepository(ABC):
+    """
+    Асинхронный репозиторий кандидатов.
+    Повторяет CandidateRepository, но не блокирует цикл событий: обращения к хранилищу
+    выполняются вне потока asyncio.
+    """
+
+    @abstractmethod
+    async def get_all(self) -> List[Candidate]:
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, candidate_id: int) -> Optional[Candidate]:
+        pass
+
+    @abstractmethod
+    async def get_revision(self, candidate_id: int) -> Optional[datetime.datetime]:
+        pass
+
+    @abstractmethod
+    async def get_collection_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        pass
+
+    @abstractmethod
+    def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> AsyncIterator[Candidate]:
+        """Асинхронно перебирает кандидатов в порядке возрастания ID страницами по page_size"""
+        pass
+
+    @abstractmethod
+    def iter_snapshot(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+        fetch_size: int = 1000,
+    ) -> AsyncIterator[Candidate]:
+        """Асинхронно перебирает кандидатов из согласованного снимка данных"""
+        pass
+
+    @abstractmethod
+    async def find(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        pass
+
+    @abstractmethod
+    async def count(self) -> int:
+        pass
+
+    @abstractmethod
+    async def count_by_status(self) -> Dict[CandidateStatus, int]:
+        pass
+
+    @abstractmethod
+    async def statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        as_of: Optional[datetime.date] = None,
+    ) -> CandidateStatistics:
+        pass
+
+    @abstractmethod
+    async def insert_or_update(self, candidate: Candidate) -> int:
+        pass
+
+    @abstractmethod
+    async def insert_many(self, candidates: Iterable[Candidate]) -> int:
+        pass
+
+    @abstractmethod
+    async def set_status(
+        self,
+        candidate_ids: Iterable[int],
+        new_status: CandidateStatus,
+        expected_status: Optional[CandidateStatus] = None,
+        expected_version: Optional[int] = None,
+    ) -> StatusChangeResult:
+        pass
+
+    @abstractmethod
+    async def delete(self, candidate_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def clear_all(self) -> None:
+        pass
+
+    @abstractmethod
+    async def run_in_transaction(self, operation: Callable[[CandidateRepository], T]) -> T:
+        """
+        Выполняет синхронную операцию над репозиторием в одной транзакции.
+        Так составные сценарии (чтение-изменение-запись) остаются атомарными.
+        :param operation: Функция, получающая синхронный репозиторий.
+        :return: Результат операции.
+        """
+        pass
+
+    async def close(self) -> None:
+        """Освобождает ресурсы репозитория"""
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+
+class AsyncSqliteCandidateRepository(AsyncCandidateRepository):
+    """
+    Асинхронный репозиторий поверх SqliteCandidateRepository.
+    Все записи выполняются в одном выделенном потоке-писателе на его единственном соединении,
+    поэтому не конкурируют между собой за блокировку. Чтения идут через пул соединений-читателей
+    в собственных потоках: в режиме WAL они выполняются параллельно друг с другом и с записью.
+    """
+
+    DEFAULT_READERS = 4
+
+    def __init__(
+        self,
+        db_file: Path = None,
+        readers: int = DEFAULT_READERS,
+        pragmas: Optional[Dict[str, object]] = None,
+    ):
+        """
+        Инициализация репозитория.
+        :param db_file: Путь к файлу базы данных (как у SqliteCandidateRepository).
+        :param readers: Количество соединений-читателей. Для БД в памяти читатели не создаются
+                        и чтения выполняются потоком-писателем.
+        :param pragmas: Дополнительные PRAGMA соединений.
+        """
+        self._writer = SqliteCandidateRepository(db_file, pragmas=pragmas)
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hrm-sqlite-writer")
+        self._readers: "queue.Queue[SqliteCandidateRepository]" = queue.Queue()
+        reader_count = 0 if str(self._writer.db_file) == ":memory:" else readers
+        for _ in range(reader_count):
+            self._readers.put(SqliteCandidateRepository(self._writer.db_file, pragmas=pragmas))
+        self._reader_executor = (
+            ThreadPoolExecutor(max_workers=reader_count, thread_name_prefix="hrm-sqlite-reader")
+            if reader_count else None
+        )
+
+    @property
+    def db_file(self) -> Path:
+        """Путь к файлу базы данных"""
+        return self._writer.db_file
+
+    async def _write(self, operation: Callable[[SqliteCandidateRepository], T]) -> T:
+        """Выполняет операцию в потоке-писателе"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer_executor, operation, self._writer)
+
+    def _with_reader(self, operation: Callable[[SqliteCandidateRepository], T]) -> T:
+        """Выполняет операцию на свободном соединении-читателе (вызывается в потоке пула)"""
+        reader = self._readers.get()
+        try:
+            return operation(reader)
+        finally:
+            self._readers.put(reader)
+
+    async def _read(self, operation: Callable[[SqliteCandidateRepository], T]) -> T:
+        """Выполняет операцию чтения в пуле читателей"""
+        if self._reader_executor is None:
+            return await self._write(operation)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._reader_executor, self._with_reader, operation)
+
+    async def get_all(self) -> List[Candidate]:
+        return await self._read(lambda repo: repo.get_all())
+
+    async def get_by_id(self, candidate_id: int) -> Optional[Candidate]:
+        return await self._read(lambda repo: repo.get_by_id(candidate_id))
+
+    async def get_revision(self, candidate_id: int) -> Optional[datetime.datetime]:
+        return await self._read(lambda repo: repo.get_revision(candidate_id))
+
+    async def get_collection_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        return await self._read(lambda repo: repo.get_collection_revision())
+
+    async def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> AsyncIterator[Candidate]:
+        """Каждая страница читается отдельным запросом (keyset по ID), между страницами цикл событий свободен"""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = await self._read(lambda repo: [*repo.iter_candidates(after_id=after_id, limit=size, page_size=size)])
+            for candidate in page:
+                yield candidate
+            if len(page) < size:
+                break
+            after_id = page[-1].id
+            if remaining is not None:
+                remaining -= len(page)
+
+    async def iter_snapshot(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+        fetch_size: int = 1000,
+    ) -> AsyncIterator[Candidate]:
+        """
+        Снимок удерживает собственное соединение только для чтения, поэтому порции
+        по fetch_size можно дочитывать из любого потока пула, не занимая читателя надолго.
+        """
+        snapshot = self._writer.iter_snapshot(status=status, updated_since=updated_since, fetch_size=fetch_size)
+        try:
+            while True:
+                chunk = await self._read(lambda repo: [*itertools.islice(snapshot, fetch_size)])
+                for candidate in chunk:
+                    yield candidate
+                if len(chunk) < fetch_size:
+                    break
+        finally:
+            await self._read(lambda repo: snapshot.close())
+
+    async def find(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        return await self._read(lambda repo: repo.find(
+            status=status,
+            last_name_prefix=last_name_prefix,
+            updated_after=updated_after,
+            order_by=order_by,
+            limit=limit,
+            after_id=after_id,
+        ))
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        return await self._read(lambda repo: repo.search(query, limit=limit, highlight=highlight))
+
+    async def count(self) -> int:
+        return await self._read(lambda repo: repo.count())
+
+    async def count_by_status(self) -> Dict[CandidateStatus, int]:
+        return await self._read(lambda repo: repo.count_by_status())
+
+    async def statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        as_of: Optional[datetime.date] = None,
+    ) -> CandidateStatistics:
+        return await self._read(lambda repo: repo.statistics(since=since, until=until, as_of=as_of))
+
+    async def insert_or_update(self, candidate: Candidate) -> int:
+        return await self._write(lambda repo: repo.insert_or_update(candidate))
+
+    async def insert_many(self, candidates: Iterable[Candidate]) -> int:
+        # Материализуем здесь: генератор не должен выполняться в потоке-писателе
+        candidates = [*candidates]
+        return await self._write(lambda repo: repo.insert_many(candidates))
+
+    async def set_status(
+        self,
+        candidate_ids: Iterable[int],
+        new_status: CandidateStatus,
+        expected_status: Optional[CandidateStatus] = None,
+        expected_version: Optional[int] = None,
+    ) -> StatusChangeResult:
+        candidate_ids = [*candidate_ids]
+        return await self._write(
+            lambda repo: repo.set_status(candidate_ids, new_status, expected_status, expected_version)
+        )
+
+    async def delete(self, candidate_id: int) -> None:
+        await self._write(lambda repo: repo.delete(candidate_id))
+
+    async def clear_all(self) -> None:
+        await self._write(lambda repo: repo.clear_all())
+
+    async def run_in_transaction(self, operation: Callable[[CandidateRepository], T]) -> T:
+        def run(repo: SqliteCandidateRepository) -> T:
+            with repo.transaction():
+                return operation(repo)
+        return await self._write(run)
+
+    async def close(self) -> None:
+        """Дожидается завершения начатых операций и закрывает все соединения"""
+        loop = asyncio.get_running_loop()
+        if self._reader_executor is not None:
+            await loop.run_in_executor(None, self._reader_executor.shutdown)
+            while not self._readers.empty():
+                self._readers.get().close()
+        await loop.run_in_executor(None, self._writer_executor.shutdown)
+        self._writer.close()
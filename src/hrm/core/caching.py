@@ -0,0 +1,337 @@
+"""Кэширующий декоратор репозитория кандидатов"""
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from hrm.core.model import Candidate, CandidateSearchHit, CandidateStatistics, CandidateStatus, StatusChangeResult
+from hrm.core.persistence import DEFAULT_HIGHLIGHT, CandidateRepository
+
+
+@dataclass
+class CacheStats:
+    """
+    Статистика кэша.
+    """
+
+    hits: int = 0
+
+    misses: int = 0
+
+    evictions: int = 0
+    """
+    Записи, вытесненные из-за ограничения размера кэша.
+    """
+
+    expirations: int = 0
+    """
+    Записи, устаревшие по TTL.
+    """
+
+    invalidations: int = 0
+    """
+    Сбросы кэша из-за записи или изменения данных другим процессом.
+    """
+
+    @property
+    def hit_ratio(self) -> float:
+        """Доля попаданий среди всех обращений"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachingCandidateRepository(CandidateRepository):
+    """
+    Декоратор репозитория со сквозным чтением через кэш.
+    Хранит ограниченный LRU-кэш кандидатов по ID и результаты get_all/find/count/count_by_status.
+    Размер кэша запросов считается в строках: результат, в котором больше max_size кандидатов,
+    не кэшируется, поэтому get_all большой таблицы каждый раз читается из хранилища.
+    Записи через декоратор сбрасывают затронутые данные. Изменения, сделанные другими процессами,
+    по запросу (external_changes_interval) обнаруживаются по data_version() обернутого репозитория
+    (для SQLite - PRAGMA data_version).
+    Итераторы и полнотекстовый поиск не кэшируются.
+    Кандидаты выдаются копиями: изменение полученного объекта не меняет содержимое кэша.
+    """
+
+    def __init__(
+        self,
+        repository: CandidateRepository,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+        external_changes_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Инициализация кэша.
+        :param repository: Обертываемый репозиторий.
+        :param max_size: Максимальное количество кандидатов в кэше по ID и суммарное количество строк
+                         в закэшированных результатах запросов (запрос без списка считается одной строкой).
+        :param ttl: Время жизни записи в секундах. None - без ограничения.
+        :param external_changes_interval: Как часто (в секундах) проверять data_version() перед чтением:
+                                          0 - перед каждым чтением, None - не проверять. Без проверки
+                                          изменения других процессов видны после TTL или invalidate().
+        :param clock: Источник времени для TTL.
+        """
+        self._repository = repository
+        self._max_size = max_size
+        self._ttl = ttl
+        self._external_changes_interval = external_changes_interval
+        self._next_external_check = float("-inf")
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._candidates: "OrderedDict[int, Tuple[float, Candidate, int]]" = OrderedDict()
+        self._queries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._query_rows = 0
+        self._stats = CacheStats()
+        self._data_version = repository.data_version() if external_changes_interval is not None else None
+
+    @property
+    def repository(self) -> CandidateRepository:
+        """Обернутый репозиторий"""
+        return self._repository
+
+    def stats(self) -> CacheStats:
+        """Возвращает копию статистики кэша"""
+        with self._lock:
+            return replace(self._stats)
+
+    def invalidate(self) -> None:
+        """Полностью очищает кэш"""
+        with self._lock:
+            self._candidates.clear()
+            self._queries.clear()
+            self._query_rows = 0
+            self._stats.invalidations += 1
+
+    def _check_external_changes(self) -> None:
+        """Сбрасывает кэш, если данные изменил другой процесс; не чаще external_changes_interval"""
+        if self._external_changes_interval is None:
+            return
+        now = self._clock()
+        if now < self._next_external_check:
+            return
+        self._next_external_check = now + self._external_changes_interval
+        data_version = self._repository.data_version()
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self.invalidate()
+
+    def _lookup(self, cache: "OrderedDict[Hashable, Tuple[float, Any, int]]", key: Hashable) -> Tuple[bool, Any]:
+        """
+        Ищет значение в кэше, учитывая TTL, и поднимает его в начало LRU-очереди.
+        :return: Пара (найдено, значение).
+        """
+        entry = cache.get(key)
+        if entry is not None:
+            expires_at, value, _ = entry
+            if expires_at >= self._clock():
+                cache.move_to_end(key)
+                self._stats.hits += 1
+                return True, value
+            self._discard(cache, key)
+            self._stats.expirations += 1
+        self._stats.misses += 1
+        return False, None
+
+    def _discard(self, cache: "OrderedDict[Hashable, Tuple[float, Any, int]]", key: Hashable) -> None:
+        """Удаляет запись из кэша, если она есть"""
+        entry = cache.pop(key, None)
+        if entry is not None and cache is self._queries:
+            self._query_rows -= entry[2]
+
+    def _remember(
+        self,
+        cache: "OrderedDict[Hashable, Tuple[float, Any, int]]",
+        key: Hashable,
+        value: Any,
+        rows: int = 1,
+    ) -> None:
+        """
+        Кладет значение в кэш, вытесняя самые давно использованные записи.
+        :param rows: Количество строк в значении; значение больше всего кэша не запоминается.
+        """
+        if rows > self._max_size:
+            return
+        self._discard(cache, key)
+        expires_at = self._clock() + self._ttl if self._ttl is not None else float("inf")
+        cache[key] = (expires_at, value, rows)
+        if cache is self._queries:
+            self._query_rows += rows
+        while len(cache) > self._max_size or self._query_rows > self._max_size:
+            self._discard(cache, next(iter(cache)))
+            self._stats.evictions += 1
+
+    def _cached_query(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Возвращает результат запроса из кэша или выполняет его"""
+        with self._lock:
+            self._check_external_changes()
+            found, value = self._lookup(self._queries, key)
+            if not found:
+                value = load()
+                self._remember(self._queries, key, value, len(value) if isinstance(value, list) else 1)
+            return [*value] if isinstance(value, list) else value
+
+    def _written(self, candidate_ids: Iterable[int] = ()) -> None:
+        """
+        Сбрасывает данные, затронутые записью этого процесса.
+        Собственные записи не меняют data_version, поэтому запомненная версия остается актуальной.
+        """
+        for candidate_id in candidate_ids:
+            self._candidates.pop(candidate_id, None)
+        self._queries.clear()
+        self._query_rows = 0
+
+    def get_all(self) -> List[Candidate]:
+        return _copies(self._cached_query(("get_all",), self._repository.get_all))
+
+    def get_by_id(self, candidate_id: int) -> Optional[Candidate]:
+        with self._lock:
+            self._check_external_changes()
+            found, candidate = self._lookup(self._candidates, candidate_id)
+            if not found:
+                candidate = self._repository.get_by_id(candidate_id)
+                if candidate is not None:
+                    self._remember(self._candidates, candidate_id, candidate)
+            return candidate.model_copy() if candidate is not None else None
+
+    def get_revision(self, candidate_id: int) -> Optional[datetime.datetime]:
+        with self._lock:
+            self._check_external_changes()
+            found, candidate = self._lookup(self._candidates, candidate_id)
+            if found:
+                return candidate.updated_at
+            return self._repository.get_revision(candidate_id)
+
+    def get_collection_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        return self._cached_query(("get_collection_revision",), self._repository.get_collection_revision)
+
+    def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[Candidate]:
+        return self._repository.iter_candidates(after_id=after_id, limit=limit, page_size=page_size)
+
+    def iter_snapshot(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+        fetch_size: int = 1000,
+    ) -> Iterator[Candidate]:
+        return self._repository.iter_snapshot(status=status, updated_since=updated_since, fetch_size=fetch_size)
+
+    def find(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        return _copies(self._cached_query(
+            ("find", status, last_name_prefix, updated_after, order_by, limit, after_id),
+            lambda: self._repository.find(
+                status=status,
+                last_name_prefix=last_name_prefix,
+                updated_after=updated_after,
+                order_by=order_by,
+                limit=limit,
+                after_id=after_id,
+            ),
+        ))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        return self._repository.search(query, limit=limit, highlight=highlight)
+
+    def count(self) -> int:
+        return self._cached_query(("count",), self._repository.count)
+
+    def count_by_status(self) -> Dict[CandidateStatus, int]:
+        return dict(self._cached_query(("count_by_status",), self._repository.count_by_status))
+
+    def statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        as_of: Optional[datetime.date] = None,
+    ) -> CandidateStatistics:
+        as_of = as_of or datetime.date.today()
+        return self._cached_query(
+            ("statistics", since, until, as_of),
+            lambda: self._repository.statistics(since=since, until=until, as_of=as_of),
+        ).model_copy(deep=True)
+
+    def insert_or_update(self, candidate: Candidate) -> int:
+        with self._lock:
+            try:
+                return self._repository.insert_or_update(candidate)
+            finally:
+                # В том числе при конфликте версий: закэшированная копия кандидата устарела
+                if candidate.id is not None:
+                    self._written([candidate.id])
+                else:
+                    self._written()
+
+    def insert_many(self, candidates: Iterable[Candidate]) -> int:
+        with self._lock:
+            inserted = self._repository.insert_many(candidates)
+            self._written()
+            return inserted
+
+    def set_status(
+        self,
+        candidate_ids: Iterable[int],
+        new_status: CandidateStatus,
+        expected_status: Optional[CandidateStatus] = None,
+        expected_version: Optional[int] = None,
+    ) -> StatusChangeResult:
+        with self._lock:
+            result = self._repository.set_status(candidate_ids, new_status, expected_status, expected_version)
+            self._written(candidate.id for candidate in result.changed)
+            return result
+
+    def delete(self, candidate_id: int) -> None:
+        with self._lock:
+            self._repository.delete(candidate_id)
+            self._written([candidate_id])
+
+    def clear_all(self) -> None:
+        with self._lock:
+            self._repository.clear_all()
+            self._candidates.clear()
+            self._written()
+
+    @contextmanager
+    def transaction(self) -> Iterator["CachingCandidateRepository"]:
+        """
+        Транзакция обернутого репозитория. Внутри неё кэш может запомнить незафиксированные
+        данные, поэтому при откате он очищается целиком.
+        """
+        with self._lock:
+            try:
+                with self._repository.transaction():
+                    yield self
+            except BaseException:
+                self.invalidate()
+                raise
+
+    def data_version(self) -> Optional[int]:
+        return self._repository.data_version()
+
+    def close(self) -> None:
+        self._repository.close()
+
+
+def _copies(candidates: List[Candidate]) -> List[Candidate]:
+    """Копии кандидатов из кэша; поля кандидата неизменяемы, поэтому поверхностной копии достаточно"""
+    return [candidate.model_copy() for candidate in candidates]
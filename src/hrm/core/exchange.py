@@ -0,0 +1,278 @@
+"""Импорт и экспорт кандидатов в файлы CSV и JSON Lines"""
+import csv
+import datetime
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from hrm.core.model import Candidate, CandidateSex, CandidateStatus
+
+
+FIELDS = ("id", "first_name", "last_name", "phone", "birth_date", "sex", "status", "comments", "updated_at")
+"""
+Колонки файлов обмена. При импорте обязательны только first_name и last_name.
+"""
+
+CSV_SUFFIXES = (".csv",)
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+GZIP_SUFFIX = ".gz"
+
+
+@dataclass
+class RowError:
+    """
+    Ошибка разбора одной строки импортируемого файла.
+    """
+
+    line: int
+    """
+    Номер строки в файле (с единицы).
+    """
+
+    message: str
+
+
+def detect_format(path: Path) -> str:
+    """
+    Определяет формат файла по расширению.
+    :param path: Путь к файлу
+    :return: "csv" или "jsonl"
+    :raises ValueError: Если расширение не поддерживается.
+    """
+    suffix = path.suffix.lower()
+    if suffix == GZIP_SUFFIX:
+        suffix = Path(path.stem).suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        return "csv"
+    if suffix in JSONL_SUFFIXES:
+        return "jsonl"
+    raise ValueError(f"Неподдерживаемый формат файла '{path.name}'. Используйте .csv или .jsonl")
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _is_gzip(path: Path) -> bool:
+    """Сжат ли файл gzip - по сигнатуре, а не по расширению (hrm export --gzip не меняет имя файла)"""
+    with open(path, "rb") as f:
+        return f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def _open_text(path: Path, encoding: str) -> IO[str]:
+    """Открывает текстовый файл для чтения, прозрачно распаковывая gzip"""
+    if _is_gzip(path):
+        return gzip.open(path, "rt", encoding=encoding, newline="")
+    return open(path, "r", encoding=encoding, newline="")
+
+
+def read_records(path: Path) -> Iterator[Tuple[int, Any]]:
+    """
+    Построчно читает записи из файла CSV или JSON Lines (в том числе сжатого gzip - определяется
+    по содержимому файла), не загружая его целиком.
+    :param path: Путь к файлу
+    :return: Итератор пар (номер строки, запись). Нераспознанная строка JSON Lines
+             возвращается как RowError вместо записи.
+    """
+    file_format = detect_format(path)
+    # utf-8-sig: выгрузки из Excel начинаются с BOM
+    with _open_text(path, "utf-8-sig") as f:
+        if file_format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, RowError(line_number, f"Некорректный JSON: {e.msg}")
+
+
+def _empty_to_none(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _parse_date(value: Any, field: str) -> Optional[datetime.datetime]:
+    value = _empty_to_none(value)
+    if value is None:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"{field}: неверный формат даты '{value}', используйте YYYY-MM-DD")
+
+
+def _parse_sex(value: Any) -> Optional[CandidateSex]:
+    value = _empty_to_none(value)
+    if value is None:
+        return None
+    text = str(value).upper()
+    if text in ("M", "MALE", "1"):
+        return CandidateSex.MALE
+    if text in ("F", "FEMALE", "2"):
+        return CandidateSex.FEMALE
+    raise ValueError(f"sex: неверное значение '{value}', используйте M или F")
+
+
+def _parse_status(value: Any) -> CandidateStatus:
+    value = _empty_to_none(value)
+    if value is None:
+        return CandidateStatus.REGISTERED
+    text = str(value).upper()
+    if text in CandidateStatus.__members__:
+        return CandidateStatus[text]
+    try:
+        return CandidateStatus(int(text))
+    except ValueError:
+        raise ValueError(f"status: неизвестный статус '{value}'")
+
+
+def record_to_candidate(record: Dict[str, Any]) -> Candidate:
+    """
+    Преобразует запись файла в нового (еще не зарегистрированного) кандидата.
+    Колонка id игнорируется, пустой статус означает REGISTERED.
+    :param record: Словарь значений колонок
+    :return: Провалидированный кандидат
+    :raises ValueError: Если значения колонок некорректны.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("запись должна быть объектом")
+    values = {
+        "first_name": _empty_to_none(record.get("first_name")),
+        "last_name": _empty_to_none(record.get("last_name")),
+        "phone": _empty_to_none(record.get("phone")),
+        "birth_date": _parse_date(record.get("birth_date"), "birth_date"),
+        "sex": _parse_sex(record.get("sex")),
+        "status": _parse_status(record.get("status")),
+        "comments": _empty_to_none(record.get("comments")),
+    }
+    updated_at = _parse_date(record.get("updated_at"), "updated_at")
+    if updated_at is not None:
+        values["updated_at"] = updated_at
+    return Candidate(**values)
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def parse_batch(records: Iterable[Tuple[int, Any]]) -> Tuple[List[Candidate], List[RowError]]:
+    """
+    Валидирует пачку записей.
+    :param records: Пары (номер строки, запись)
+    :return: Кортеж (валидные кандидаты, ошибки по строкам)
+    """
+    candidates: List[Candidate] = []
+    errors: List[RowError] = []
+    for line, record in records:
+        if isinstance(record, RowError):
+            errors.append(record)
+            continue
+        try:
+            candidates.append(record_to_candidate(record))
+        except ValidationError as e:
+            errors.append(RowError(line, _format_validation_error(e)))
+        except ValueError as e:
+            errors.append(RowError(line, str(e)))
+    return candidates, errors
+
+
+def batched(records: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """
+    Группирует поток записей в пачки заданного размера.
+    """
+    batch: List[Any] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def candidate_to_record(candidate: Candidate) -> Dict[str, Any]:
+    """
+    Преобразует кандидата в запись файла обмена.
+    Формат совместим с record_to_candidate, поэтому выгрузку можно загрузить обратно.
+    """
+    sex = None
+    if candidate.sex == CandidateSex.MALE:
+        sex = "M"
+    elif candidate.sex == CandidateSex.FEMALE:
+        sex = "F"
+    return {
+        "id": candidate.id,
+        "first_name": candidate.first_name,
+        "last_name": candidate.last_name,
+        "phone": candidate.phone,
+        "birth_date": candidate.birth_date.strftime("%Y-%m-%d") if candidate.birth_date else None,
+        "sex": sex,
+        "status": candidate.status.name,
+        "comments": candidate.comments,
+        "updated_at": candidate.updated_at.isoformat() if candidate.updated_at else None,
+    }
+
+
+def write_records(candidates: Iterable[Candidate], out: IO[str], file_format: str) -> int:
+    """
+    Построчно записывает кандидатов в открытый текстовый поток.
+    :param candidates: Поток кандидатов
+    :param out: Текстовый поток для записи
+    :param file_format: "csv" или "jsonl"
+    :return: Количество записанных кандидатов
+    """
+    written = 0
+    if file_format == "csv":
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+        for candidate in candidates:
+            writer.writerow(candidate_to_record(candidate))
+            written += 1
+    elif file_format == "jsonl":
+        for candidate in candidates:
+            out.write(json.dumps(candidate_to_record(candidate), ensure_ascii=False))
+            out.write("\n")
+            written += 1
+    else:
+        raise ValueError(f"Неподдерживаемый формат '{file_format}'. Используйте csv или jsonl")
+    return written
+
+
+def export_to_file(candidates: Iterable[Candidate], path: Path, file_format: str, compress: bool = False) -> int:
+    """
+    Выгружает кандидатов в файл.
+    Запись идет во временный файл рядом с целевым, который атомарно переименовывается
+    после успешного завершения, поэтому потребители никогда не видят частичную выгрузку.
+    :param candidates: Поток кандидатов
+    :param path: Путь к файлу результата
+    :param file_format: "csv" или "jsonl"
+    :param compress: Сжимать результат gzip
+    :return: Количество выгруженных кандидатов
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        if compress:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as out:
+                written = write_records(candidates, out, file_format)
+        else:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+                written = write_records(candidates, out, file_format)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return written
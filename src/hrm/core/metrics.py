@@ -0,0 +1,205 @@
+"""
+Метрики операций UseCases и репозиториев: количество вызовов, ошибок и гистограммы длительности
+в текстовом формате Prometheus.
+Сбор включается оберткой instrument() в Composition Root; необернутые объекты не платят за метрики ничего.
+"""
+import bisect
+import functools
+import inspect
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+"""
+Верхние границы корзин гистограммы длительности, секунды.
+"""
+
+_Key = Tuple[str, str, str]
+
+
+class _Series:
+    """Накопленные значения одной операции"""
+
+    __slots__ = ("calls", "failures", "duration_sum", "buckets")
+
+    def __init__(self, buckets: int):
+        self.calls = 0
+        self.failures = 0
+        self.duration_sum = 0.0
+        # Последняя корзина - длительности больше всех границ (+Inf)
+        self.buckets = [0] * (buckets + 1)
+
+
+class Metrics:
+    """
+    Потокобезопасный реестр метрик операций.
+    Операция определяется слоем (use_cases, repository), именем метода и хранилищем.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param buckets: Возрастающие верхние границы корзин гистограммы длительности, секунды.
+        """
+        self._bounds = buckets
+        self._series: Dict[_Key, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, layer: str, operation: str, backend: str, duration: float, failed: bool = False) -> None:
+        """
+        Учитывает один вызов операции.
+        :param layer: Слой приложения.
+        :param operation: Имя операции.
+        :param backend: Хранилище.
+        :param duration: Длительность вызова, секунды.
+        :param failed: Вызов завершился исключением.
+        """
+        bucket = bisect.bisect_left(self._bounds, duration)
+        with self._lock:
+            series = self._series.get((layer, operation, backend))
+            if series is None:
+                series = self._series[(layer, operation, backend)] = _Series(len(self._bounds))
+            series.calls += 1
+            series.failures += failed
+            series.duration_sum += duration
+            series.buckets[bucket] += 1
+
+    def calls(self, layer: str, operation: str, backend: str) -> Tuple[int, int]:
+        """
+        :return: Количество вызовов операции и количество вызовов, завершившихся ошибкой.
+        """
+        with self._lock:
+            series = self._series.get((layer, operation, backend))
+            return (series.calls, series.failures) if series else (0, 0)
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus (text/plain; version=0.0.4)"""
+        with self._lock:
+            snapshot = sorted(
+                (key, series.calls, series.failures, series.duration_sum, [*series.buckets])
+                for key, series in self._series.items()
+            )
+        lines = [
+            "# HELP hrm_operation_calls_total Количество вызовов операции",
+            "# TYPE hrm_operation_calls_total counter",
+        ]
+        lines += [f"hrm_operation_calls_total{{{_labels(key)}}} {calls}" for key, calls, _, _, _ in snapshot]
+        lines += [
+            "# HELP hrm_operation_failures_total Количество вызовов операции, завершившихся ошибкой",
+            "# TYPE hrm_operation_failures_total counter",
+        ]
+        lines += [f"hrm_operation_failures_total{{{_labels(key)}}} {failures}" for key, _, failures, _, _ in snapshot]
+        lines += [
+            "# HELP hrm_operation_duration_seconds Длительность операции",
+            "# TYPE hrm_operation_duration_seconds histogram",
+        ]
+        for key, calls, _, duration_sum, buckets in snapshot:
+            labels = _labels(key)
+            cumulative = 0
+            for bound, count in zip(self._bounds, buckets):
+                cumulative += count
+                lines.append(f'hrm_operation_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'hrm_operation_duration_seconds_bucket{{{labels},le="+Inf"}} {calls}')
+            lines.append(f"hrm_operation_duration_seconds_sum{{{labels}}} {duration_sum!r}")
+            lines.append(f"hrm_operation_duration_seconds_count{{{labels}}} {calls}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """
+        Записывает метрики в файл (формат textfile collector node_exporter).
+        Файл заменяется атомарно, поэтому сборщик не прочитает его наполовину записанным.
+        """
+        path = Path(path)
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_text(self.render(), encoding="utf-8")
+        temporary.replace(path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: _Key) -> str:
+    layer, operation, backend = key
+    return f'layer="{_escape(layer)}",operation="{_escape(operation)}",backend="{_escape(backend)}"'
+
+
+class _Instrumented:
+    """
+    Заместитель объекта, который замеряет вызовы его публичных методов.
+    Для итераторов и менеджеров контекста замеряется только их создание.
+    """
+
+    def __init__(self, target: Any, metrics: Metrics, layer: str, backend: str):
+        self._target = target
+        self._metrics = metrics
+        self._layer = layer
+        self._backend = backend
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        if name.startswith("_") or not callable(value):
+            return value
+        wrapper = _timed(value, self._metrics.observe, self._layer, name, self._backend)
+        # Обертка кэшируется в атрибутах заместителя: следующие обращения не доходят до __getattr__
+        self.__dict__[name] = wrapper
+        return wrapper
+
+    def __enter__(self):
+        self._target.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._target.__exit__(exc_type, exc_value, traceback)
+
+
+def _timed(method: Callable, observe: Callable, layer: str, operation: str, backend: str) -> Callable:
+    """Оборачивает метод замером длительности; для корутин замеряется время до получения результата"""
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def timed_coroutine(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await method(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                observe(layer, operation, backend, time.perf_counter() - started, failed)
+        return timed_coroutine
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = method(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            observe(layer, operation, backend, time.perf_counter() - started, failed)
+    return timed
+
+
+def instrument(target: T, metrics: Metrics, layer: str, backend: str) -> T:
+    """
+    Оборачивает UseCases или репозиторий (синхронные или асинхронные) сбором метрик.
+    :param target: Оборачиваемый объект.
+    :param metrics: Реестр метрик.
+    :param layer: Слой приложения: use_cases или repository.
+    :param backend: Хранилище, например sqlite или json.
+    :return: Заместитель с теми же методами.
+    """
+    return _Instrumented(target, metrics, layer, backend)
+
+
+def backend_name(repository: Any) -> str:
+    """Имя хранилища по классу репозитория: AsyncSqliteCandidateRepository -> sqlite"""
+    name = type(repository).__name__
+    return name.removeprefix("Async").removesuffix("CandidateRepository").lower() or name
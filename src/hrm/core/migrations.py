@@ -0,0 +1,274 @@
+"""
+Версионированные миграции схемы SQLite.
+Номер версии схемы хранится в PRAGMA user_version, поэтому для актуальной БД
+проверка сводится к чтению одного числа из заголовка файла.
+"""
+import datetime
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+
+class MigrationError(Exception):
+    """
+    Схему БД невозможно привести к запрошенной версии.
+    """
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    Миграция схемы.
+    """
+
+    version: int
+    """
+    Номер версии схемы после применения миграции.
+    """
+
+    description: str
+
+    apply: Callable[[sqlite3.Cursor], None]
+    """
+    Изменение схемы. Выполняется в общей транзакции вместе с остальными миграциями
+    и должно быть идемпотентным: БД, созданные до появления миграций, имеют версию 0,
+    но уже могут содержать часть объектов.
+    """
+
+    backfill: Optional[Callable[[sqlite3.Cursor, int], int]] = None
+    """
+    Заполнение данных порциями: обрабатывает не более указанного числа строк и возвращает,
+    сколько строк изменено. Вызывается после фиксации изменений схемы отдельными короткими
+    транзакциями, пока не вернет 0, поэтому не блокирует запись в большую таблицу надолго.
+    """
+
+
+def _columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    """Возвращает имена колонок таблицы"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [column[1] for column in cursor.fetchall()]
+
+
+def _create_candidates(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            phone TEXT,
+            birth_date TEXT,
+            sex INTEGER,
+            status INTEGER NOT NULL,
+            comments TEXT
+        )
+    """)
+
+
+def _add_updated_at(cursor: sqlite3.Cursor) -> None:
+    if "updated_at" not in _columns(cursor, "candidates"):
+        cursor.execute("ALTER TABLE candidates ADD COLUMN updated_at TEXT")
+
+
+def _backfill_updated_at(cursor: sqlite3.Cursor, batch_size: int) -> int:
+    # Существующие записи получают время миграции как время последнего изменения.
+    # Сначала только чтение: если заполнять нечего, блокировка записи не берется
+    cursor.execute("SELECT id FROM candidates WHERE updated_at IS NULL LIMIT ?", (batch_size,))
+    rows = cursor.fetchall()
+    updated_at = datetime.datetime.now().isoformat()
+    cursor.executemany("UPDATE candidates SET updated_at = ? WHERE id = ?", [(updated_at, row[0]) for row in rows])
+    return len(rows)
+
+
+def _create_find_indexes(cursor: sqlite3.Cursor) -> None:
+    # Вторичные индексы для find(): фильтр по статусу, поиск по началу фамилии, выборка по времени изменения
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_candidates_status ON candidates (status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_candidates_last_name ON candidates (last_name COLLATE NOCASE)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_candidates_updated_at ON candidates (updated_at)")
+
+
+def _create_full_text_search(cursor: sqlite3.Cursor) -> None:
+    """
+    FTS5 индекс candidates_fts по имени, фамилии и комментариям и триггеры, которые синхронизируют
+    его с таблицей candidates. Если SQLite собран без FTS5, индекс не создается и поиск работает через LIKE.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidates_fts'")
+    if cursor.fetchone():
+        return
+    try:
+        # unicode61 приводит к нижнему регистру любые алфавиты, в том числе кириллицу
+        cursor.execute("""
+            CREATE VIRTUAL TABLE candidates_fts USING fts5(
+                first_name, last_name, comments,
+                content = 'candidates', content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_ai AFTER INSERT ON candidates BEGIN
+            INSERT INTO candidates_fts (rowid, first_name, last_name, comments)
+            VALUES (new.id, new.first_name, new.last_name, new.comments);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_ad AFTER DELETE ON candidates BEGIN
+            INSERT INTO candidates_fts (candidates_fts, rowid, first_name, last_name, comments)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.comments);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS candidates_fts_au AFTER UPDATE OF first_name, last_name, comments ON candidates BEGIN
+            INSERT INTO candidates_fts (candidates_fts, rowid, first_name, last_name, comments)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.comments);
+            INSERT INTO candidates_fts (rowid, first_name, last_name, comments)
+            VALUES (new.id, new.first_name, new.last_name, new.comments);
+        END
+    """)
+    # Индексируем кандидатов, добавленных до появления полнотекстового поиска
+    cursor.execute("INSERT INTO candidates_fts (candidates_fts) VALUES ('rebuild')")
+
+
+def _add_version(cursor: sqlite3.Cursor) -> None:
+    # Версия для оптимистичной блокировки; существующие записи получают версию 1
+    if "version" not in _columns(cursor, "candidates"):
+        cursor.execute("ALTER TABLE candidates ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+
+def _create_statistics_index(cursor: sqlite3.Cursor) -> None:
+    # Покрывающий индекс для статистики: группировка по статусу, полу и дате рождения идет в порядке индекса,
+    # а принятые и отклоненные кандидаты по времени изменения читаются диапазоном без обращения к таблице
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidates_statistics ON candidates (status, sex, birth_date, updated_at)"
+    )
+
+
+def _add_last_name_key(cursor: sqlite3.Cursor) -> None:
+    # COLLATE NOCASE и LIKE не различают регистр только для ASCII: "петр" не находил "Петров".
+    # Фамилия в нижнем регистре по правилам Python (str.casefold) хранится отдельной колонкой,
+    # как и ключ сортировки JSON-хранилища, поэтому оба хранилища находят и упорядочивают одинаково
+    if "last_name_key" not in _columns(cursor, "candidates"):
+        cursor.execute("ALTER TABLE candidates ADD COLUMN last_name_key TEXT")
+    cursor.execute("DROP INDEX IF EXISTS ix_candidates_last_name")
+    cursor.execute("CREATE INDEX IF NOT EXISTS ix_candidates_last_name_key ON candidates (last_name_key)")
+
+
+def _backfill_last_name_key(cursor: sqlite3.Cursor, batch_size: int) -> int:
+    cursor.execute("SELECT id, last_name FROM candidates WHERE last_name_key IS NULL LIMIT ?", (batch_size,))
+    rows = cursor.fetchall()
+    cursor.executemany(
+        "UPDATE candidates SET last_name_key = ? WHERE id = ?",
+        [(last_name.casefold(), candidate_id) for candidate_id, last_name in rows],
+    )
+    return len(rows)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Таблица candidates", _create_candidates),
+    Migration(2, "Колонка updated_at", _add_updated_at, backfill=_backfill_updated_at),
+    Migration(3, "Индексы по статусу, фамилии и времени изменения", _create_find_indexes),
+    Migration(4, "Полнотекстовый поиск FTS5", _create_full_text_search),
+    Migration(5, "Колонка version для оптимистичной блокировки", _add_version),
+    Migration(6, "Индекс для статистики воронки подбора", _create_statistics_index),
+    Migration(7, "Колонка last_name_key для поиска по началу фамилии без учета регистра", _add_last_name_key,
+              backfill=_backfill_last_name_key),
+]
+"""
+Миграции в порядке применения. Новая миграция добавляется в конец списка со следующим номером.
+"""
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Текущая версия схемы (PRAGMA user_version); 0 - пустая БД или БД, созданная до появления миграций"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(conn: sqlite3.Connection) -> List[Migration]:
+    """Возвращает миграции, которые еще не применены к БД"""
+    current = schema_version(conn)
+    return [migration for migration in MIGRATIONS if migration.version > current]
+
+
+def run_backfill(conn: sqlite3.Connection, migration: Migration, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Выполняет заполнение данных миграции порциями, каждая порция - отдельная транзакция.
+    Повторный запуск продолжает с того места, где заполнение было прервано.
+    :return: Количество измененных строк.
+    """
+    if migration.backfill is None:
+        return 0
+    total = 0
+    while True:
+        cursor = conn.cursor()
+        try:
+            changed = migration.backfill(cursor, batch_size)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        total += changed
+        if changed == 0:
+            return total
+
+
+def complete_backfills(conn: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Завершает заполнение данных всех примененных миграций, например прерванное остановкой процесса.
+    :return: Количество измененных строк.
+    """
+    current = schema_version(conn)
+    return sum(run_backfill(conn, migration, batch_size) for migration in MIGRATIONS if migration.version <= current)
+
+
+def migrate(
+    conn: sqlite3.Connection,
+    target: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Migration]:
+    """
+    Приводит схему БД к версии target.
+    Если БД актуальна, читается только PRAGMA user_version. Иначе все недостающие изменения схемы
+    и новая версия фиксируются одной транзакцией BEGIN IMMEDIATE (если схему одновременно обновляет
+    другой процесс, версия перечитывается после получения блокировки), а затем порциями выполняется
+    заполнение данных.
+    :param conn: Соединение с БД вне транзакции.
+    :param target: Версия схемы. По умолчанию - последняя.
+    :param batch_size: Количество строк в одной порции заполнения данных.
+    :return: Примененные миграции.
+    :raises MigrationError: Если target неизвестна или меньше текущей версии (откат схемы не поддерживается).
+    """
+    target = LATEST_VERSION if target is None else target
+    if not 0 <= target <= LATEST_VERSION:
+        raise MigrationError(f"Неизвестная версия схемы {target}, последняя версия: {LATEST_VERSION}")
+    current = schema_version(conn)
+    if current == target:
+        return []
+    if current > target:
+        raise MigrationError(f"Версия схемы БД {current} новее запрошенной {target}: откат схемы не поддерживается")
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        current = cursor.fetchone()[0]
+        applied = [migration for migration in MIGRATIONS if current < migration.version <= target]
+        for migration in applied:
+            migration.apply(cursor)
+        if applied:
+            cursor.execute(f"PRAGMA user_version = {applied[-1].version}")
+        cursor.close()
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    for migration in applied:
+        run_backfill(conn, migration, batch_size)
+    return applied
@@ -1,6 +1,6 @@
 import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -70,3 +70,174 @@ class Candidate(BaseModel):
         default_factory=datetime.datetime.now,
         description="Время последнего изменения"
     )
+
+    version: Optional[int] = Field(None, description="Версия записи")
+    """
+    Номер версии кандидата в хранилище, увеличивается при каждом изменении.
+    Используется для оптимистичной блокировки: изменение с устаревшей версией отклоняется.
+    None - версия неизвестна (кандидат еще не сохранен или изменяется без проверки).
+    """
+
+    @classmethod
+    def trusted(
+        cls,
+        first_name: str,
+        last_name: str,
+        status: CandidateStatus,
+        id: Optional[int] = None,
+        phone: Optional[str] = None,
+        birth_date: Optional[datetime.datetime] = None,
+        sex: Optional[CandidateSex] = None,
+        comments: Optional[str] = None,
+        updated_at: Optional[datetime.datetime] = None,
+        version: Optional[int] = None,
+    ) -> "Candidate":
+        """
+        Создает кандидата из данных, которые уже прошли валидацию при записи в хранилище.
+        Валидация Pydantic не выполняется: значения должны иметь типы полей модели (datetime, перечисления),
+        они не проверяются и не приводятся. Быстрее и Candidate(...), и model_construct(),
+        поэтому используется репозиториями при чтении большого количества строк.
+        """
+        candidate = _new_model(cls)
+        _set_attribute(candidate, "__dict__", {
+            "id": id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "phone": phone,
+            "birth_date": birth_date,
+            "sex": sex,
+            "status": status,
+            "comments": comments,
+            "updated_at": updated_at if updated_at is not None else datetime.datetime.now(),
+            "version": version,
+        })
+        # Те же служебные атрибуты, что заполняет model_construct()
+        _set_attribute(candidate, "__pydantic_fields_set__", _CANDIDATE_FIELDS.copy())
+        _set_attribute(candidate, "__pydantic_extra__", None)
+        _set_attribute(candidate, "__pydantic_private__", None)
+        return candidate
+
+
+_new_model = object.__new__
+_set_attribute = object.__setattr__
+_CANDIDATE_FIELDS = set(Candidate.model_fields)
+
+
+class CandidateSearchHit(BaseModel):
+    """
+    Результат полнотекстового поиска кандидатов.
+    """
+
+    candidate: Candidate = Field(..., description="Найденный кандидат")
+
+    rank: float = Field(..., description="Релевантность (меньше - лучше)")
+
+    snippet: str = Field(..., description="Фрагмент текста с выделенными совпадениями")
+
+
+class StatusChangeResult(BaseModel):
+    """
+    Результат массовой смены статуса кандидатов.
+    """
+
+    changed: List[Candidate] = Field(default_factory=list, description="Кандидаты, у которых изменен статус")
+
+    missing: List[int] = Field(default_factory=list, description="ID несуществующих кандидатов")
+
+    conflicting: List[int] = Field(
+        default_factory=list,
+        description="ID кандидатов, статус или версия которых не совпали с ожидаемыми"
+    )
+
+
+AGE_GROUPS: List[Tuple[int, Optional[int], str]] = [
+    (0, 20, "<20"),
+    (20, 30, "20-29"),
+    (30, 40, "30-39"),
+    (40, 50, "40-49"),
+    (50, 60, "50-59"),
+    (60, None, "60+"),
+]
+"""
+Возрастные группы статистики: (возраст от, возраст до (не включая), название).
+"""
+
+UNKNOWN = "UNKNOWN"
+"""
+Ключ статистики для кандидатов, у которых не указан пол или дата рождения.
+"""
+
+
+def age_group(age: Optional[int]) -> str:
+    """Возвращает название возрастной группы (UNKNOWN, если возраст неизвестен)"""
+    if age is None:
+        return UNKNOWN
+    for lower, upper, name in AGE_GROUPS:
+        if age >= lower and (upper is None or age < upper):
+            return name
+    # Дата рождения в будущем - ошибка ввода, такой возраст не относится ни к одной группе
+    return UNKNOWN
+
+
+def local_time(moment: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """
+    Приводит момент времени к виду, в котором хранится updated_at: локальное время без часового пояса.
+    Время с часовым поясом (например, 2024-01-01T00:00:00Z из HTTP API) переводится в локальное,
+    время без пояса считается локальным и не меняется.
+    """
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+
+class WeeklyDecisions(BaseModel):
+    """
+    Решения по кандидатам за неделю.
+    """
+
+    week: datetime.date = Field(..., description="Понедельник недели")
+
+    approved: int = Field(0, description="Принято кандидатов")
+
+    rejected: int = Field(0, description="Отклонено кандидатов")
+
+
+class CandidateStatistics(BaseModel):
+    """
+    Воронка подбора: агрегаты по кандидатам.
+    """
+
+    total: int = Field(..., description="Количество кандидатов")
+
+    by_status: Dict[str, int] = Field(..., description="Количество кандидатов по статусам")
+
+    by_sex: Dict[str, int] = Field(..., description="Количество кандидатов по полу (UNKNOWN - не указан)")
+
+    by_age: Dict[str, int] = Field(..., description="Количество кандидатов по возрастным группам")
+
+    decisions_by_week: List[WeeklyDecisions] = Field(
+        default_factory=list,
+        description="Принятые и отклоненные кандидаты по неделям"
+    )
+    """
+    Неделя решения определяется по времени последнего изменения кандидата (updated_at).
+    """
+
+
+class ConcurrentModificationError(Exception):
+    """
+    Кандидат был изменен другим пользователем или процессом после того, как его прочитали.
+    """
+
+    def __init__(self, candidate_id: int, expected_version: int, actual_version: Optional[int] = None):
+        self.candidate_id = candidate_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+        if actual_version is None:
+            message = f"Кандидат с ID {candidate_id} был удален другим пользователем (ожидалась версия {expected_version})"
+        else:
+            message = (
+                f"Кандидат с ID {candidate_id} был изменен другим пользователем "
+                f"(ожидалась версия {expected_version}, текущая {actual_version})"
+            )
+        super().__init__(message)
@@ -0,0 +1,10 @@
+"""
+Расположение файлов приложения.
+Модуль не импортирует ничего, кроме os: его использует клиент демона, которому важна скорость запуска.
+"""
+import os
+
+
+def default_db_file() -> str:
+    """Путь к базе данных SQLite: переменная окружения HRM_DB_PATH, при её отсутствии - ~/.hrm/candidates.db"""
+    return os.getenv("HRM_DB_PATH") or os.path.join(os.path.expanduser("~"), ".hrm", "candidates.db")
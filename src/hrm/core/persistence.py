@@ -1,12 +1,187 @@
+import bisect
+import heapq
 import json
 import os
+import re
 import sqlite3
 import datetime
+import threading
 from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from hrm.core.model import Candidate, CandidateStatus, CandidateSex
+from hrm.core.model import (
+    AGE_GROUPS,
+    UNKNOWN,
+    Candidate,
+    CandidateSearchHit,
+    CandidateStatistics,
+    CandidateStatus,
+    CandidateSex,
+    ConcurrentModificationError,
+    StatusChangeResult,
+    WeeklyDecisions,
+    age_group,
+    local_time,
+)
+from hrm.core import migrations
+from hrm.core.paths import default_db_file
+
+if TYPE_CHECKING:
+    from hrm.core.profiling import StatementProfiler
+
+
+DEFAULT_HIGHLIGHT = ("<mark>", "</mark>")
+"""
+Маркеры, которыми выделяются совпадения во фрагментах результатов поиска.
+"""
+
+_SEX_BY_VALUE = {sex.value: sex for sex in CandidateSex}
+_STATUS_BY_VALUE = {status.value: status for status in CandidateStatus}
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Наименьшая строка, которая больше всех строк, начинающихся с prefix.
+    None, если такой строки нет (префикс из одних максимальных символов Unicode).
+    """
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        # Суррогаты не кодируются в UTF-8; в порядке строк SQLite за ними сразу идет U+E000
+        following = 0xE000
+    return prefix[:-1] + chr(following)
+
+
+def _build_statistics(
+    groups: Iterable[Tuple[int, Optional[int], str, int]],
+    decisions: Iterable[Tuple[int, datetime.date, int]],
+) -> CandidateStatistics:
+    """
+    Сворачивает сгруппированные счетчики в статистику.
+    :param groups: Кортежи (статус, пол, возрастная группа, количество).
+    :param decisions: Кортежи (статус принятых или отклоненных кандидатов, день изменения, количество).
+    """
+    by_status = {status.name: 0 for status in CandidateStatus}
+    by_sex = {**{sex.name: 0 for sex in CandidateSex}, UNKNOWN: 0}
+    by_age = {**{name: 0 for _, _, name in AGE_GROUPS}, UNKNOWN: 0}
+    for status_value, sex_value, age_group_name, count in groups:
+        by_status[_STATUS_BY_VALUE[status_value].name] += count
+        by_sex[_SEX_BY_VALUE[sex_value].name if sex_value is not None else UNKNOWN] += count
+        by_age[age_group_name] += count
+
+    weeks: Dict[datetime.date, WeeklyDecisions] = {}
+    for status_value, day, count in decisions:
+        week = day - datetime.timedelta(days=day.weekday())
+        week_decisions = weeks.setdefault(week, WeeklyDecisions(week=week))
+        if status_value == CandidateStatus.APPROVED.value:
+            week_decisions.approved += count
+        else:
+            week_decisions.rejected += count
+
+    return CandidateStatistics(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        by_sex=by_sex,
+        by_age=by_age,
+        decisions_by_week=[weeks[week] for week in sorted(weeks)],
+    )
+
+
+def _born_before(as_of: datetime.date, age: int) -> str:
+    """
+    Граница возраста для сравнения строк дат рождения: кандидату исполнилось age лет к дате as_of,
+    если он родился раньше возвращаемой даты (ISO). Родившиеся 29 февраля считаются по 28 февраля.
+    """
+    year = as_of.year - age
+    try:
+        birthday = as_of.replace(year=year)
+    except ValueError:
+        birthday = as_of.replace(year=year, day=28)
+    return (birthday + datetime.timedelta(days=1)).isoformat()
+
+
+def _strict_reads_default() -> bool:
+    """
+    Режим чтения по умолчанию. Переменная окружения HRM_STRICT_READS=1 включает полную валидацию
+    Pydantic для каждого прочитанного кандидата - для отладки поврежденных данных.
+    """
+    return os.getenv("HRM_STRICT_READS", "") not in ("", "0")
+
+
+def _search_terms(query: str) -> List[str]:
+    """Разбивает поисковый запрос на слова (буквы и цифры любых алфавитов)"""
+    return re.findall(r"\w+", query)
+
+
+def _rank_in_memory(
+    candidate: Candidate,
+    terms: List[str],
+    highlight: Tuple[str, str],
+) -> Optional[CandidateSearchHit]:
+    """
+    Ранжирует кандидата по словам запроса без FTS5: каждое слово должно быть началом
+    какого-либо слова в имени, фамилии или комментариях.
+    Веса полей совпадают с весами bm25 в SqliteCandidateRepository.search.
+    :return: Результат поиска или None, если кандидат не подходит.
+    """
+    fields = (
+        (candidate.last_name, 10.0),
+        (candidate.first_name, 5.0),
+        (candidate.comments or "", 1.0),
+    )
+    prefixes = [term.casefold() for term in terms]
+    score = 0.0
+    for prefix in prefixes:
+        weight = max(
+            (field_weight for text, field_weight in fields
+             if any(word.casefold().startswith(prefix) for word in re.findall(r"\w+", text))),
+            default=0.0,
+        )
+        if weight == 0.0:
+            return None
+        score += weight
+
+    best_text = max(
+        (text for text, _ in fields),
+        key=lambda text: sum(
+            1 for word in re.findall(r"\w+", text) for prefix in prefixes if word.casefold().startswith(prefix)
+        ),
+    )
+
+    def mark(match: re.Match) -> str:
+        word = match.group(0)
+        if any(word.casefold().startswith(prefix) for prefix in prefixes):
+            return f"{highlight[0]}{word}{highlight[1]}"
+        return word
+
+    # Как и bm25, меньшее значение означает более релевантный результат
+    return CandidateSearchHit(candidate=candidate, rank=-score, snippet=re.sub(r"\w+", mark, best_text))
+
+
+ORDER_BY_FIELDS = ("id", "last_name", "updated_at")
+"""
+Поля, по которым CandidateRepository.find умеет сортировать с использованием индексов.
+"""
+
+
+def _parse_order_by(order_by: str, after_id: Optional[int] = None) -> tuple:
+    """
+    Разбирает параметр сортировки вида "field" или "-field".
+    :return: Кортеж (поле, по убыванию)
+    :raises ValueError: Если поле не поддерживается или after_id задан не для сортировки по id.
+    """
+    descending = order_by.startswith("-")
+    field = order_by[1:] if descending else order_by
+    if field not in ORDER_BY_FIELDS:
+        raise ValueError(f"Неподдерживаемое поле сортировки '{field}'. Допустимые значения: {', '.join(ORDER_BY_FIELDS)}")
+    if after_id is not None and (field != "id" or descending):
+        raise ValueError("Курсор after_id поддерживается только для сортировки по возрастанию id")
+    return field, descending
 
 
 class CandidateRepository(ABC):
@@ -18,10 +193,150 @@ class CandidateRepository(ABC):
     def get_by_id(self, candidate_id: int) -> Candidate | None:
         pass
 
+    @abstractmethod
+    def get_revision(self, candidate_id: int) -> Optional[datetime.datetime]:
+        """
+        Возвращает время последнего изменения кандидата, не загружая его целиком.
+        :return: updated_at кандидата или None, если кандидат не найден.
+        """
+        pass
+
+    @abstractmethod
+    def get_collection_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        """
+        Возвращает признаки изменения набора кандидатов: количество, максимальный ID
+        и максимальное время изменения. Любая вставка, удаление или изменение меняет хотя бы одно из них.
+        """
+        pass
+
+    @abstractmethod
+    def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[Candidate]:
+        """
+        Постранично перебирает кандидатов в порядке возрастания ID (keyset-пагинация).
+        :param after_id: Вернуть кандидатов с ID строго больше указанного.
+        :param limit: Максимальное количество кандидатов. None - без ограничения.
+        :param page_size: Количество кандидатов, читаемых из хранилища за один раз.
+        """
+        pass
+
+    @abstractmethod
+    def iter_snapshot(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+        fetch_size: int = 1000,
+    ) -> Iterator[Candidate]:
+        """
+        Потоково перебирает кандидатов из согласованного снимка данных в порядке возрастания ID.
+        Используется для выгрузки всей таблицы с постоянным расходом памяти.
+        :param status: Вернуть только кандидатов с указанным статусом.
+        :param updated_since: Вернуть только кандидатов, измененных не раньше указанного времени
+                              (время с часовым поясом переводится в локальное, см. local_time).
+        :param fetch_size: Количество строк, читаемых из хранилища за один раз.
+        """
+        pass
+
+    @abstractmethod
+    def find(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        """
+        Ищет кандидатов по индексируемым условиям. Все условия объединяются через И.
+        :param status: Статус кандидата.
+        :param last_name_prefix: Начало фамилии без учета регистра в любом алфавите (str.casefold).
+        :param updated_after: Вернуть кандидатов, измененных строго позже указанного времени.
+        :param order_by: Поле сортировки из ORDER_BY_FIELDS, префикс "-" - по убыванию.
+        :param limit: Максимальное количество кандидатов.
+        :param after_id: Keyset-курсор: кандидаты с ID больше указанного. Только для сортировки по "id".
+        :raises ValueError: Если поле сортировки не поддерживается.
+        """
+        pass
+
+    @abstractmethod
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        """
+        Полнотекстовый поиск по имени, фамилии и комментариям.
+        Все слова запроса должны встретиться (как начало слова), регистр не учитывается.
+        :param query: Поисковый запрос в свободной форме.
+        :param limit: Максимальное количество результатов.
+        :param highlight: Открывающий и закрывающий маркеры совпадений во фрагменте.
+        :return: Результаты по убыванию релевантности.
+        """
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        """Возвращает общее количество кандидатов"""
+        pass
+
+    @abstractmethod
+    def count_by_status(self) -> Dict[CandidateStatus, int]:
+        """Возвращает количество кандидатов по каждому статусу (включая нулевые)"""
+        pass
+
+    @abstractmethod
+    def statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        as_of: Optional[datetime.date] = None,
+    ) -> CandidateStatistics:
+        """
+        Считает агрегаты воронки подбора за один проход по данным.
+        :param since: Учитывать только кандидатов, измененных начиная с этого момента.
+        :param until: Учитывать только кандидатов, измененных раньше этого момента.
+                      Моменты с часовым поясом переводятся в локальное время (см. local_time).
+        :param as_of: Дата, на которую вычисляется возраст. По умолчанию - сегодня.
+        """
+        pass
+
     @abstractmethod
     def insert_or_update(self, candidate: Candidate) -> int:
         pass
 
+    @abstractmethod
+    def insert_many(self, candidates: Iterable[Candidate]) -> int:
+        """
+        Вставляет пачку новых кандидатов за одну операцию записи.
+        :return: Количество вставленных кандидатов
+        """
+        pass
+
+    @abstractmethod
+    def set_status(
+        self,
+        candidate_ids: Iterable[int],
+        new_status: CandidateStatus,
+        expected_status: Optional[CandidateStatus] = None,
+        expected_version: Optional[int] = None,
+    ) -> StatusChangeResult:
+        """
+        Атомарно меняет статус кандидатов и время их изменения.
+        :param candidate_ids: ID кандидатов.
+        :param new_status: Новый статус.
+        :param expected_status: Если указан, статус меняется только у кандидатов в этом статусе.
+        :param expected_version: Если указана, статус меняется только у кандидатов с этой версией (compare-and-swap).
+        :return: Измененные кандидаты в сохраненном виде, ID отсутствующих
+                 и ID кандидатов в неожиданном статусе или версии.
+        """
+        pass
+
     @abstractmethod
     def delete(self, candidate_id: int) -> None:
         pass
@@ -31,117 +346,265 @@ class CandidateRepository(ABC):
         """Очищает репозиторий от всех данных"""
         pass
 
+    @abstractmethod
+    def transaction(self) -> ContextManager["CandidateRepository"]:
+        """
+        Единица работы: все изменения внутри блока with фиксируются одной транзакцией
+        и откатываются целиком, если блок завершился исключением.
+        Вложенные вызовы работают как точки сохранения: исключение во вложенном блоке
+        откатывает только его изменения.
+        :return: Контекстный менеджер, возвращающий сам репозиторий.
+        """
+        pass
+
+    def data_version(self) -> Optional[int]:
+        """
+        Версия данных, которая меняется, когда хранилище изменяет другой процесс.
+        :return: Версия данных или None, если хранилище не умеет её отслеживать.
+        """
+        return None
+
+    def close(self) -> None:
+        """Освобождает ресурсы репозитория (соединения, файлы)"""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
 
 class SqliteCandidateRepository(CandidateRepository):
     """
     Репозиторий для хранения кандидатов в DB Sqlite.
+    Держит одно долгоживущее соединение, которое открывается при создании репозитория
+    и закрывается явным вызовом close(). Доступ к соединению из разных потоков
+    сериализуется блокировкой.
     """
-    
-    def __init__(self, db_file: Path = None):
+
+    DEFAULT_PRAGMAS: Dict[str, Any] = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+    }
+    """
+    Настройки соединения по умолчанию: WAL-журнал, ослабленный fsync,
+    кэш страниц 64 МБ (отрицательное значение - в килобайтах) и mmap 256 МБ.
+    """
+
+    def __init__(
+        self,
+        db_file: Path = None,
+        pragmas: Optional[Dict[str, Any]] = None,
+        auto_migrate: bool = True,
+        strict_reads: Optional[bool] = None,
+        profiler: Optional["StatementProfiler"] = None,
+    ):
         """
         Инициализация репозитория.
         :param db_file: Путь к файлу базы данных. Если не указан, используется переменная окружения HRM_DB_PATH,
                         а при её отсутствии - ~/.hrm/candidates.db
+        :param pragmas: Дополнительные PRAGMA соединения. Переопределяют DEFAULT_PRAGMAS,
+                        значение None отключает соответствующую PRAGMA.
+        :param auto_migrate: Применить недостающие миграции схемы при открытии.
+                             False - для обслуживания БД (hrm db status/migrate).
+        :param strict_reads: Проверять прочитанных кандидатов валидацией Pydantic. По умолчанию
+                             данные из БД считаются проверенными при записи (Candidate.trusted);
+                             None - значение переменной окружения HRM_STRICT_READS.
+        :param profiler: Профилировщик запросов (hrm.core.profiling). По умолчанию запросы не замеряются.
+        """
+        self._db_file = Path(db_file if db_file is not None else default_db_file())
+        self._pragmas = {**self.DEFAULT_PRAGMAS, **(pragmas or {})}
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._transaction_depth = 0
+        self._fts_enabled: Optional[bool] = None
+        self._profiler = profiler
+        self._make_candidate = Candidate if (
+            _strict_reads_default() if strict_reads is None else strict_reads
+        ) else Candidate.trusted
+        self._connect()
+        if auto_migrate:
+            self._init_database()
+
+    @property
+    def db_file(self) -> Path:
+        """Путь к файлу базы данных"""
+        return self._db_file
+
+    def _connect(self) -> None:
+        """Открывает соединение с БД и применяет PRAGMA"""
+        if str(self._db_file) != ":memory:":
+            self._db_file.parent.mkdir(parents=True, exist_ok=True)
+        if self._profiler is None:
+            self._conn = sqlite3.connect(self._db_file, check_same_thread=False)
+        else:
+            self._conn = self._profiler.connect(self._db_file, check_same_thread=False)
+        for name, value in self._pragmas.items():
+            if value is not None:
+                self._conn.execute(f"PRAGMA {name} = {value}")
+
+    @contextmanager
+    def _cursor(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Выдает курсор долгоживущего соединения под блокировкой.
+        :raises sqlite3.ProgrammingError: Если репозиторий уже закрыт.
+        """
+        with self._lock:
+            if self._conn is None:
+                raise sqlite3.ProgrammingError("Репозиторий закрыт")
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            except BaseException:
+                # Незавершенная транзакция не должна "протечь" в следующий вызов.
+                # Внутри transaction() откатом управляет сама транзакция.
+                if self._transaction_depth == 0:
+                    self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def _commit(self) -> None:
+        """Фиксирует изменения, если вызов не выполняется внутри transaction()"""
+        if self._transaction_depth == 0:
+            self._conn.commit()
+
+    @contextmanager
+    def transaction(self) -> Iterator["SqliteCandidateRepository"]:
+        """
+        Выполняет вызовы репозитория в одной транзакции SQLite.
+        Внешний блок открывает транзакцию BEGIN IMMEDIATE (блокировка записи берется сразу,
+        поэтому чтение-изменение-запись не конкурирует с другими процессами), вложенные блоки
+        используют SAVEPOINT. Соединение остается заблокированным для других потоков до конца блока.
         """
-        if db_file is None:
-            # Проверяем переменную окружения HRM_DB_PATH
-            env_db_path = os.getenv("HRM_DB_PATH")
-            if env_db_path:
-                db_file = Path(env_db_path)
+        with self._lock:
+            if self._conn is None:
+                raise sqlite3.ProgrammingError("Репозиторий закрыт")
+            savepoint = f"hrm_{self._transaction_depth}"
+            if self._transaction_depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
             else:
-                db_file = Path.home() / ".hrm" / "candidates.db"
-        self._db_file = db_file
-        self._init_database()
-    
+                self._conn.execute(f"SAVEPOINT {savepoint}")
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._conn.rollback()
+                else:
+                    self._conn.execute(f"ROLLBACK TO {savepoint}")
+                    self._conn.execute(f"RELEASE {savepoint}")
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._conn.commit()
+            else:
+                self._conn.execute(f"RELEASE {savepoint}")
+
+    def data_version(self) -> Optional[int]:
+        """
+        PRAGMA data_version: меняется после фиксации транзакции любым другим соединением,
+        собственные записи этого соединения её не меняют.
+        """
+        with self._cursor() as cursor:
+            cursor.execute("PRAGMA data_version")
+            return cursor.fetchone()[0]
+
+    def close(self) -> None:
+        """Закрывает соединение с БД"""
+        with self._lock:
+            if self._conn is not None:
+                # Обновляет статистику планировщика для индексов, если она устарела
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
+
     def _init_database(self) -> None:
-        """Создает таблицу candidates, если её нет, и выполняет миграции"""
-        self._db_file.parent.mkdir(parents=True, exist_ok=True)
-        with sqlite3.connect(self._db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS candidates (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    phone TEXT,
-                    birth_date TEXT,
-                    sex INTEGER,
-                    status INTEGER NOT NULL,
-                    comments TEXT
-                )
-            """)
-            
-            # Проверяем наличие колонки updated_at и добавляем если отсутствует
-            cursor.execute("PRAGMA table_info(candidates)")
-            columns = [column[1] for column in cursor.fetchall()]
-            if "updated_at" not in columns:
-                cursor.execute("ALTER TABLE candidates ADD COLUMN updated_at TEXT")
-                # Устанавливаем текущее время для всех существующих записей
-                current_time = datetime.datetime.now().isoformat()
-                cursor.execute("UPDATE candidates SET updated_at = ? WHERE updated_at IS NULL", (current_time,))
-            
-            conn.commit()
+        """
+        Приводит схему БД к последней версии (см. hrm.core.migrations) и завершает заполнение данных,
+        прерванное остановкой процесса: иначе, например, кандидаты без last_name_key не находятся
+        поиском по началу фамилии. Для актуальной БД выполняются только PRAGMA user_version
+        и по одному чтению по индексу на каждое заполнение данных.
+        """
+        with self._cursor():
+            if migrations.schema_version(self._conn) < migrations.LATEST_VERSION:
+                migrations.migrate(self._conn)
+            migrations.complete_backfills(self._conn)
+
+    def schema_version(self) -> int:
+        """Текущая версия схемы БД"""
+        with self._cursor():
+            return migrations.schema_version(self._conn)
+
+    def migrate(
+        self,
+        target: Optional[int] = None,
+        batch_size: int = migrations.DEFAULT_BATCH_SIZE,
+    ) -> List[migrations.Migration]:
+        """
+        Приводит схему БД к версии target и завершает прерванное заполнение данных.
+        :param target: Версия схемы. По умолчанию - последняя.
+        :param batch_size: Количество строк в одной порции заполнения данных.
+        :return: Примененные миграции.
+        :raises MigrationError: Если target неизвестна или меньше текущей версии.
+        """
+        with self._cursor():
+            if self._transaction_depth:
+                raise sqlite3.ProgrammingError("Миграции нельзя выполнять внутри transaction()")
+            applied = migrations.migrate(self._conn, target, batch_size)
+            migrations.complete_backfills(self._conn, batch_size)
+            self._fts_enabled = None
+            return applied
+
+    def _full_text_search_enabled(self) -> bool:
+        """Создан ли FTS5 индекс (его нет, если SQLite собран без FTS5); проверяется один раз"""
+        if self._fts_enabled is None:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'candidates_fts'")
+                self._fts_enabled = cursor.fetchone() is not None
+        return self._fts_enabled
     
     def _row_to_candidate(self, row: tuple) -> Candidate:
         """
         Преобразует строку из БД в объект Candidate.
-        :param row: Кортеж (id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at)
+        :param row: Кортеж (id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version)
         :return: Объект Candidate
         """
-        if len(row) == 9:
-            candidate_id, first_name, last_name, phone, birth_date_str, sex_value, status_value, comments, updated_at_str = row
-        else:
-            # Обратная совместимость со старыми записями без updated_at
-            candidate_id, first_name, last_name, phone, birth_date_str, sex_value, status_value, comments = row
-            updated_at_str = None
-        
-        # Преобразуем birth_date из строки в datetime
-        birth_date = None
-        if birth_date_str:
-            birth_date = datetime.datetime.fromisoformat(birth_date_str)
-        
-        # Преобразуем updated_at из строки в datetime
-        updated_at = None
-        if updated_at_str:
-            updated_at = datetime.datetime.fromisoformat(updated_at_str)
-        else:
-            # Если updated_at отсутствует, устанавливаем текущее время
-            updated_at = datetime.datetime.now()
-        
-        # Преобразуем enum значения
-        sex = CandidateSex(sex_value) if sex_value is not None else None
-        status = CandidateStatus(status_value)
-        
-        return Candidate(
+        candidate_id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version = row
+        return self._make_candidate(
             id=candidate_id,
             first_name=first_name,
             last_name=last_name,
             phone=phone,
-            birth_date=birth_date,
-            sex=sex,
-            status=status,
+            birth_date=datetime.datetime.fromisoformat(birth_date) if birth_date else None,
+            sex=_SEX_BY_VALUE[sex] if sex is not None else None,
+            status=_STATUS_BY_VALUE[status],
             comments=comments,
-            updated_at=updated_at
+            # Записи, у которых время изменения еще не заполнено миграцией
+            updated_at=datetime.datetime.fromisoformat(updated_at) if updated_at else datetime.datetime.now(),
+            version=version,
         )
     
     def get_all(self) -> List[Candidate]:
         """Возвращает список всех кандидатов"""
-        with sqlite3.connect(self._db_file) as conn:
-            cursor = conn.cursor()
+        with self._cursor() as cursor:
             cursor.execute("""
-                SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at
+                SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version
                 FROM candidates
                 ORDER BY id
             """)
-            rows = cursor.fetchall()
-            return [self._row_to_candidate(row) for row in rows]
+            return [self._row_to_candidate(row) for row in cursor.fetchall()]
     
     def get_by_id(self, candidate_id: int) -> Candidate | None:
         """Возвращает кандидата по ID или None, если не найден"""
-        with sqlite3.connect(self._db_file) as conn:
-            cursor = conn.cursor()
+        with self._cursor() as cursor:
             cursor.execute("""
-                SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at
+                SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version
                 FROM candidates
                 WHERE id = ?
             """, (candidate_id,))
@@ -149,151 +612,816 @@ class SqliteCandidateRepository(CandidateRepository):
             if row:
                 return self._row_to_candidate(row)
             return None
+
+    def get_revision(self, candidate_id: int) -> Optional[datetime.datetime]:
+        """Читает только updated_at по первичному ключу"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT updated_at FROM candidates WHERE id = ?", (candidate_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return datetime.datetime.fromisoformat(row[0]) if row[0] else datetime.datetime.min
+
+    def get_collection_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        """MAX(id) и MAX(updated_at) берутся из первичного ключа и индекса ix_candidates_updated_at"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT COUNT(*), MAX(id), MAX(updated_at) FROM candidates")
+            total, max_id, max_updated_at = cursor.fetchone()
+            return total, max_id, datetime.datetime.fromisoformat(max_updated_at) if max_updated_at else None
+
+    def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[Candidate]:
+        """
+        Постранично перебирает кандидатов в порядке возрастания ID.
+        Каждая страница читается отдельным запросом по первичному ключу (WHERE id > ?),
+        блокировка соединения между страницами не удерживается.
+        """
+        if page_size < 1:
+            raise ValueError("Размер страницы должен быть положительным")
+        last_id = after_id if after_id is not None else 0
+        remaining = limit
+        while remaining is None or remaining > 0:
+            batch_size = page_size if remaining is None else min(page_size, remaining)
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version
+                    FROM candidates
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (last_id, batch_size))
+                rows = cursor.fetchmany(batch_size)
+            for row in rows:
+                yield self._row_to_candidate(row)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def _open_reader(self) -> Optional[sqlite3.Connection]:
+        """
+        Открывает отдельное соединение только для чтения.
+        Для БД в памяти возвращает None - у неё нет файла, к которому можно подключиться повторно.
+        """
+        if str(self._db_file) == ":memory:":
+            return None
+        conn = sqlite3.connect(f"{self._db_file.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        for name in ("busy_timeout", "cache_size", "mmap_size"):
+            value = self._pragmas.get(name)
+            if value is not None:
+                conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def iter_snapshot(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+        fetch_size: int = 1000,
+    ) -> Iterator[Candidate]:
+        """
+        Потоково перебирает кандидатов одним курсором с fetchmany.
+        Запрос выполняется в отдельном соединении только для чтения: в режиме WAL оно видит
+        согласованный снимок на момент начала чтения и не блокирует основное соединение.
+        """
+        if fetch_size < 1:
+            raise ValueError("Размер порции чтения должен быть положительным")
+        conditions = []
+        params: List[Any] = []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status.value)
+        if updated_since is not None:
+            conditions.append("updated_at >= ?")
+            params.append(local_time(updated_since).isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"""
+            SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version
+            FROM candidates
+            {where}
+            ORDER BY id
+        """
+
+        reader = self._open_reader()
+        if reader is None:
+            # БД в памяти: читаем основным соединением, удерживая блокировку до конца перебора
+            with self._cursor() as cursor:
+                cursor.execute(sql, params)
+                while rows := cursor.fetchmany(fetch_size):
+                    for row in rows:
+                        yield self._row_to_candidate(row)
+            return
+
+        try:
+            cursor = reader.execute(sql, params)
+            while rows := cursor.fetchmany(fetch_size):
+                for row in rows:
+                    yield self._row_to_candidate(row)
+        finally:
+            reader.close()
+
+    _ORDER_BY_SQL = {
+        "id": "id {direction}",
+        "last_name": "last_name_key {direction}, id {direction}",
+        "updated_at": "updated_at {direction}, id {direction}",
+    }
+
+    def _build_find_query(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> tuple:
+        """
+        Строит SQL запрос для find().
+        Условия сформулированы так, чтобы SQLite мог использовать индексы ix_candidates_*:
+        префикс фамилии - диапазоном по индексу last_name_key (фамилия после str.casefold, как в JSON-хранилище).
+        :return: Кортеж (sql, параметры)
+        """
+        field, descending = _parse_order_by(order_by, after_id)
+        direction = "DESC" if descending else "ASC"
+        conditions = []
+        params: List[Any] = []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status.value)
+        if last_name_prefix:
+            prefix = last_name_prefix.casefold()
+            conditions.append("last_name_key >= ?")
+            params.append(prefix)
+            upper = _prefix_upper_bound(prefix)
+            if upper is not None:
+                conditions.append("last_name_key < ?")
+                params.append(upper)
+        if updated_after is not None:
+            conditions.append("updated_at > ?")
+            params.append(local_time(updated_after).isoformat())
+        if after_id is not None:
+            conditions.append("id > ?")
+            params.append(after_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = self._ORDER_BY_SQL[field].format(direction=direction)
+        sql = f"""
+            SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version
+            FROM candidates
+            {where}
+            ORDER BY {order}
+        """
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def find(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        """Ищет кандидатов по индексируемым условиям"""
+        sql, params = self._build_find_query(status, last_name_prefix, updated_after, order_by, limit, after_id)
+        with self._cursor() as cursor:
+            cursor.execute(sql, params)
+            return [self._row_to_candidate(row) for row in cursor.fetchall()]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        """
+        Полнотекстовый поиск через FTS5 с ранжированием bm25 (совпадения в фамилии и имени
+        весят больше, чем в комментариях) и фрагментами snippet().
+        """
+        terms = _search_terms(query)
+        if not terms:
+            return []
+        if not self._full_text_search_enabled():
+            return self._search_like(terms, limit, highlight)
+        # Каждое слово - отдельная фраза с поиском по префиксу: спецсимволы FTS5 в запросе не интерпретируются
+        match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT c.id, c.first_name, c.last_name, c.phone, c.birth_date, c.sex, c.status, c.comments, c.updated_at, c.version,
+                       bm25(candidates_fts, 5.0, 10.0, 1.0) AS score,
+                       snippet(candidates_fts, -1, ?, ?, '…', 12)
+                FROM candidates_fts
+                JOIN candidates AS c ON c.id = candidates_fts.rowid
+                WHERE candidates_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            """, (highlight[0], highlight[1], match, limit))
+            rows = cursor.fetchall()
+        return [
+            CandidateSearchHit(candidate=self._row_to_candidate(row[:10]), rank=row[10], snippet=row[11])
+            for row in rows
+        ]
+
+    def _search_like(self, terms: List[str], limit: int, highlight: Tuple[str, str]) -> List[CandidateSearchHit]:
+        """
+        Запасной поиск для сборок SQLite без FTS5: перебор кандидатов с проверкой и ранжированием
+        в Python, как в JsonCandidateRepository. LIKE не подходит: он ищет подстроку в любом месте слова
+        и не учитывает регистр кириллицы.
+        """
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version
+                FROM candidates
+            """)
+            hits = (_rank_in_memory(self._row_to_candidate(row), terms, highlight) for row in cursor)
+            return heapq.nsmallest(
+                limit,
+                (hit for hit in hits if hit is not None),
+                key=lambda hit: (hit.rank, hit.candidate.id),
+            )
+
+    def count(self) -> int:
+        """Возвращает общее количество кандидатов"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM candidates")
+            return cursor.fetchone()[0]
+
+    def count_by_status(self) -> Dict[CandidateStatus, int]:
+        """Возвращает количество кандидатов по каждому статусу одним сгруппированным запросом"""
+        totals = {status: 0 for status in CandidateStatus}
+        with self._cursor() as cursor:
+            cursor.execute("SELECT status, COUNT(*) FROM candidates GROUP BY status")
+            for status_value, total in cursor.fetchall():
+                totals[CandidateStatus(status_value)] = total
+        return totals
+
+    def statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        as_of: Optional[datetime.date] = None,
+    ) -> CandidateStatistics:
+        """
+        Агрегаты считаются в базе данных двумя сгруппированными запросами в одном снимке данных:
+        - статус, пол и возраст - одним проходом по покрывающему индексу ix_candidates_statistics.
+          Внутренняя группировка (status, sex, birth_date) идет в порядке индекса без сортировки,
+          возрастные группы определяются сравнением строк дат рождения с границами;
+        - решения по неделям - по диапазону индекса для принятых и отклоненных кандидатов,
+          дни сворачиваются в недели уже в Python.
+        """
+        as_of = as_of or datetime.date.today()
+        window = []
+        window_params: List[Any] = []
+        if since is not None:
+            window.append("updated_at >= ?")
+            window_params.append(local_time(since).isoformat())
+        if until is not None:
+            window.append("updated_at < ?")
+            window_params.append(local_time(until).isoformat())
+
+        age_cases = []
+        age_params: List[Any] = []
+        for lower, _, name in reversed(AGE_GROUPS):
+            age_cases.append("WHEN birth_date < ? THEN ?")
+            age_params.extend((_born_before(as_of, lower), name))
+        where = f"WHERE {' AND '.join(window)}" if window else ""
+        decided_where = " AND ".join(["status IN (?, ?)", *window])
+        decided = (CandidateStatus.APPROVED.value, CandidateStatus.REJECTED.value)
+
+        with self._cursor() as cursor:
+            # Оба запроса должны видеть одни и те же данные
+            snapshot = not self._conn.in_transaction
+            if snapshot:
+                cursor.execute("BEGIN")
+            try:
+                cursor.execute(f"""
+                    SELECT status, sex,
+                           CASE WHEN birth_date IS NULL THEN ? {' '.join(age_cases)} ELSE ? END AS age_group,
+                           SUM(total)
+                    FROM (
+                        SELECT status, sex, birth_date, COUNT(*) AS total
+                        FROM candidates
+                        {where}
+                        GROUP BY status, sex, birth_date
+                    )
+                    GROUP BY status, sex, age_group
+                """, [UNKNOWN, *age_params, UNKNOWN, *window_params])
+                groups = cursor.fetchall()
+                cursor.execute(f"""
+                    SELECT status, substr(updated_at, 1, 10) AS day, COUNT(*)
+                    FROM candidates
+                    WHERE {decided_where}
+                    GROUP BY status, day
+                """, [*decided, *window_params])
+                decisions = [
+                    (status, datetime.date.fromisoformat(day), total) for status, day, total in cursor.fetchall()
+                ]
+            finally:
+                if snapshot:
+                    self._conn.commit()
+        return _build_statistics(groups, decisions)
+
+    def _candidate_to_row(self, candidate: Candidate) -> tuple:
+        """
+        Преобразует кандидата в кортеж значений колонок для сохранения.
+        :param candidate: Кандидат
+        :return: Кортеж (first_name, last_name, phone, birth_date, sex, status, comments, updated_at, last_name_key)
+        """
+        birth_date_str = candidate.birth_date.isoformat() if candidate.birth_date else None
+        sex_value = candidate.sex.value if candidate.sex else None
+        status_value = candidate.status.value
+        updated_at_str = candidate.updated_at.isoformat() if candidate.updated_at else datetime.datetime.now().isoformat()
+        return (
+            candidate.first_name,
+            candidate.last_name,
+            candidate.phone,
+            birth_date_str,
+            sex_value,
+            status_value,
+            candidate.comments,
+            updated_at_str,
+            candidate.last_name.casefold(),
+        )
     
     def insert_or_update(self, candidate: Candidate) -> int:
         """
         Вставляет нового кандидата или обновляет существующего.
+        Если у кандидата указана версия, обновление выполняется только при совпадении версии в БД.
         :param candidate: Кандидат для вставки/обновления
         :return: ID кандидата
+        :raises ConcurrentModificationError: Если кандидата изменили после чтения указанной версии.
         """
-        with sqlite3.connect(self._db_file) as conn:
-            cursor = conn.cursor()
-            
-            # Преобразуем данные для сохранения
-            birth_date_str = candidate.birth_date.isoformat() if candidate.birth_date else None
-            sex_value = candidate.sex.value if candidate.sex else None
-            status_value = candidate.status.value
-            updated_at_str = candidate.updated_at.isoformat() if candidate.updated_at else datetime.datetime.now().isoformat()
+        with self._cursor() as cursor:
+            values = self._candidate_to_row(candidate)
             
             if candidate.id is None:
                 # Вставка нового кандидата
                 cursor.execute("""
-                    INSERT INTO candidates (first_name, last_name, phone, birth_date, sex, status, comments, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    candidate.first_name,
-                    candidate.last_name,
-                    candidate.phone,
-                    birth_date_str,
-                    sex_value,
-                    status_value,
-                    candidate.comments,
-                    updated_at_str
-                ))
+                    INSERT INTO candidates (
+                        first_name, last_name, phone, birth_date, sex, status, comments, updated_at, last_name_key
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, values)
                 candidate_id = cursor.lastrowid
-            else:
-                # Обновление существующего кандидата
+            elif candidate.version is None:
+                # Обновление существующего кандидата без проверки версии
                 candidate_id = candidate.id
                 cursor.execute("""
                     UPDATE candidates
                     SET first_name = ?, last_name = ?, phone = ?, birth_date = ?, 
-                        sex = ?, status = ?, comments = ?, updated_at = ?
+                        sex = ?, status = ?, comments = ?, updated_at = ?, last_name_key = ?, version = version + 1
                     WHERE id = ?
-                """, (
-                    candidate.first_name,
-                    candidate.last_name,
-                    candidate.phone,
-                    birth_date_str,
-                    sex_value,
-                    status_value,
-                    candidate.comments,
-                    updated_at_str,
-                    candidate_id
-                ))
+                """, values + (candidate_id,))
+            else:
+                # Compare-and-swap: строка обновляется, только если её версия не изменилась с момента чтения
+                candidate_id = candidate.id
+                cursor.execute("""
+                    UPDATE candidates
+                    SET first_name = ?, last_name = ?, phone = ?, birth_date = ?, 
+                        sex = ?, status = ?, comments = ?, updated_at = ?, last_name_key = ?, version = version + 1
+                    WHERE id = ? AND version = ?
+                """, values + (candidate_id, candidate.version))
+                if cursor.rowcount == 0:
+                    cursor.execute("SELECT version FROM candidates WHERE id = ?", (candidate_id,))
+                    row = cursor.fetchone()
+                    # Кандидата нет: его удалили после чтения указанной версии
+                    raise ConcurrentModificationError(candidate_id, candidate.version, row[0] if row else None)
             
-            conn.commit()
+            self._commit()
             return candidate_id
+
+    def insert_many(self, candidates: Iterable[Candidate]) -> int:
+        """
+        Вставляет новых кандидатов одним executemany в одной транзакции.
+        ID переданных кандидатов игнорируются, новые ID назначает БД.
+        :param candidates: Кандидаты для вставки
+        :return: Количество вставленных кандидатов
+        """
+        with self._cursor() as cursor:
+            cursor.executemany("""
+                INSERT INTO candidates (
+                    first_name, last_name, phone, birth_date, sex, status, comments, updated_at, last_name_key
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (self._candidate_to_row(candidate) for candidate in candidates))
+            inserted = cursor.rowcount
+            self._commit()
+            return inserted
     
+    _SET_STATUS_CHUNK = 500
+    """
+    Количество ID в одном UPDATE ... WHERE id IN (...): держит число параметров
+    запроса ниже лимита SQLite.
+    """
+
+    def set_status(
+        self,
+        candidate_ids: Iterable[int],
+        new_status: CandidateStatus,
+        expected_status: Optional[CandidateStatus] = None,
+        expected_version: Optional[int] = None,
+    ) -> StatusChangeResult:
+        """
+        Меняет статус одним UPDATE ... WHERE id IN (...) RETURNING на каждую порцию ID,
+        все порции выполняются в одной транзакции.
+        """
+        ids = [int(candidate_id) for candidate_id in dict.fromkeys(candidate_ids)]
+        result = StatusChangeResult()
+        if not ids:
+            return result
+        updated_at = datetime.datetime.now().isoformat()
+        changed: Dict[int, Candidate] = {}
+        existing: Set[int] = set()
+        with self._cursor() as cursor:
+            for start in range(0, len(ids), self._SET_STATUS_CHUNK):
+                chunk = ids[start:start + self._SET_STATUS_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                condition = f"id IN ({placeholders})"
+                params: List[Any] = list(chunk)
+                if expected_status is not None:
+                    condition += " AND status = ?"
+                    params.append(expected_status.value)
+                if expected_version is not None:
+                    condition += " AND version = ?"
+                    params.append(expected_version)
+                cursor.execute(f"""
+                    UPDATE candidates
+                    SET status = ?, updated_at = ?, version = version + 1
+                    WHERE {condition}
+                    RETURNING id, first_name, last_name, phone, birth_date, sex, status, comments, updated_at, version
+                """, [new_status.value, updated_at] + params)
+                for row in cursor.fetchall():
+                    changed[row[0]] = self._row_to_candidate(row)
+
+                not_changed = [candidate_id for candidate_id in chunk if candidate_id not in changed]
+                if not_changed:
+                    placeholders = ", ".join("?" for _ in not_changed)
+                    cursor.execute(f"SELECT id FROM candidates WHERE id IN ({placeholders})", not_changed)
+                    existing.update(row[0] for row in cursor.fetchall())
+            self._commit()
+
+        for candidate_id in ids:
+            if candidate_id in changed:
+                result.changed.append(changed[candidate_id])
+            elif candidate_id in existing:
+                result.conflicting.append(candidate_id)
+            else:
+                result.missing.append(candidate_id)
+        return result
+
     def delete(self, candidate_id: int) -> None:
         """Удаляет кандидата по ID"""
-        with sqlite3.connect(self._db_file) as conn:
-            cursor = conn.cursor()
+        with self._cursor() as cursor:
             cursor.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,))
-            conn.commit()
+            self._commit()
     
     def clear_all(self) -> None:
         """Очищает репозиторий от всех данных"""
-        with sqlite3.connect(self._db_file) as conn:
-            cursor = conn.cursor()
+        with self._cursor() as cursor:
             cursor.execute("DELETE FROM candidates")
-            conn.commit()
+            self._commit()
 
 
 class JsonCandidateRepository(CandidateRepository):
-    """Репозиторий для хранения кандидатов в JSON-файле"""
+    """
+    Репозиторий для хранения кандидатов в JSON-файле.
+    Для find() в памяти поддерживаются вторичные индексы: множества ID по статусу
+    и отсортированные списки пар (ключ, ID) по фамилии и времени изменения.
+
+    В режиме журнала каждое изменение дописывается одной строкой JSON в файл
+    <storage_file>.journal вместо перезаписи всего файла. При запуске загружается снимок
+    и поверх него проигрывается журнал; когда журнал достигает порога, состояние
+    сжимается в новый снимок, который атомарно подменяет старый.
+    """
+
+    JOURNAL_SUFFIX = ".journal"
+    ROTATED_JOURNAL_SUFFIX = ".journal.old"
     
-    def __init__(self, storage_file: Path = None):
+    def __init__(
+        self,
+        storage_file: Path = None,
+        journal: bool = False,
+        fsync: bool = False,
+        compact_threshold: int = 10000,
+        background_compaction: bool = False,
+        strict_reads: Optional[bool] = None,
+    ):
         """
         Инициализация репозитория.
         :param storage_file: Путь к файлу хранилища. Если не указан, используется ~/.hrm/candidates.json
+        :param journal: Дописывать изменения в журнал вместо перезаписи файла хранилища.
+        :param fsync: Вызывать fsync после каждой записи в журнал (надежнее, но медленнее).
+        :param compact_threshold: Количество записей журнала, после которого он сжимается в снимок.
+        :param background_compaction: Сжимать журнал в фоновом потоке, не задерживая запись.
+        :param strict_reads: Проверять загруженных кандидатов валидацией Pydantic (как у SqliteCandidateRepository).
         """
         self._storage_file = storage_file or (Path.home() / ".hrm" / "candidates.json")
+        self._journal_file = self._storage_file.with_name(self._storage_file.name + self.JOURNAL_SUFFIX)
+        self._rotated_journal_file = self._storage_file.with_name(self._storage_file.name + self.ROTATED_JOURNAL_SUFFIX)
+        self._journal_enabled = journal
+        self._fsync = fsync
+        self._compact_threshold = compact_threshold
+        self._journal = None
+        self._journal_records = 0
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_requested = threading.Event()
+        self._closed = threading.Event()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._undo_logs: List[Tuple[Dict[int, Optional[Candidate]], int, int]] = []
+        self._pending_records: List[Dict[str, Any]] = []
         self._candidates: Dict[int, Candidate] = {}
         self._next_id: int = 1
+        self._by_status: Dict[CandidateStatus, Set[int]] = {}
+        self._ids: List[int] = []
+        self._by_last_name: List[Tuple[str, int]] = []
+        self._by_updated_at: List[Tuple[datetime.datetime, int]] = []
+        self._make_candidate = Candidate if (
+            _strict_reads_default() if strict_reads is None else strict_reads
+        ) else Candidate.trusted
         self._load_data()
+        self._rebuild_indexes()
+        if self._journal_enabled:
+            if self._rotated_journal_file.exists():
+                # Предыдущее сжатие было прервано - доводим его до конца
+                self.compact()
+            if background_compaction:
+                self._compaction_thread = threading.Thread(
+                    target=self._compaction_loop, name="hrm-json-compaction", daemon=True
+                )
+                self._compaction_thread.start()
+
+    def _rebuild_indexes(self) -> None:
+        """Перестраивает вторичные индексы по текущим данным"""
+        self._by_status = {status: set() for status in CandidateStatus}
+        for candidate_id, candidate in self._candidates.items():
+            self._by_status[candidate.status].add(candidate_id)
+        self._ids = sorted(self._candidates)
+        self._by_last_name = sorted(
+            (candidate.last_name.casefold(), candidate_id) for candidate_id, candidate in self._candidates.items()
+        )
+        self._by_updated_at = sorted(
+            (candidate.updated_at, candidate_id) for candidate_id, candidate in self._candidates.items()
+        )
+
+    def _index_add(self, candidate: Candidate) -> None:
+        """Добавляет кандидата во вторичные индексы"""
+        self._by_status[candidate.status].add(candidate.id)
+        bisect.insort(self._ids, candidate.id)
+        bisect.insort(self._by_last_name, (candidate.last_name.casefold(), candidate.id))
+        bisect.insort(self._by_updated_at, (candidate.updated_at, candidate.id))
+
+    def _index_remove(self, candidate: Candidate) -> None:
+        """Удаляет кандидата из вторичных индексов"""
+        self._by_status[candidate.status].discard(candidate.id)
+        for index, key in (
+            (self._ids, candidate.id),
+            (self._by_last_name, (candidate.last_name.casefold(), candidate.id)),
+            (self._by_updated_at, (candidate.updated_at, candidate.id)),
+        ):
+            position = bisect.bisect_left(index, key)
+            if position < len(index) and index[position] == key:
+                del index[position]
+
+    def _remember(self, candidate_id: int) -> None:
+        """Запоминает прежнее состояние кандидата для отката текущей транзакции"""
+        if self._undo_logs:
+            undo = self._undo_logs[-1][0]
+            if candidate_id not in undo:
+                undo[candidate_id] = self._candidates.get(candidate_id)
+
+    def _store(self, candidate: Candidate) -> None:
+        """Кладет кандидата (с заполненным ID) в память, поддерживая индексы"""
+        self._remember(candidate.id)
+        previous = self._candidates.get(candidate.id)
+        if previous is not None:
+            self._index_remove(previous)
+        self._candidates[candidate.id] = candidate
+        self._index_add(candidate)
+
+    @staticmethod
+    def _candidate_to_dict(candidate: Candidate) -> Dict[str, Any]:
+        """Преобразует кандидата в словарь для JSON (enum - значениями, даты - строками ISO)"""
+        candidate_dict = candidate.model_dump()
+        candidate_dict["status"] = candidate.status.value
+        candidate_dict["sex"] = candidate.sex.value if candidate.sex else None
+        candidate_dict["birth_date"] = candidate.birth_date.isoformat() if candidate.birth_date else None
+        candidate_dict["updated_at"] = candidate.updated_at.isoformat() if candidate.updated_at else None
+        return candidate_dict
+
+    def _dict_to_candidate(self, data: Dict[str, Any]) -> Candidate:
+        """Восстанавливает кандидата из словаря, сохраненного _candidate_to_dict"""
+        birth_date = data.get("birth_date")
+        sex = data.get("sex")
+        updated_at = data.get("updated_at")
+        return self._make_candidate(
+            id=data.get("id"),
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+            phone=data.get("phone"),
+            birth_date=datetime.datetime.fromisoformat(birth_date) if birth_date is not None else None,
+            sex=_SEX_BY_VALUE[sex] if sex is not None else None,
+            status=_STATUS_BY_VALUE[data["status"]],
+            comments=data.get("comments"),
+            # Если updated_at отсутствует, устанавливаем текущее время
+            updated_at=datetime.datetime.fromisoformat(updated_at) if updated_at is not None else datetime.datetime.now(),
+            # Файлы, сохраненные до появления версий, получают версию 1
+            version=data.get("version") or 1,
+        )
 
     def _load_data(self) -> None:
-        """Загружает данные из файла в память"""
+        """Загружает снимок из файла в память и проигрывает поверх него журнал"""
+        self._candidates = {}
+        self._next_id = 1
         if self._storage_file.exists():
             try:
                 with open(self._storage_file, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                    candidates_dict = {}
-                    for k, v in data.get("candidates", {}).items():
-                        # Преобразуем enum из значений обратно в enum
-                        if "status" in v:
-                            v["status"] = CandidateStatus(v["status"])
-                        if "sex" in v and v["sex"] is not None:
-                            v["sex"] = CandidateSex(v["sex"])
-                        # Преобразуем строку обратно в datetime
-                        if "birth_date" in v and v["birth_date"] is not None:
-                            from datetime import datetime
-                            v["birth_date"] = datetime.fromisoformat(v["birth_date"])
-                        # Преобразуем updated_at из строки в datetime
-                        if "updated_at" in v and v["updated_at"] is not None:
-                            from datetime import datetime
-                            v["updated_at"] = datetime.fromisoformat(v["updated_at"])
-                        else:
-                            # Если updated_at отсутствует, устанавливаем текущее время
-                            v["updated_at"] = datetime.datetime.now()
-                        candidates_dict[int(k)] = Candidate(**v)
-                    self._candidates = candidates_dict
+                    self._candidates = {
+                        int(k): self._dict_to_candidate(v) for k, v in data.get("candidates", {}).items()
+                    }
                     self._next_id = data.get("next_id", 1)
             except (json.JSONDecodeError, KeyError, ValueError, TypeError):
                 self._candidates = {}
                 self._next_id = 1
-        else:
+        if self._journal_enabled:
+            for journal_file in (self._rotated_journal_file, self._journal_file):
+                self._replay_journal(journal_file)
+
+    def _replay_journal(self, journal_file: Path) -> None:
+        """
+        Применяет записи журнала к данным в памяти.
+        Записи идемпотентны, поэтому повторное проигрывание уже сжатой части журнала безопасно.
+        Оборванная последняя строка (сбой во время записи) пропускается.
+        """
+        if not journal_file.exists():
+            return
+        with open(journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._apply_record(record)
+                self._journal_records += 1
+
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        """Применяет одну запись журнала к словарю кандидатов (индексы перестраиваются отдельно)"""
+        operation = record.get("op")
+        if operation == "upsert":
+            candidate = self._dict_to_candidate(record["candidate"])
+            self._candidates[candidate.id] = candidate
+            self._next_id = max(self._next_id, record.get("next_id", candidate.id + 1))
+        elif operation == "delete":
+            self._candidates.pop(record["id"], None)
+        elif operation == "clear":
             self._candidates = {}
             self._next_id = 1
 
-    def _save_data(self) -> None:
-        """Сохраняет данные из памяти в файл"""
+    def _write_snapshot(self, candidates: Dict[int, Candidate], next_id: int) -> None:
+        """
+        Записывает снимок во временный файл и атомарно подменяет им файл хранилища,
+        поэтому читатели никогда не видят частично записанный файл.
+        """
         self._storage_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Преобразуем Candidate в словарь для JSON
-        candidates_dict = {}
-        for candidate_id, candidate in self._candidates.items():
-            candidate_dict = candidate.model_dump()
-            # Преобразуем enum в их значения для JSON
-            if candidate_dict.get("status"):
-                candidate_dict["status"] = candidate.status.value
-            if candidate_dict.get("sex"):
-                candidate_dict["sex"] = candidate.sex.value
-            # Преобразуем datetime в строку для JSON
-            if candidate_dict.get("birth_date"):
-                candidate_dict["birth_date"] = candidate.birth_date.isoformat() if candidate.birth_date else None
-            # Преобразуем updated_at в строку для JSON
-            if candidate_dict.get("updated_at"):
-                candidate_dict["updated_at"] = candidate.updated_at.isoformat() if candidate.updated_at else None
-            candidates_dict[str(candidate_id)] = candidate_dict
-        
         data = {
-            "candidates": candidates_dict,
-            "next_id": self._next_id
+            "candidates": {str(candidate_id): self._candidate_to_dict(candidate) for candidate_id, candidate in candidates.items()},
+            "next_id": next_id
         }
-        
-        with open(self._storage_file, "w", encoding="utf-8") as f:
+        tmp_file = self._storage_file.with_name(self._storage_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            if self._fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, self._storage_file)
+
+    def _save_data(self) -> None:
+        """Сохраняет данные из памяти в файл"""
+        self._write_snapshot(self._candidates, self._next_id)
+
+    def _persist(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Сохраняет изменения: в режиме журнала дописывает записи в конец журнала (O(1) на изменение),
+        иначе перезаписывает файл хранилища целиком.
+        :param records: Записи журнала, описывающие изменения
+        """
+        if self._undo_logs:
+            # Внутри transaction() записи копятся до фиксации внешнего блока
+            self._pending_records.extend(records)
+            return
+        if not records:
+            return
+        if not self._journal_enabled:
+            self._save_data()
+            return
+        if self._journal is None:
+            self._journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self._journal_file, "a", encoding="utf-8")
+        self._journal.write("".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records
+        ))
+        self._journal.flush()
+        if self._fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_records += len(records)
+        if self._journal_records >= self._compact_threshold:
+            if self._compaction_thread is not None:
+                self._compaction_requested.set()
+            else:
+                self.compact()
+
+    @contextmanager
+    def transaction(self) -> Iterator["JsonCandidateRepository"]:
+        """
+        Накапливает изменения в памяти и сохраняет их одной записью файла (или одной пачкой
+        записей журнала) при выходе из внешнего блока. При исключении изменения блока
+        откатываются по журналу отмены, который хранит только затронутых кандидатов.
+        """
+        with self._lock:
+            self._undo_logs.append(({}, self._next_id, len(self._pending_records)))
+            try:
+                yield self
+            except BaseException:
+                self._rollback(*self._undo_logs.pop())
+                raise
+            undo, next_id, pending = self._undo_logs.pop()
+            if self._undo_logs:
+                outer_undo = self._undo_logs[-1][0]
+                for candidate_id, previous in undo.items():
+                    outer_undo.setdefault(candidate_id, previous)
+                return
+            records, self._pending_records = self._pending_records, []
+            try:
+                self._persist(records)
+            except BaseException:
+                self._rollback(undo, next_id, pending)
+                raise
+
+    def _rollback(self, undo: Dict[int, Optional[Candidate]], next_id: int, pending: int) -> None:
+        """Возвращает кандидатов, ID и несохраненные записи в состояние на начало блока"""
+        for candidate_id, previous in undo.items():
+            current = self._candidates.pop(candidate_id, None)
+            if current is not None:
+                self._index_remove(current)
+            if previous is not None:
+                self._candidates[candidate_id] = previous
+                self._index_add(previous)
+        self._next_id = next_id
+        del self._pending_records[pending:]
+
+    def _upsert_record(self, candidate: Candidate) -> Dict[str, Any]:
+        return {"op": "upsert", "candidate": self._candidate_to_dict(candidate), "next_id": self._next_id}
+
+    def compact(self) -> None:
+        """
+        Сжимает журнал в новый снимок.
+        Под блокировкой только фиксируется состояние и журнал переименовывается в .journal.old,
+        сам снимок пишется без блокировки - запись новых изменений в это время не ждет.
+        """
+        if not self._journal_enabled:
+            with self._lock:
+                self._save_data()
+            return
+        with self._compaction_lock:
+            with self._lock:
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                if self._journal_file.exists() and not self._rotated_journal_file.exists():
+                    os.replace(self._journal_file, self._rotated_journal_file)
+                candidates = dict(self._candidates)
+                next_id = self._next_id
+                self._journal_records = 0
+            self._write_snapshot(candidates, next_id)
+            self._rotated_journal_file.unlink(missing_ok=True)
+
+    def _compaction_loop(self) -> None:
+        """Фоновый поток сжатия журнала"""
+        while not self._closed.is_set():
+            self._compaction_requested.wait()
+            self._compaction_requested.clear()
+            if self._closed.is_set():
+                break
+            self.compact()
+
+    def close(self) -> None:
+        """Останавливает фоновое сжатие и закрывает журнал"""
+        self._closed.set()
+        self._compaction_requested.set()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
 
     def get_all(self) -> List[Candidate]:
         """Возвращает список всех кандидатов"""
@@ -303,34 +1431,260 @@ class JsonCandidateRepository(CandidateRepository):
         """Возвращает кандидата по ID или None, если не найден"""
         return self._candidates.get(candidate_id)
 
+    def get_revision(self, candidate_id: int) -> Optional[datetime.datetime]:
+        candidate = self._candidates.get(candidate_id)
+        return candidate.updated_at if candidate is not None else None
+
+    def get_collection_revision(self) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+        max_updated_at = self._by_updated_at[-1][0] if self._by_updated_at else None
+        return len(self._candidates), max(self._candidates, default=None), max_updated_at
+
+    def iter_candidates(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500,
+    ) -> Iterator[Candidate]:
+        """
+        Постранично перебирает кандидатов в порядке возрастания ID.
+        Начало каждой страницы находится бинарным поиском по индексу ID после последнего
+        выданного ID, поэтому изменения между страницами не приводят к пропускам и повторам.
+        """
+        if page_size < 1:
+            raise ValueError("Размер страницы должен быть положительным")
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            start = bisect.bisect_right(self._ids, after_id) if after_id is not None else 0
+            page_ids = self._ids[start:start + size]
+            if not page_ids:
+                return
+            page = [self._candidates.get(candidate_id) for candidate_id in page_ids]
+            for candidate in page:
+                if candidate is not None:
+                    yield candidate
+                    if remaining is not None:
+                        remaining -= 1
+            if len(page_ids) < size:
+                return
+            after_id = page_ids[-1]
+
+    def iter_snapshot(
+        self,
+        status: Optional[CandidateStatus] = None,
+        updated_since: Optional[datetime.datetime] = None,
+        fetch_size: int = 1000,
+    ) -> Iterator[Candidate]:
+        """
+        Перебирает кандидатов из снимка списка ID, сделанного в момент вызова.
+        Данные и так находятся в памяти, поэтому fetch_size не используется.
+        """
+        updated_since = local_time(updated_since)
+        for candidate_id in list(self._ids):
+            candidate = self._candidates.get(candidate_id)
+            if candidate is None:
+                continue
+            if status is not None and candidate.status != status:
+                continue
+            if updated_since is not None and candidate.updated_at < updated_since:
+                continue
+            yield candidate
+
+    def find(
+        self,
+        status: Optional[CandidateStatus] = None,
+        last_name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime.datetime] = None,
+        order_by: str = "id",
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+    ) -> List[Candidate]:
+        """
+        Ищет кандидатов по вторичным индексам в памяти.
+        Каждое условие дает множество ID по своему индексу, результат - их пересечение.
+        """
+        field, descending = _parse_order_by(order_by, after_id)
+        selections: List[Set[int]] = []
+        if status is not None:
+            selections.append(self._by_status[status])
+        if last_name_prefix:
+            prefix = last_name_prefix.casefold()
+            start = bisect.bisect_left(self._by_last_name, (prefix,))
+            matched = set()
+            for key, candidate_id in self._by_last_name[start:]:
+                if not key.startswith(prefix):
+                    break
+                matched.add(candidate_id)
+            selections.append(matched)
+        if updated_after is not None:
+            start = bisect.bisect_right(self._by_updated_at, (local_time(updated_after), float("inf")))
+            selections.append({candidate_id for _, candidate_id in self._by_updated_at[start:]})
+
+        if selections:
+            selections.sort(key=len)
+            ids = set(selections[0]).intersection(*selections[1:])
+        else:
+            ids = set(self._candidates)
+        if after_id is not None:
+            ids = {candidate_id for candidate_id in ids if candidate_id > after_id}
+
+        if field == "last_name":
+            key = lambda candidate: (candidate.last_name.casefold(), candidate.id)
+        elif field == "updated_at":
+            key = lambda candidate: (candidate.updated_at, candidate.id)
+        else:
+            key = lambda candidate: candidate.id
+        result = sorted((self._candidates[candidate_id] for candidate_id in ids), key=key, reverse=descending)
+        return result[:limit] if limit is not None else result
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        highlight: Tuple[str, str] = DEFAULT_HIGHLIGHT,
+    ) -> List[CandidateSearchHit]:
+        """Полнотекстовый поиск перебором кандидатов в памяти"""
+        terms = _search_terms(query)
+        if not terms:
+            return []
+        hits = []
+        for candidate in self._candidates.values():
+            hit = _rank_in_memory(candidate, terms, highlight)
+            if hit is not None:
+                hits.append(hit)
+        hits.sort(key=lambda hit: (hit.rank, hit.candidate.id))
+        return hits[:limit]
+
+    def count(self) -> int:
+        """Возвращает общее количество кандидатов"""
+        return len(self._candidates)
+
+    def count_by_status(self) -> Dict[CandidateStatus, int]:
+        """Возвращает количество кандидатов по каждому статусу из индекса статусов"""
+        return {status: len(self._by_status[status]) for status in CandidateStatus}
+
+    def statistics(
+        self,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        as_of: Optional[datetime.date] = None,
+    ) -> CandidateStatistics:
+        """Один проход по кандидатам в памяти: те же группы, что у SQLite, считаются в Counter"""
+        as_of = as_of or datetime.date.today()
+        as_of_day = (as_of.month, as_of.day)
+        since, until = local_time(since), local_time(until)
+        decided = (CandidateStatus.APPROVED, CandidateStatus.REJECTED)
+        groups: Counter = Counter()
+        decisions: Counter = Counter()
+        with self._lock:
+            for candidate in self._candidates.values():
+                updated_at = candidate.updated_at
+                if (since is not None and updated_at < since) or (until is not None and updated_at >= until):
+                    continue
+                birth_date = candidate.birth_date
+                age = (
+                    as_of.year - birth_date.year - ((birth_date.month, birth_date.day) > as_of_day)
+                    if birth_date is not None else None
+                )
+                groups[(candidate.status.value, candidate.sex.value if candidate.sex else None, age_group(age))] += 1
+                if candidate.status in decided:
+                    decisions[(candidate.status.value, updated_at.date())] += 1
+        return _build_statistics(
+            ((*key, count) for key, count in groups.items()),
+            ((*key, count) for key, count in decisions.items()),
+        )
+
     def insert_or_update(self, candidate: Candidate) -> int:
         """
         Вставляет нового кандидата или обновляет существующего.
+        Если у кандидата указана версия, обновление выполняется только при совпадении версии.
         :param candidate: Кандидат для вставки/обновления
         :return: ID кандидата
+        :raises ConcurrentModificationError: Если кандидата изменили после чтения указанной версии.
         """
-        if candidate.id is None:
-            # Новый кандидат - генерируем ID
-            candidate_id = self._next_id
-            self._next_id += 1
-            candidate_with_id = candidate.model_copy(update={"id": candidate_id})
-            self._candidates[candidate_id] = candidate_with_id
-        else:
-            # Обновление существующего кандидата
-            candidate_id = candidate.id
-            self._candidates[candidate_id] = candidate
-        
-        self._save_data()
+        with self._lock:
+            if candidate.id is None:
+                # Новый кандидат - генерируем ID
+                candidate_id = self._next_id
+                self._next_id += 1
+                candidate = candidate.model_copy(update={"id": candidate_id, "version": 1})
+            else:
+                # Обновление существующего кандидата
+                candidate_id = candidate.id
+                existing = self._candidates.get(candidate_id)
+                if candidate.version is not None and (existing is None or candidate.version != existing.version):
+                    # Кандидата нет: его удалили после чтения указанной версии
+                    raise ConcurrentModificationError(
+                        candidate_id, candidate.version, existing.version if existing else None
+                    )
+                version = existing.version + 1 if existing is not None else 1
+                candidate = candidate.model_copy(update={"version": version})
+                self._next_id = max(self._next_id, candidate_id + 1)
+            self._store(candidate)
+            self._persist([self._upsert_record(candidate)])
         return candidate_id
 
+    def insert_many(self, candidates: Iterable[Candidate]) -> int:
+        """
+        Вставляет новых кандидатов с одной записью файла.
+        ID переданных кандидатов игнорируются, новые ID назначаются по порядку.
+        :param candidates: Кандидаты для вставки
+        :return: Количество вставленных кандидатов
+        """
+        with self._lock:
+            records = []
+            for candidate in candidates:
+                candidate_id = self._next_id
+                self._next_id += 1
+                candidate = candidate.model_copy(update={"id": candidate_id, "version": 1})
+                self._store(candidate)
+                records.append(self._upsert_record(candidate))
+            self._persist(records)
+        return len(records)
+
+    def set_status(
+        self,
+        candidate_ids: Iterable[int],
+        new_status: CandidateStatus,
+        expected_status: Optional[CandidateStatus] = None,
+        expected_version: Optional[int] = None,
+    ) -> StatusChangeResult:
+        """Меняет статус кандидатов в памяти с одной записью файла"""
+        result = StatusChangeResult()
+        updated_at = datetime.datetime.now()
+        with self._lock:
+            for candidate_id in dict.fromkeys(candidate_ids):
+                candidate = self._candidates.get(candidate_id)
+                if candidate is None:
+                    result.missing.append(candidate_id)
+                elif (
+                    expected_status is not None and candidate.status != expected_status
+                    or expected_version is not None and candidate.version != expected_version
+                ):
+                    result.conflicting.append(candidate_id)
+                else:
+                    updated = candidate.model_copy(
+                        update={"status": new_status, "updated_at": updated_at, "version": candidate.version + 1}
+                    )
+                    self._store(updated)
+                    result.changed.append(updated)
+            self._persist([self._upsert_record(candidate) for candidate in result.changed])
+        return result
+
     def delete(self, candidate_id: int) -> None:
         """Удаляет кандидата по ID"""
-        if candidate_id in self._candidates:
-            del self._candidates[candidate_id]
-            self._save_data()
+        with self._lock:
+            if candidate_id in self._candidates:
+                self._remember(candidate_id)
+                self._index_remove(self._candidates.pop(candidate_id))
+                self._persist([{"op": "delete", "id": candidate_id}])
 
     def clear_all(self) -> None:
         """Очищает репозиторий от всех данных"""
-        self._candidates = {}
-        self._next_id = 1
-        self._save_data()
+        with self._lock:
+            for candidate_id in self._candidates:
+                self._remember(candidate_id)
+            self._candidates = {}
+            self._next_id = 1
+            self._rebuild_indexes()
+            self._persist([{"op": "clear"}])
@@ -0,0 +1,346 @@
+"""
+Профилировщик запросов SQLite: журнал медленных запросов с планом выполнения и сводка по шаблонам запросов.
+Включается явно (SqliteCandidateRepository(profiler=...), hrm db profile); без него соединение
+открывается обычным sqlite3.connect и ничего не замеряется.
+"""
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+PROGRESS_STEP = 1000
+"""
+Через сколько инструкций виртуальной машины SQLite вызывается обработчик прогресса.
+Количество инструкций - оценка работы запроса, не зависящая от нагрузки на машину:
+полный просмотр таблицы вместо поиска по индексу виден по нему даже на маленькой базе.
+"""
+
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Шаблон запроса: пробелы нормализованы, литералы заменены на ?, списки параметров - на (...).
+    Запросы, отличающиеся только значениями, получают один шаблон.
+    """
+    normalized = _LITERALS.sub("?", " ".join(sql.split()))
+    return _PARAMETER_LISTS.sub("(...)", normalized)
+
+
+def parameters_shape(parameters: Any) -> str:
+    """
+    Описание параметров запроса без значений (в них персональные данные кандидатов):
+    (int, str, None) или {id: int}; подряд идущие одинаковые типы сворачиваются в int×500.
+    """
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {_type_name(value)}" for name, value in parameters.items()) + "}"
+    runs: List[List[Any]] = []
+    for value in parameters or ():
+        name = _type_name(value)
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return "(" + ", ".join(name if count == 1 else f"{name}×{count}" for name, count in runs) + ")"
+
+
+def _type_name(value: Any) -> str:
+    return "None" if value is None else type(value).__name__
+
+
+@dataclass
+class SlowStatement:
+    """
+    Запрос, выполнявшийся дольше порога.
+    """
+
+    sql: str
+
+    parameters: str
+    """
+    Типы параметров (см. parameters_shape).
+    """
+
+    elapsed: float
+    """
+    Время выполнения и чтения результата, секунды.
+    """
+
+    rows: int
+    """
+    Прочитано строк (для INSERT/UPDATE/DELETE - изменено).
+    """
+
+    plan: List[str] = field(default_factory=list)
+    """
+    Строки EXPLAIN QUERY PLAN с отступами по вложенности.
+    """
+
+
+@dataclass
+class StatementStats:
+    """
+    Сводка по одному шаблону запроса.
+    """
+
+    fingerprint: str
+
+    calls: int = 0
+
+    total: float = 0.0
+    """
+    Суммарное время, секунды.
+    """
+
+    max: float = 0.0
+
+    rows: int = 0
+
+    vm_steps: int = 0
+    """
+    Оценка количества инструкций виртуальной машины SQLite (с точностью до PROGRESS_STEP).
+    """
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    @property
+    def repeated_lookup(self) -> bool:
+        """Много выборок, каждая читает не больше одной строки - вероятный признак N+1"""
+        return self.fingerprint.startswith("SELECT") and self.calls >= 10 and self.rows <= self.calls
+
+
+class StatementProfiler:
+    """
+    Профилировщик запросов SQLite.
+    Соединение, открытое через connect(), замеряет каждый запрос от execute() до чтения последней
+    строки результата (время между вызовами курсора не учитывается) и считает инструкции
+    виртуальной машины обработчиком прогресса sqlite3.
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = 0.1,
+        explain: bool = True,
+        on_slow: Optional[Callable[[SlowStatement], None]] = None,
+        max_slow_statements: int = 100,
+    ):
+        """
+        :param slow_threshold: Порог медленного запроса, секунды.
+        :param explain: Получать план выполнения медленных запросов (EXPLAIN QUERY PLAN).
+        :param on_slow: Вызывается для каждого медленного запроса, например для вывода в журнал.
+        :param max_slow_statements: Сколько последних медленных запросов хранить в slow_statements.
+        """
+        self.slow_threshold = slow_threshold
+        self._explain = explain
+        self._on_slow = on_slow
+        self._lock = threading.Lock()
+        self._stats: Dict[str, StatementStats] = {}
+        self.slow_statements: Deque[SlowStatement] = deque(maxlen=max_slow_statements)
+
+    def connect(self, database: Any, **kwargs: Any) -> sqlite3.Connection:
+        """
+        Открывает соединение, запросы которого замеряются.
+        :param database: Путь к файлу БД.
+        :param kwargs: Остальные параметры sqlite3.connect.
+        """
+        conn = sqlite3.connect(database, factory=_ProfilingConnection, **kwargs)
+        conn.profiler = self
+        conn.set_progress_handler(conn.count_steps, PROGRESS_STEP)
+        return conn
+
+    def summary(self) -> List[StatementStats]:
+        """Сводка по шаблонам запросов, по убыванию суммарного времени"""
+        with self._lock:
+            return sorted(
+                (StatementStats(**vars(stats)) for stats in self._stats.values()),
+                key=lambda stats: stats.total,
+                reverse=True,
+            )
+
+    def reset(self) -> None:
+        """Очищает сводку и журнал медленных запросов"""
+        with self._lock:
+            self._stats.clear()
+            self.slow_statements.clear()
+
+    def _record(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        parameters: Any,
+        elapsed: float,
+        rows: int,
+        vm_steps: int,
+    ) -> None:
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(key)
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.rows += rows
+            stats.vm_steps += vm_steps
+        if elapsed < self.slow_threshold:
+            return
+        slow = SlowStatement(
+            sql=" ".join(sql.split()),
+            parameters=parameters_shape(parameters),
+            elapsed=elapsed,
+            rows=rows,
+            plan=self._query_plan(conn, sql, parameters) if self._explain else [],
+        )
+        with self._lock:
+            self.slow_statements.append(slow)
+        if self._on_slow is not None:
+            self._on_slow(slow)
+
+    @staticmethod
+    def _query_plan(conn: sqlite3.Connection, sql: str, parameters: Any) -> List[str]:
+        """EXPLAIN QUERY PLAN запроса; пустой список для служебных команд и при ошибке"""
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return []
+        # Обычный курсор: план не должен попадать в профиль
+        cursor = sqlite3.Cursor(conn)
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+            depth: Dict[int, int] = {0: -1}
+            plan = []
+            for node_id, parent_id, _, detail in cursor.fetchall():
+                depth[node_id] = depth.get(parent_id, -1) + 1
+                plan.append("  " * depth[node_id] + detail)
+            return plan
+        except sqlite3.Error:
+            return []
+        finally:
+            cursor.close()
+
+
+class _ProfilingConnection(sqlite3.Connection):
+    """Соединение, курсоры которого замеряют запросы"""
+
+    profiler: StatementProfiler
+
+    steps = 0
+    """
+    Количество вызовов обработчика прогресса с открытия соединения.
+    """
+
+    def count_steps(self) -> int:
+        self.steps += 1
+        return 0
+
+    def cursor(self, factory: type = None) -> sqlite3.Cursor:
+        return super().cursor(factory or _ProfilingCursor)
+
+    # Connection.execute() создает курсор в обход cursor(), поэтому переопределяется отдельно
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class _ProfilingCursor(sqlite3.Cursor):
+    """
+    Курсор, который копит время и строки текущего запроса в своих вызовах
+    и передает их профилировщику, когда результат прочитан, курсор закрыт или выполняется следующий запрос.
+    """
+
+    def __init__(self, connection: _ProfilingConnection):
+        super().__init__(connection)
+        self._statement: Optional[list] = None
+
+    def _start(self, sql: str, parameters: Any) -> None:
+        self._finish()
+        # sql, parameters, время, строки, шаги виртуальной машины
+        self._statement = [sql, parameters, 0.0, 0, 0]
+
+    def _measured(self, call: Callable, *args: Any) -> Any:
+        statement = self._statement
+        conn = self.connection
+        started, steps = time.perf_counter(), conn.steps
+        try:
+            return call(*args)
+        finally:
+            if statement is not None:
+                statement[2] += time.perf_counter() - started
+                statement[4] += (conn.steps - steps) * PROGRESS_STEP
+
+    def _finish(self, rows: int = 0) -> None:
+        statement, self._statement = self._statement, None
+        if statement is not None:
+            sql, parameters, elapsed, fetched, vm_steps = statement
+            self.connection.profiler._record(self.connection, sql, parameters, elapsed, fetched + rows, vm_steps)
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        self._start(sql, parameters)
+        try:
+            self._measured(super().execute, sql, parameters)
+        except BaseException:
+            self._finish()
+            raise
+        if self.description is None:
+            # Команда без результата: строки - количество измененных
+            self._finish(max(self.rowcount, 0))
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        self._start(sql, ())
+        try:
+            self._measured(super().executemany, sql, seq_of_parameters)
+        finally:
+            self._finish(max(self.rowcount, 0))
+        return self
+
+    def fetchone(self) -> Any:
+        row = self._measured(super().fetchone)
+        if row is None:
+            self._finish()
+        elif self._statement is not None:
+            self._statement[3] += 1
+        return row
+
+    def fetchmany(self, *args: Any) -> list:
+        rows = self._measured(super().fetchmany, *args)
+        if not rows:
+            self._finish()
+        elif self._statement is not None:
+            self._statement[3] += len(rows)
+        return rows
+
+    def fetchall(self) -> list:
+        rows = self._measured(super().fetchall)
+        self._finish(len(rows))
+        return rows
+
+    def __next__(self) -> Any:
+        try:
+            row = self._measured(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        if self._statement is not None:
+            self._statement[3] += 1
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        # Курсоры Connection.execute() обычно не закрываются явно
+        try:
+            self._finish()
+        except Exception:
+            pass
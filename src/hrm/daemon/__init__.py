@@ -0,0 +1,3 @@
+from hrm.daemon.client import forward, request, serve, socket_path, start_background, status, stop
+
+__all__ = ["forward", "request", "serve", "socket_path", "start_background", "status", "stop"]
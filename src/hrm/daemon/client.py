@@ -0,0 +1,289 @@
+"""
+Тонкий клиент демона hrm: передает команды долгоживущему процессу с прогретыми UseCases и хранилищем
+(соединение, кэш, проверенная схема) вместо их выполнения в новом процессе.
+
+Протокол - кадры из 4 байт длины (big-endian) и JSON в UTF-8: клиент отправляет один запрос
+{"op": "run" | "status" | "stop", ...}, демон отвечает одним кадром. Для команды ответ содержит
+её stdout, stderr и код завершения.
+
+Сокет создается с правами 0600 в каталоге пользователя с правами 0700, имя зависит от пути к базе данных,
+поэтому клиент попадает только в демон, который работает с той же базой, что и он сам. Перед соединением
+клиент проверяет владельца и права каталога и сокета: чужой сокет по тому же пути не получит команду.
+Модуль импортирует только os, sys, socket, stat, json, struct и zlib: он загружается при каждом запуске hrm.
+"""
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import zlib
+from typing import Any, Dict, List, Optional
+
+from hrm.core.paths import default_db_file
+
+
+NO_DAEMON_ENV = "HRM_NO_DAEMON"
+"""
+Переменная окружения, которая отключает передачу команд демону.
+"""
+
+LOCAL_COMMANDS = frozenset({
+    "daemon", "serve", "shell", "batch", "db",
+    # Файлы указываются относительно текущего каталога клиента, а не демона
+    "import", "export",
+    # Диалог с пользователем требует терминала клиента
+    "add-interactive", "edit-interactive",
+})
+"""
+Команды, которые всегда выполняются в процессе клиента.
+"""
+
+CONNECT_TIMEOUT = 1.0
+"""
+Сколько секунд клиент ждет соединения с демоном, прежде чем выполнить команду сам.
+"""
+
+_HEADER = struct.Struct(">I")
+
+
+def socket_directory() -> str:
+    """
+    Каталог сокетов демона текущего пользователя: $XDG_RUNTIME_DIR/hrm или /tmp/hrm-<uid>.
+    Каталог создается с правами 0700; имя в /tmp предсказуемо, поэтому владелец и права проверяются
+    и клиентом, и демоном (см. _check_owned).
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base:
+        return os.path.join(base, "hrm")
+    return os.path.join("/tmp", f"hrm-{os.getuid()}")
+
+
+def socket_path(db_file: Optional[str] = None) -> str:
+    """
+    Путь к сокету демона для базы данных.
+    :param db_file: Путь к базе данных. По умолчанию - как у SqliteCandidateRepository.
+    """
+    db_file = os.path.realpath(db_file or default_db_file())
+    # Совпадение контрольных сумм разных путей безопасно: демон сверяет путь к базе в каждом запросе
+    digest = zlib.crc32(db_file.encode("utf-8"))
+    return os.path.join(socket_directory(), f"{digest:08x}.sock")
+
+
+def _check_owned(path: str, kind: int, mode: int) -> None:
+    """
+    Проверяет, что файл принадлежит текущему пользователю, имеет нужный тип и права.
+    Символические ссылки не разыменовываются.
+    :raises PermissionError: Если проверка не пройдена.
+    """
+    info = os.lstat(path)
+    if stat.S_IFMT(info.st_mode) != kind or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != mode:
+        raise PermissionError(
+            f"{path}: ожидается владелец uid {os.getuid()} и права {mode:04o}, "
+            f"найдены uid {info.st_uid} и права {stat.S_IMODE(info.st_mode):04o}"
+        )
+
+
+def prepare_socket_directory() -> str:
+    """
+    Создает каталог сокетов с правами 0700 или проверяет существующий.
+    :return: Путь к каталогу.
+    :raises PermissionError: Если каталог принадлежит другому пользователю или доступен другим.
+    """
+    directory = socket_directory()
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    _check_owned(directory, stat.S_IFDIR, 0o700)
+    return directory
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Соединение с демоном закрыто")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _receive(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(_receive_exactly(sock, _HEADER.size))
+    return json.loads(_receive_exactly(sock, size).decode("utf-8"))
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    """Соединяется с демоном; None, если демон не запущен или сокет не принадлежит пользователю"""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        _check_owned(os.path.dirname(path), stat.S_IFDIR, 0o700)
+        _check_owned(path, stat.S_IFSOCK, 0o600)
+    except FileNotFoundError:
+        return None
+    except PermissionError as e:
+        sys.stderr.write(f"Сокет демона не используется: {e}\n")
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        # Сокет остался от аварийно завершенного демона
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: Dict[str, Any], db_file: Optional[str] = None, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Отправляет запрос демону.
+    :param message: Запрос.
+    :param db_file: База данных демона. По умолчанию - как у SqliteCandidateRepository.
+    :param timeout: Ожидание ответа в секундах; None - без ограничения.
+    :return: Ответ демона или None, если демон не запущен.
+    :raises ConnectionError: Если демон принял запрос, но не ответил на него.
+    """
+    sock = _connect(socket_path(db_file))
+    if sock is None:
+        return None
+    with sock:
+        sock.settimeout(timeout)
+        try:
+            _send(sock, message)
+            return _receive(sock)
+        except (OSError, ValueError) as e:
+            raise ConnectionError(f"Демон не ответил на запрос: {e}") from e
+
+
+def _forwardable(argv: List[str]) -> bool:
+    """Можно ли выполнить команду в демоне, не меняя её поведения"""
+    if os.environ.get(NO_DAEMON_ENV) or os.environ.get("HRM_METRICS"):
+        return False
+    command = next((arg for arg in argv if not arg.startswith("-")), None)
+    if command is None or command in LOCAL_COMMANDS:
+        return False
+    if any(arg == "--metrics-out" or arg.startswith("--ids-file") for arg in argv):
+        return False
+    # Без --force команды спрашивают подтверждение
+    if command in ("delete", "clear") and not {"--force", "-f"} & set(argv):
+        return False
+    return True
+
+
+def _terminal() -> Dict[str, Any]:
+    """Параметры терминала клиента, под которые демон форматирует вывод Rich"""
+    tty = sys.stdout.isatty()
+    width = None
+    if os.environ.get("COLUMNS", "").isdigit():
+        width = int(os.environ["COLUMNS"])
+    elif tty:
+        try:
+            width = os.get_terminal_size(sys.stdout.fileno()).columns
+        except OSError:
+            pass
+    return {"tty": tty, "width": width, "no_color": "NO_COLOR" in os.environ}
+
+
+def forward(argv: List[str]) -> Optional[int]:
+    """
+    Выполняет команду hrm в демоне, если он запущен для той же базы данных.
+    :param argv: Аргументы командной строки без имени программы.
+    :return: Код завершения команды или None, если команду нужно выполнить в текущем процессе.
+    """
+    if not _forwardable(argv):
+        return None
+    db_file = os.path.realpath(default_db_file())
+    try:
+        response = request({"op": "run", "argv": argv, "db": db_file, **_terminal()}, db_file)
+    except ConnectionError as e:
+        # Команда могла быть уже выполнена: повторять её в этом процессе нельзя
+        sys.stderr.write(f"{e}\n")
+        return 1
+    if response is None or "exit" not in response:
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(response["stderr"])
+    return response["exit"]
+
+
+def status(db_file: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Состояние демона или None, если он не запущен"""
+    try:
+        return request({"op": "status"}, db_file, timeout=5.0)
+    except ConnectionError:
+        return None
+
+
+def stop(db_file: Optional[str] = None, timeout: float = 10.0) -> bool:
+    """
+    Останавливает демон и ждет, пока он освободит сокет.
+    :return: False, если демон не был запущен.
+    """
+    import time
+
+    if status(db_file) is None:
+        return False
+    request({"op": "stop"}, db_file, timeout=5.0)
+    deadline = time.monotonic() + timeout
+    while os.path.lexists(socket_path(db_file)) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+
+def start_background(db_file: Optional[str] = None, timeout: float = 15.0) -> Dict[str, Any]:
+    """
+    Запускает демон отдельным процессом в новом сеансе и ждет его готовности.
+    Ошибки демона пишутся в файл рядом с сокетом (<сокет>.log).
+    :return: Состояние запущенного демона.
+    :raises RuntimeError: Если демон не запустился за timeout секунд.
+    """
+    import subprocess
+    import time
+
+    db_file = os.path.realpath(db_file or default_db_file())
+    prepare_socket_directory()
+    log_file = socket_path(db_file) + ".log"
+    with open(log_file, "ab") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "hrm", "daemon", "start", "--foreground"],
+            env={**os.environ, "HRM_DB_PATH": db_file},
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = status(db_file)
+        if state is not None:
+            return state
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    raise RuntimeError(f"Демон не запустился, подробности в {log_file}")
+
+
+def serve(db_file: Optional[str] = None, on_ready=None) -> None:
+    """
+    Выполняет демон в текущем процессе до запроса stop, SIGTERM или Ctrl+C.
+    :param db_file: База данных. По умолчанию - как у SqliteCandidateRepository.
+    :param on_ready: Вызывается с путем к сокету, когда демон готов принимать запросы.
+    :raises RuntimeError: Если демон для этой базы данных уже запущен.
+    """
+    from hrm.daemon.server import DaemonServer
+
+    db_file = os.path.realpath(db_file or default_db_file())
+    path = socket_path(db_file)
+    if status(db_file) is not None:
+        raise RuntimeError(f"Демон для {db_file} уже запущен")
+    DaemonServer(path, db_file).serve(on_ready)
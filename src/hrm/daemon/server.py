@@ -0,0 +1,256 @@
+"""
+Сервер демона hrm - Composition Root долгоживущего процесса для команд CLI.
+Каждое соединение обслуживается отдельным потоком, команды выполняются тем же приложением Typer,
+что и в обычном запуске, поверх общих UseCases. Доступ к базе данных сериализуется блокировками
+репозитория и кэша, поэтому одновременные клиенты не мешают друг другу.
+"""
+import collections
+import io
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from hrm.daemon.client import LOCAL_COMMANDS, _receive, _send, prepare_socket_directory
+
+
+RATE_WINDOW = 60.0
+"""
+Окно, за которое считается текущая частота запросов, секунды.
+"""
+
+EXTERNAL_CHANGES_INTERVAL = 1.0
+"""
+Как часто кэш демона проверяет, не изменили ли базу другие процессы, секунды.
+"""
+
+
+class _ThreadLocalStream:
+    """
+    Заменяет sys.stdout и sys.stderr процесса демона: вывод команды попадает в буфер потока,
+    который её выполняет, остальной вывод - в исходный поток.
+    """
+
+    def __init__(self, default: Any):
+        self._default = default
+        self._local = threading.local()
+
+    def redirect(self, buffer: Optional[io.StringIO]) -> None:
+        self._local.buffer = buffer
+
+    def _target(self) -> Any:
+        return getattr(self._local, "buffer", None) or self._default
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self._target().isatty()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target(), name)
+
+
+class _RequestStats:
+    """
+    Счетчики запросов демона.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.requests = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.seconds = 0.0
+        self._recent: Deque[float] = collections.deque()
+        self._commands: Dict[str, list] = {}
+
+    def begin(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, command: str, exit_code: int, elapsed: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self.failed += exit_code != 0
+            self.seconds += elapsed
+            self._recent.append(now)
+            self._expire(now)
+            # вызовов, с ошибкой, секунд
+            counters = self._commands.setdefault(command, [0, 0, 0.0])
+            counters[0] += 1
+            counters[1] += exit_code != 0
+            counters[2] += elapsed
+
+    def _expire(self, now: float) -> None:
+        while self._recent and self._recent[0] < now - RATE_WINDOW:
+            self._recent.popleft()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.monotonic())
+            uptime = time.time() - self.started_at
+            return {
+                "uptime": uptime,
+                "requests": self.requests,
+                "failed": self.failed,
+                "in_flight": self.in_flight,
+                "rate": len(self._recent) / min(RATE_WINDOW, max(uptime, 1e-9)),
+                "mean_ms": self.seconds / self.requests * 1000 if self.requests else 0.0,
+                "commands": {
+                    command: {"requests": calls, "failed": failed, "mean_ms": seconds / calls * 1000}
+                    for command, (calls, failed, seconds) in sorted(self._commands.items())
+                },
+            }
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Один запрос на соединение"""
+
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        try:
+            message = _receive(self.request)
+        except (OSError, ValueError):
+            return
+        operation = message.get("op")
+        if operation == "run":
+            response = self.server.run(message)
+        elif operation == "status":
+            response = self.server.status()
+        elif operation == "stop":
+            response = {"stopping": True}
+            self.server.request_stop()
+        else:
+            response = {"error": f"Неизвестная операция: {operation}"}
+        try:
+            _send(self.request, response)
+        except OSError:
+            # Клиент не дождался ответа
+            pass
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Демон: прогретые UseCases и хранилище за Unix-сокетом.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, db_file: str):
+        """
+        Открывает хранилище, применяет миграции и занимает сокет.
+        :param path: Путь к сокету.
+        :param db_file: Путь к базе данных.
+        """
+        from hrm.core.application import UseCases
+        from hrm.core.caching import CachingCandidateRepository
+        from hrm.core.persistence import SqliteCandidateRepository
+
+        self.path = path
+        self.db_file = db_file
+        # Демон живет долго, а в ту же базу могут писать процессы с HRM_NO_DAEMON=1:
+        # их изменения обнаруживаются по PRAGMA data_version, но не перед каждым чтением
+        self._repository = CachingCandidateRepository(
+            SqliteCandidateRepository(db_file), external_changes_interval=EXTERNAL_CHANGES_INTERVAL
+        )
+        self._use_cases = UseCases(self._repository)
+        self._apps: Dict[Tuple[Optional[int], bool, bool], Any] = {}
+        self._apps_lock = threading.Lock()
+        self._stats = _RequestStats()
+        # Каталог 0700 текущего пользователя: другие пользователи не могут подменить в нем сокет
+        prepare_socket_directory()
+        if os.path.lexists(path):
+            # Сокет остался от аварийно завершенного демона (работающий демон проверен до создания сервера)
+            os.unlink(path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(old_umask)
+
+    def _app(self, width: Optional[int], tty: bool, no_color: bool) -> Any:
+        """Приложение CLI с консолью под терминал клиента; создается один раз для каждого вида терминала"""
+        key = (width, tty, no_color)
+        with self._apps_lock:
+            app = self._apps.get(key)
+            if app is None:
+                from rich.console import Console
+
+                from hrm.cli import create_cli_app
+
+                # Консоль без файла пишет в sys.stdout, то есть в буфер потока текущего запроса
+                app = self._apps[key] = create_cli_app(
+                    self._use_cases,
+                    console_factory=lambda: Console(width=width, force_terminal=tty, no_color=no_color),
+                )
+            return app
+
+    def run(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Выполняет команду CLI и возвращает её вывод и код завершения"""
+        from hrm.cli import _run_command
+
+        if message.get("db") != self.db_file:
+            return {"error": f"Демон работает с базой данных {self.db_file}"}
+        argv = [str(arg) for arg in message.get("argv", [])]
+        command = next((arg for arg in argv if not arg.startswith("-")), "")
+        if command in LOCAL_COMMANDS:
+            return {"error": f"Команда {command} выполняется только в процессе клиента"}
+        app = self._app(message.get("width"), bool(message.get("tty")), bool(message.get("no_color")))
+        stdout, stderr = io.StringIO(), io.StringIO()
+        self._stats.begin()
+        started = time.perf_counter()
+        sys.stdout.redirect(stdout)
+        sys.stderr.redirect(stderr)
+        try:
+            exit_code = _run_command(app, argv)
+        except BaseException:
+            traceback.print_exc(file=stderr)
+            exit_code = 1
+        finally:
+            sys.stdout.redirect(None)
+            sys.stderr.redirect(None)
+            self._stats.end(command, exit_code, time.perf_counter() - started)
+        return {"exit": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+    def status(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "db": self.db_file, "socket": self.path, **self._stats.snapshot()}
+
+    def request_stop(self) -> None:
+        """Останавливает цикл обработки запросов; вызывается из любого потока, кроме цикла serve()"""
+        threading.Thread(target=self.shutdown, name="hrm-daemon-stop").start()
+
+    def serve(self, on_ready: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Обрабатывает запросы до stop, SIGTERM или Ctrl+C, затем освобождает сокет и закрывает хранилище.
+        :param on_ready: Вызывается с путем к сокету перед началом обработки запросов.
+        """
+        streams = sys.stdout, sys.stderr, sys.stdin
+        sys.stdout, sys.stderr = _ThreadLocalStream(sys.stdout), _ThreadLocalStream(sys.stderr)
+        # Команды не должны ждать ввода: подтверждения получают конец файла
+        sys.stdin = io.StringIO()
+        previous_handler = signal.signal(signal.SIGTERM, lambda signum, frame: self.request_stop())
+        try:
+            if on_ready is not None:
+                on_ready(self.path)
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            sys.stdout, sys.stderr, sys.stdin = streams
+            self.server_close()
+            if os.path.lexists(self.path):
+                os.unlink(self.path)
+            self._repository.close()
@@ -1,4 +1,20 @@
-from hrm.cli import main
+"""
+Точка входа hrm: передает команду демону, если он запущен, иначе выполняет её в текущем процессе.
+Модуль не импортирует typer, rich и хранилище, пока команда не выполняется локально.
+"""
+import sys
+
+from hrm.daemon.client import forward
+
+
+def main():
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    from hrm.cli import main as cli_main
+
+    cli_main()
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
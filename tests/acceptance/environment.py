@@ -1,14 +1,27 @@
-from tests.acceptance.helpers.driver import CliDriver
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from tests.acceptance.helpers.driver import CliDriver, InProcessCliDriver
 
 
 def before_scenario(context, scenario):
-    import sys
-    context.sut = CliDriver(f"{sys.executable} -m hrm", 1.0)
+    # Каждый сценарий работает с собственной пустой базой данных: сценарии не зависят
+    # от порядка выполнения и могут выполняться параллельно (tests/acceptance/parallel.py)
+    context.scenario_dir = Path(tempfile.mkdtemp(prefix="hrm-acceptance-"))
+    db_file = context.scenario_dir / "candidates.db"
+
+    # behave -D driver=subprocess - каждая команда запускается через python -m hrm, как из терминала
+    if context.config.userdata.get("driver") == "subprocess":
+        context.sut = CliDriver(f"{sys.executable} -m hrm", 30.0, db_file)
+    else:
+        context.sut = InProcessCliDriver(db_file)
     context.expected_candidates = list()
-    
-    context.sut.execute("clear", ["--force"])
 
 
 def after_scenario(context, scenario):
-    pass
-
+    close = getattr(context.sut, "close", None)
+    if close is not None:
+        close()
+    shutil.rmtree(context.scenario_dir, ignore_errors=True)
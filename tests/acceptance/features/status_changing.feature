@@ -1,2 +1,25 @@
 # language: ru
-Функция: Изменение статуса кандидата
\ No newline at end of file
+Функция: Изменение статуса кандидата
+
+  Предыстория:
+    Дано в системе зарегистрированы кандидаты:
+      | Имя     | Фамилия  |
+      | Иван    | Петров   |
+      | Анна    | Сидорова |
+      | Олег    | Смирнов  |
+
+  Сценарий: Принятие нескольких кандидатов одной командой
+    Когда я принимаю кандидатов "Петров, Сидорова"
+    Тогда команда выполнена успешно
+    И статус кандидата "Петров" установлен в "APPROVED"
+    И статус кандидата "Сидорова" установлен в "APPROVED"
+    И статус кандидата "Смирнов" установлен в "REGISTERED"
+
+  Сценарий: Отклонение кандидата
+    Когда я отклоняю кандидатов "Смирнов"
+    Тогда команда выполнена успешно
+    И статус кандидата "Смирнов" установлен в "REJECTED"
+
+  Сценарий: Отклонение несуществующего кандидата
+    Когда я отклоняю кандидата с ID 999999
+    Тогда команда завершилась с ошибкой "Кандидат с ID 999999 не найден"
@@ -1,4 +1,7 @@
+import os
 import subprocess
+import traceback
+from pathlib import Path
 from typing import Optional, List, Any
 
 try:
@@ -54,9 +57,15 @@ class CliDriver:
     Драйвер консольного приложения.
     """
 
-    def __init__(self, app_path: str, app_timeout: float):
+    def __init__(self, app_path: str, app_timeout: float, db_file: Optional[Path] = None):
+        """
+        :param app_path: Команда запуска приложения (например, "python -m hrm").
+        :param app_timeout: Время ожидания завершения команды, секунды.
+        :param db_file: База данных приложения (HRM_DB_PATH). По умолчанию - из окружения.
+        """
         self.app_path = app_path
         self.app_timeout = app_timeout
+        self.env = {**os.environ, "HRM_DB_PATH": str(db_file)} if db_file is not None else None
 
 
     def execute(self, command: str, args: list = None) -> CliResult:
@@ -74,7 +83,8 @@ class CliDriver:
                 capture_output=True,
                 text=True,
                 timeout=self.app_timeout,
-                check=True
+                check=True,
+                env=self.env
             )
 
             return CliResult(
@@ -116,7 +126,7 @@ class CliDriver:
             )
         
         try:
-            child = pexpect.spawn(self.app_path, timeout=self.app_timeout)
+            child = pexpect.spawn(self.app_path, timeout=self.app_timeout, env=self.env)
 
             output = []
             command_parts = []
@@ -159,6 +169,68 @@ class CliDriver:
             )
 
 
+class InProcessCliDriver:
+    """
+    Драйвер, который выполняет команды приложением Typer из create_cli_app в текущем процессе
+    (typer.testing.CliRunner) с перехватом вывода - без запуска интерпретатора на каждую команду.
+    Хранилище открывается один раз на драйвер и закрывается методом close().
+    """
+
+    def __init__(self, db_file: Path):
+        """
+        :param db_file: База данных SQLite сценария.
+        """
+        from typer.testing import CliRunner
+
+        from hrm.cli import create_cli_app
+        from hrm.core.application import UseCases
+        from hrm.core.caching import CachingCandidateRepository
+        from hrm.core.persistence import SqliteCandidateRepository
+
+        # Та же композиция, что и в hrm.cli.main
+        self._repository = CachingCandidateRepository(SqliteCandidateRepository(db_file))
+        self._app = create_cli_app(UseCases(self._repository))
+        self._runner = CliRunner()
+
+    def execute(self, command: str, args: list = None) -> CliResult:
+        """
+        Выполнение простой команды без интерактивного ввода
+        """
+        cmd = [command] + [str(arg) for arg in args or []]
+        command_str = " ".join(["hrm"] + cmd)
+
+        result = self._runner.invoke(self._app, cmd, prog_name="hrm")
+
+        if result.exit_code == 0:
+            return CliResult(
+                success=True,
+                stdout=result.stdout,
+                stderr=result.stderr,
+                return_code=0,
+                command=command_str
+            )
+
+        error_message = f"Команда '{command_str}' завершилась с кодом {result.exit_code}"
+        if result.exception is not None and not isinstance(result.exception, SystemExit):
+            error_message += "\n" + "".join(traceback.format_exception(result.exception))
+        if result.stderr:
+            error_message += f"\nStderr: {result.stderr}"
+        if result.stdout:
+            error_message += f"\nStdout: {result.stdout}"
+
+        return CliResult(
+            success=False,
+            stdout=result.stdout,
+            stderr=result.stderr,
+            return_code=result.exit_code,
+            error=error_message,
+            command=command_str
+        )
+
+    def close(self) -> None:
+        self._repository.close()
+
+
 class CliArgumentBuilder:
     """
     Построитель аргументов для CLI команд.
@@ -0,0 +1,105 @@
+"""
+Параллельный запуск приемочных тестов: сценарии распределяются по шардам, каждый шард выполняется
+отдельным процессом behave. Сценарии независимы (у каждого своя временная база данных),
+поэтому порядок и распределение не влияют на результат.
+
+    python tests/acceptance/parallel.py                  # шардов по числу ядер
+    python tests/acceptance/parallel.py --jobs 4
+    python tests/acceptance/parallel.py --shard 2/4      # только второй из четырех шардов (матрица CI)
+    python tests/acceptance/parallel.py -- -D driver=subprocess
+
+Аргументы после -- передаются каждому процессу behave.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from behave.parser import parse_file
+
+
+FEATURES_DIR = Path(__file__).resolve().parent / "features"
+ROOT = FEATURES_DIR.parents[2]
+
+
+def collect_scenarios(features_dir: Path = FEATURES_DIR) -> List[str]:
+    """
+    Сценарии всех функций в виде путей behave "файл:строка", в порядке файлов и строк.
+    Структура сценария выполняется целиком, со всеми примерами.
+    """
+    locations = []
+    for path in sorted(features_dir.rglob("*.feature")):
+        feature = parse_file(str(path))
+        if feature is None:
+            continue
+        relative = path.relative_to(ROOT)
+        locations += [f"{relative}:{scenario.line}" for scenario in feature.scenarios]
+    return locations
+
+
+def split(locations: List[str], shards: int) -> List[List[str]]:
+    """Распределяет сценарии по шардам по кругу; пустые шарды отбрасываются"""
+    return [shard for shard in (locations[index::shards] for index in range(shards)) if shard]
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Номер шарда и количество шардов из строки вида 2/4"""
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("ожидается НОМЕР/КОЛИЧЕСТВО, например 2/4")
+    if not 1 <= index <= total:
+        raise argparse.ArgumentTypeError("номер шарда должен быть от 1 до количества шардов")
+    return index, total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Параллельный запуск приемочных тестов behave")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="Количество процессов behave")
+    parser.add_argument("--shard", type=parse_shard, help="Выполнить только шард НОМЕР/КОЛИЧЕСТВО")
+    parser.add_argument("behave_args", nargs="*", help="Аргументы behave (после --)")
+    args = parser.parse_args()
+
+    locations = collect_scenarios()
+    if args.shard is not None:
+        index, total = args.shard
+        shards = [locations[index - 1::total]]
+    else:
+        shards = split(locations, max(args.jobs, 1))
+    shards = [shard for shard in shards if shard]
+    if not shards:
+        print("Сценарии не найдены", file=sys.stderr)
+        return 0
+
+    started = time.perf_counter()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "behave", *args.behave_args, *shard],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        for shard in shards
+    ]
+    failed = 0
+    for number, (process, shard) in enumerate(zip(processes, shards), start=1):
+        output, _ = process.communicate()
+        # Вывод шардов не перемешивается: каждый печатается целиком после завершения
+        print(f"===== Шард {number}/{len(shards)}: сценариев {len(shard)}, код {process.returncode} =====")
+        print(output, end="")
+        failed += process.returncode != 0
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"\nСценариев: {sum(len(shard) for shard in shards)}, процессов: {len(shards)}, "
+        f"шардов с ошибкой: {failed}, время: {elapsed:.2f} с"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import re
+from behave import given, when, then
+from tests.acceptance.helpers.driver import CliArgumentBuilder
+
+
+def _ids_by_last_names(context, last_names: str) -> list:
+    return [context.registered_ids[name.strip()] for name in last_names.split(",")]
+
+
+def _change_status(context, command: str, candidate_ids: list) -> None:
+    args = CliArgumentBuilder()
+    for candidate_id in candidate_ids:
+        args.add("--id", candidate_id)
+    context.result = context.sut.execute(command, args.build())
+
+
+@given(u'в системе зарегистрированы кандидаты:')
+def step_impl(context):
+    context.registered_ids = {}
+    for row in context.table:
+        args = CliArgumentBuilder() \
+            .add("--first-name", row["Имя"]) \
+            .add("--last-name", row["Фамилия"]) \
+            .build()
+        result = context.sut.execute("add", args)
+        assert result.success is True, result.get_error_message()
+
+        match = re.search(r'с ID:\s*(\d+)', result.stdout)
+        assert match is not None, f"Не удалось найти ID в выводе:\n{result.stdout}"
+        context.registered_ids[row["Фамилия"]] = int(match.group(1))
+
+
+@when(u'я принимаю кандидатов "{last_names}"')
+def step_impl(context, last_names):
+    _change_status(context, "accept", _ids_by_last_names(context, last_names))
+
+
+@when(u'я отклоняю кандидатов "{last_names}"')
+def step_impl(context, last_names):
+    _change_status(context, "reject", _ids_by_last_names(context, last_names))
+
+
+@when(u'я отклоняю кандидата с ID {candidate_id:d}')
+def step_impl(context, candidate_id):
+    _change_status(context, "reject", [candidate_id])
+
+
+@then(u'команда выполнена успешно')
+def step_impl(context):
+    assert context.result.success is True, context.result.get_error_message()
+
+
+@then(u'команда завершилась с ошибкой "{message}"')
+def step_impl(context, message):
+    assert context.result.success is False, \
+        f"Команда должна была завершиться с ошибкой.\n{context.result.get_error_details()}"
+    assert message in context.result.stdout, \
+        f"В выводе отсутствует сообщение '{message}'.\n{context.result.get_error_details()}"
+
+
+@then(u'статус кандидата "{last_name}" установлен в "{status}"')
+def step_impl(context, last_name, status):
+    candidate_id = context.registered_ids[last_name]
+    args = CliArgumentBuilder().add("--id", candidate_id).build()
+    result = context.sut.execute("get", args)
+    assert result.success is True, result.get_error_message()
+
+    match = re.search(r'Статус:\s*(\w+)', result.stdout)
+    assert match is not None, f"Не удалось найти статус в выводе:\n{result.stdout}"
+    assert match.group(1) == status, \
+        f"Статус кандидата {last_name} (ID: {candidate_id}) равен '{match.group(1)}', ожидался '{status}'"
@@ -0,0 +1,55 @@
+import pytest
+
+from hrm.core.model import Candidate, CandidateStatus
+from hrm.core.persistence import JsonCandidateRepository, SqliteCandidateRepository
+
+
+BACKENDS = ["sqlite", "json"]
+"""
+Хранилища, на которых по умолчанию выполняются тесты с фикстурой repository.
+Модуль может переопределить фикстуру backend, чтобы добавить варианты (json-journal, sqlite-no-fts).
+"""
+
+
+def make_candidate(last_name: str = "Тестов", **fields) -> Candidate:
+    """
+    Кандидат со статусом REGISTERED и минимальным набором полей.
+
+    :param last_name: фамилия
+    :param fields: значения остальных полей, заменяющие значения по умолчанию
+    :return: новый кандидат без идентификатора
+    """
+    values = {"first_name": "Тест", "last_name": last_name, "status": CandidateStatus.REGISTERED}
+    return Candidate(**{**values, **fields})
+
+
+def open_repository(backend: str, tmp_path, **options):
+    """
+    Открывает репозиторий указанного вида во временном каталоге теста.
+    Повторный вызов с тем же каталогом открывает то же хранилище.
+
+    :param backend: sqlite, sqlite-no-fts, json или json-journal
+    :param tmp_path: каталог для файлов хранилища
+    :param options: дополнительные параметры конструктора репозитория
+    :return: репозиторий
+    """
+    if backend.startswith("sqlite"):
+        repo = SqliteCandidateRepository(tmp_path / "candidates.db", **options)
+        if backend == "sqlite-no-fts":
+            # Запасной поиск для сборок SQLite без FTS5
+            repo._fts_enabled = False
+        return repo
+    if backend == "json-journal":
+        options = {"journal": True, **options}
+    return JsonCandidateRepository(tmp_path / "candidates.json", **options)
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def repository(backend, tmp_path):
+    with open_repository(backend, tmp_path) as repo:
+        yield repo
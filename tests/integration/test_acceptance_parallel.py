@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+from tests.acceptance.parallel import ROOT, collect_scenarios, split
+
+
+pytestmark = pytest.mark.integration
+
+
+def test_scenarios_are_split_into_disjoint_shards():
+    locations = collect_scenarios()
+
+    shards = split(locations, 3)
+
+    assert "tests/acceptance/features/status_changing.feature:23" in locations
+    assert sorted(location for shard in shards for location in shard) == sorted(locations)
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+    assert split(locations, len(locations) + 5) == [[location] for location in locations]
+
+
+def test_shard_runs_only_its_scenarios():
+    completed = subprocess.run(
+        [sys.executable, "tests/acceptance/parallel.py", "--shard", "1/2"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+    assert completed.returncode == 0, completed.stdout
+    assert f"Сценариев: {len(collect_scenarios()[::2])}, процессов: 1, шардов с ошибкой: 0" in completed.stdout
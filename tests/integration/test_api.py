@@ -0,0 +1,167 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from hrm.api.main import create_app
+from hrm.core.async_persistence import AsyncSqliteCandidateRepository
+
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = create_app(lambda: AsyncSqliteCandidateRepository(tmp_path / "candidates.db"))
+    with TestClient(app) as client:
+        yield client
+
+
+def register(client, last_name):
+    response = client.post("/candidates", json={"first_name": "Тест", "last_name": last_name})
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_crud(client):
+    created = register(client, "Иванов")
+    assert created["id"] == 1 and created["status"] == 1
+
+    response = client.put("/candidates/1", json={"first_name": "Иван", "last_name": "Иванов", "phone": "123"})
+    assert response.status_code == 200
+    assert response.json()["phone"] == "123"
+    assert client.get("/candidates/1").json()["first_name"] == "Иван"
+
+    assert client.delete("/candidates/1").status_code == 204
+    response = client.get("/candidates/1")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Кандидат с ID 1 не найден"}
+
+
+def test_list_with_keyset_pagination_and_count(client):
+    response = client.post("/candidates/batch", json=[
+        {"first_name": "Тест", "last_name": last_name} for last_name in ("Иванов", "Петров", "Сидоров")
+    ])
+    assert response.json() == {"registered": 3}
+
+    first_page = client.get("/candidates", params={"limit": 2}).json()
+    assert [item["last_name"] for item in first_page["items"]] == ["Иванов", "Петров"]
+    second_page = client.get("/candidates", params={"limit": 2, "after_id": first_page["next_after_id"]}).json()
+    assert [item["last_name"] for item in second_page["items"]] == ["Сидоров"]
+    assert second_page["next_after_id"] is None
+
+    assert client.get("/candidates/count").json()["total"] == 3
+    assert client.get("/candidates", params={"order_by": "phone"}).status_code == 400
+
+
+def test_accept_reject(client):
+    register(client, "Иванов")
+    register(client, "Петров")
+
+    assert client.post("/candidates/1/accept").status_code == 204
+    assert client.post("/candidates/5/reject").status_code == 404
+
+    result = client.post("/candidates/batch/reject", json={"ids": [2, 7]}).json()
+    assert [item["id"] for item in result["changed"]] == [2]
+    assert result["missing"] == [7]
+
+    by_status = client.get("/candidates/count").json()["by_status"]
+    assert by_status["APPROVED"] == 1 and by_status["REJECTED"] == 1
+
+
+def test_invalid_request_is_bad_request(client):
+    response = client.post("/candidates", json={"first_name": "Тест"})
+    assert response.status_code == 400
+    assert "last_name" in response.json()["detail"]
+
+
+def test_candidate_etag_and_if_none_match(client):
+    register(client, "Иванов")
+    response = client.get("/candidates/1")
+    etag = response.headers["ETag"]
+
+    response = client.get("/candidates/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    client.post("/candidates/1/accept")
+    response = client.get("/candidates/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert client.get("/candidates/7", headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_collection_etag_changes_with_data(client):
+    register(client, "Иванов")
+    etag = client.get("/candidates").headers["ETag"]
+    assert client.get("/candidates", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/candidates", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 200
+    count_etag = client.get("/candidates/count").headers["ETag"]
+
+    register(client, "Петров")
+    assert client.get("/candidates", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/candidates/count", headers={"If-None-Match": count_etag}).status_code == 200
+
+    client.delete("/candidates/1")
+    etag = client.get("/candidates").headers["ETag"]
+    register(client, "Сидоров")
+    client.delete("/candidates/2")
+    assert client.get("/candidates", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_match_on_edit_and_transitions(client):
+    register(client, "Иванов")
+    etag = client.get("/candidates/1").headers["ETag"]
+
+    response = client.put(
+        "/candidates/1", json={"first_name": "Иван", "last_name": "Иванов"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    response = client.post("/candidates/1/accept", headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get("/candidates/1").json()["status"] == 1
+
+    response = client.post("/candidates/1/reject", headers={"If-Match": new_etag})
+    assert response.status_code == 204
+    assert client.get("/candidates/1").headers["ETag"] == response.headers["ETag"]
+    assert client.delete("/candidates/1", headers={"If-Match": new_etag}).status_code == 412
+
+
+def test_statistics(client):
+    register(client, "Иванов")
+    register(client, "Петров")
+    assert client.post("/candidates/1/accept").status_code == 204
+
+    response = client.get("/candidates/stats")
+    assert response.status_code == 200
+    statistics = response.json()
+    assert statistics["total"] == 2
+    assert statistics["by_status"]["APPROVED"] == 1
+    assert statistics["by_sex"]["UNKNOWN"] == 2
+    assert sum(week["approved"] for week in statistics["decisions_by_week"]) == 1
+
+    response = client.get("/candidates/stats", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    params = {"since": "2030-01-01T00:00:00", "until": "2020-01-01T00:00:00"}
+    assert client.get("/candidates/stats", params=params).status_code == 400
+    params = {"since": "2020-01-01T00:00:00Z", "until": "2100-01-01T00:00:00+03:00"}
+    assert client.get("/candidates/stats", params=params).json()["total"] == 2
+
+
+def test_metrics(client):
+    register(client, "Иванов")
+    assert client.get("/candidates/999").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert 'hrm_operation_calls_total{layer="use_cases",operation="run_in_transaction",backend="sqlite"} 1' in lines
+    assert 'hrm_operation_calls_total{layer="repository",operation="run_in_transaction",backend="sqlite"} 1' in lines
+    assert 'hrm_operation_failures_total{layer="use_cases",operation="get_candidate",backend="sqlite"} 1' in lines
+    assert 'hrm_operation_failures_total{layer="repository",operation="get_by_id",backend="sqlite"} 0' in lines
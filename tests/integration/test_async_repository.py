@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from hrm.core.application import AsyncUseCases
+from hrm.core.async_persistence import AsyncSqliteCandidateRepository
+from hrm.core.model import CandidateStatus
+from hrm.core.persistence import SqliteCandidateRepository
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+IO_DELAY = 0.1
+"""
+Имитация медленного диска: time.sleep, как и ожидание ввода-вывода в sqlite3, отпускает GIL.
+"""
+
+
+def slow_get_by_id(monkeypatch):
+    get_by_id = SqliteCandidateRepository.get_by_id
+
+    def get_by_id_with_delay(self, candidate_id):
+        time.sleep(IO_DELAY)
+        return get_by_id(self, candidate_id)
+
+    monkeypatch.setattr(SqliteCandidateRepository, "get_by_id", get_by_id_with_delay)
+
+
+def test_async_use_cases_mirror_use_cases(tmp_path):
+    async def scenario():
+        async with AsyncSqliteCandidateRepository(tmp_path / "candidates.db") as repo:
+            use_cases = AsyncUseCases(repo)
+            first_id = await use_cases.register_candidate(make_candidate("Иванов"))
+            assert await use_cases.register_candidates([make_candidate("Петров"), make_candidate("Сидоров")]) == 2
+
+            edited = await use_cases.edit_candidate(
+                make_candidate("Иванов").model_copy(update={"id": first_id, "phone": "123"})
+            )
+            assert edited.phone == "123"
+            assert (await use_cases.accept_candidate(first_id)).status == CandidateStatus.APPROVED
+            assert (await use_cases.reject_candidate(2)).status == CandidateStatus.REJECTED
+            with pytest.raises(ValueError):
+                await use_cases.accept_candidate(100)
+
+            await use_cases.delete_candidate(3)
+            with pytest.raises(ValueError):
+                await use_cases.delete_candidate(3)
+            with pytest.raises(ValueError):
+                await use_cases.get_candidate(3)
+
+            assert await use_cases.get_total_candidates() == 2
+            assert [candidate.id async for candidate in use_cases.iter_candidates(page_size=1)] == [1, 2]
+            assert [candidate.id async for candidate in use_cases.export_candidates(status=CandidateStatus.APPROVED)] == [1]
+            assert [hit.candidate.id for hit in await use_cases.search_candidates("Петр")] == [2]
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_reads_latency_does_not_grow_linearly(tmp_path, monkeypatch):
+    in_flight = 8
+
+    async def scenario():
+        async with AsyncSqliteCandidateRepository(tmp_path / "candidates.db", readers=in_flight) as repo:
+            use_cases = AsyncUseCases(repo)
+            candidate_id = await use_cases.register_candidate(make_candidate("Иванов"))
+            slow_get_by_id(monkeypatch)
+
+            started = time.perf_counter()
+            await use_cases.get_candidate(candidate_id)
+            single = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await asyncio.gather(*(use_cases.get_candidate(candidate_id) for _ in range(in_flight)))
+            concurrent = time.perf_counter() - started
+        return single, concurrent
+
+    single, concurrent = asyncio.run(scenario())
+
+    # Последовательное выполнение заняло бы in_flight * single
+    assert concurrent < 3 * single, (single, concurrent)
+
+
+def test_reads_and_event_loop_are_not_blocked_by_slow_write(tmp_path):
+    async def scenario():
+        async with AsyncSqliteCandidateRepository(tmp_path / "candidates.db") as repo:
+            use_cases = AsyncUseCases(repo)
+            candidate_id = await use_cases.register_candidate(make_candidate("Иванов"))
+
+            def slow_edit(transaction):
+                candidate = transaction.accept_candidate(candidate_id)
+                time.sleep(5 * IO_DELAY)
+                return candidate
+
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(IO_DELAY / 10)
+                    ticks += 1
+
+            ticker_task = asyncio.create_task(ticker())
+            write = asyncio.create_task(use_cases.run_in_transaction(slow_edit))
+            await asyncio.sleep(IO_DELAY / 10)
+
+            started = time.perf_counter()
+            reads = await asyncio.gather(*(use_cases.get_candidate(candidate_id) for _ in range(10)))
+            reads_elapsed = time.perf_counter() - started
+
+            await write
+            ticker_task.cancel()
+            # Читатели видят последнее зафиксированное состояние, а не незавершенную транзакцию
+            assert {candidate.status for candidate in reads} == {CandidateStatus.REGISTERED}
+            assert (await use_cases.get_candidate(candidate_id)).status == CandidateStatus.APPROVED
+        return reads_elapsed, ticks
+
+    reads_elapsed, ticks = asyncio.run(scenario())
+
+    assert reads_elapsed < 2 * IO_DELAY, reads_elapsed
+    assert ticks >= 10, ticks
@@ -0,0 +1,41 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+pytestmark = pytest.mark.integration
+
+SUITE = Path(__file__).parents[2] / "benchmarks" / "suite.py"
+
+
+def run_suite(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(SUITE), "--backends", "sqlite", "--sizes", "20", "--operations", "5", *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_suite_saves_results_and_detects_regressions(tmp_path):
+    results_file = tmp_path / "results.json"
+    completed = run_suite("--out", str(results_file))
+    assert completed.returncode == 0, completed.stderr
+
+    results = json.loads(results_file.read_text(encoding="utf-8"))
+    assert [row["operation"] for row in results["results"]] == [
+        "register", "get", "edit", "accept", "list", "count", "delete",
+    ]
+    assert all(row["ops_per_sec"] > 0 and row["p50_ms"] <= row["p99_ms"] for row in results["results"])
+
+    # Базовый прогон, который был в 100 раз быстрее текущего
+    baseline_file = tmp_path / "baseline.json"
+    for row in results["results"]:
+        row["ops_per_sec"] *= 100
+    baseline_file.write_text(json.dumps(results), encoding="utf-8")
+
+    completed = run_suite("--baseline", str(baseline_file), "--threshold", "0.5")
+    assert completed.returncode == 1
+    assert "sqlite/20/get" in completed.stdout
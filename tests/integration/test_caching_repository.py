@@ -0,0 +1,164 @@
+import pytest
+
+from hrm.core.application import UseCases
+from hrm.core.caching import CachingCandidateRepository
+from hrm.core.model import CandidateStatus
+from hrm.core.persistence import JsonCandidateRepository, SqliteCandidateRepository
+from hrm.core.profiling import StatementProfiler
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+
+class CountingRepository(JsonCandidateRepository):
+    """JSON-репозиторий, считающий обращения к get_by_id"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def get_by_id(self, candidate_id):
+        self.reads += 1
+        return super().get_by_id(candidate_id)
+
+
+def test_repeated_reads_are_served_from_cache(tmp_path):
+    inner = CountingRepository(tmp_path / "candidates.json")
+    repo = CachingCandidateRepository(inner)
+    candidate_id = repo.insert_or_update(make_candidate("Иванов"))
+
+    for _ in range(3):
+        assert repo.get_by_id(candidate_id).last_name == "Иванов"
+
+    assert inner.reads == 1
+    stats = repo.stats()
+    assert (stats.hits, stats.misses) == (2, 1)
+
+
+def test_writes_invalidate_candidates_and_queries(tmp_path):
+    repo = CachingCandidateRepository(JsonCandidateRepository(tmp_path / "candidates.json"))
+    use_cases = UseCases(repo)
+    candidate_id = use_cases.register_candidate(make_candidate("Иванов"))
+    assert use_cases.get_total_candidates() == 1
+    assert use_cases.get_candidate(candidate_id).status == CandidateStatus.REGISTERED
+
+    use_cases.accept_candidate(candidate_id)
+    assert use_cases.get_candidate(candidate_id).status == CandidateStatus.APPROVED
+    assert use_cases.get_total_candidates_by_status()[CandidateStatus.APPROVED] == 1
+
+    use_cases.edit_candidate(use_cases.get_candidate(candidate_id).model_copy(update={"phone": "123"}))
+    assert use_cases.get_candidate(candidate_id).phone == "123"
+
+    use_cases.register_candidates([make_candidate("Петров")])
+    assert use_cases.get_total_candidates() == 2
+    assert [candidate.last_name for candidate in use_cases.find_candidates(last_name_prefix="П")] == ["Петров"]
+
+    use_cases.delete_candidate(candidate_id)
+    assert repo.get_by_id(candidate_id) is None
+    use_cases.clear_all_candidates()
+    assert use_cases.get_total_candidates() == 0
+
+
+def test_lru_eviction_and_ttl(tmp_path):
+    now = [0.0]
+    repo = CachingCandidateRepository(
+        JsonCandidateRepository(tmp_path / "candidates.json"), max_size=2, ttl=10, clock=lambda: now[0]
+    )
+    ids = [repo.insert_or_update(make_candidate(last_name)) for last_name in ("Иванов", "Петров", "Сидоров")]
+
+    for candidate_id in ids:
+        repo.get_by_id(candidate_id)
+    assert repo.stats().evictions == 1
+
+    repo.get_by_id(ids[2])
+    now[0] = 11
+    repo.get_by_id(ids[2])
+    stats = repo.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (1, 4, 1)
+
+
+def test_query_results_are_bounded_by_rows(tmp_path):
+    inner = JsonCandidateRepository(tmp_path / "candidates.json")
+    repo = CachingCandidateRepository(inner, max_size=3)
+    repo.insert_many(make_candidate(f"Кандидат{index}") for index in range(5))
+
+    # Результат больше всего кэша не запоминается
+    assert len(repo.get_all()) == 5
+    assert len(repo.get_all()) == 5
+    assert repo.stats().hits == 0
+
+    repo.find(limit=2)
+    repo.find(limit=2)
+    assert repo.stats().hits == 1
+    # Вторая выборка из двух строк не помещается вместе с первой: первая вытесняется
+    repo.find(limit=2, after_id=2)
+    assert repo.stats().evictions == 1
+    repo.find(limit=2)
+    assert repo.stats().hits == 1
+
+
+def test_rolled_back_transaction_does_not_leave_stale_entries(tmp_path):
+    repo = CachingCandidateRepository(SqliteCandidateRepository(tmp_path / "candidates.db"))
+    candidate_id = repo.insert_or_update(make_candidate("Иванов"))
+
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.set_status([candidate_id], CandidateStatus.REJECTED)
+            assert repo.get_by_id(candidate_id).status == CandidateStatus.REJECTED
+            raise RuntimeError()
+
+    assert repo.get_by_id(candidate_id).status == CandidateStatus.REGISTERED
+    repo.close()
+
+
+def test_changes_from_other_process_detected_by_data_version(tmp_path):
+    db_file = tmp_path / "candidates.db"
+    now = [0.0]
+    repo = CachingCandidateRepository(
+        SqliteCandidateRepository(db_file), external_changes_interval=5, clock=lambda: now[0]
+    )
+    candidate_id = repo.insert_or_update(make_candidate("Иванов"))
+    assert repo.get_by_id(candidate_id).status == CandidateStatus.REGISTERED
+    assert repo.count() == 1
+
+    with SqliteCandidateRepository(db_file) as other:
+        other.set_status([candidate_id], CandidateStatus.APPROVED)
+        other.insert_or_update(make_candidate("Петров"))
+
+    # До истечения интервала data_version не перечитывается
+    assert repo.get_by_id(candidate_id).status == CandidateStatus.REGISTERED
+    now[0] = 5
+    assert repo.get_by_id(candidate_id).status == CandidateStatus.APPROVED
+    assert repo.count() == 2
+    assert repo.stats().invalidations == 1
+    repo.close()
+
+
+def test_external_changes_are_not_checked_by_default(tmp_path):
+    profiler = StatementProfiler()
+    repo = CachingCandidateRepository(SqliteCandidateRepository(tmp_path / "candidates.db", profiler=profiler))
+    candidate_id = repo.insert_or_update(make_candidate("Иванов"))
+    profiler.reset()
+
+    for _ in range(3):
+        repo.get_by_id(candidate_id)
+        repo.count()
+
+    # Каждый запрос выполнен один раз, PRAGMA data_version не выполнялась
+    assert sorted(stats.calls for stats in profiler.summary()) == [1, 1]
+    assert not any("data_version" in stats.fingerprint for stats in profiler.summary())
+    repo.close()
+
+
+def test_mutating_returned_candidates_does_not_change_cache(tmp_path):
+    repo = CachingCandidateRepository(JsonCandidateRepository(tmp_path / "candidates.json"))
+    candidate_id = repo.insert_or_update(make_candidate("Иванов"))
+
+    repo.get_by_id(candidate_id).last_name = "Изменен"
+    repo.get_all()[0].status = CandidateStatus.REJECTED
+    repo.find(last_name_prefix="Ив")[0].phone = "123"
+
+    for candidate in (repo.get_by_id(candidate_id), repo.get_all()[0], repo.find(last_name_prefix="Ив")[0]):
+        assert (candidate.last_name, candidate.status, candidate.phone) == ("Иванов", CandidateStatus.REGISTERED, None)
+    assert repo.stats().hits >= 3
@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from typer.testing import CliRunner
+
+from hrm import cli
+from hrm.core.application import UseCases
+from hrm.core.persistence import SqliteCandidateRepository
+
+
+pytestmark = pytest.mark.integration
+
+
+def run_hrm(tmp_path, *args: str, script: str) -> subprocess.CompletedProcess:
+    """Запускает CLI в новом процессе, передавая сценарий в stdin"""
+    return subprocess.run(
+        [sys.executable, "-m", "hrm", *args],
+        input=script,
+        env={**os.environ, "HRM_DB_PATH": str(tmp_path / "candidates.db"), "COLUMNS": "200"},
+        capture_output=True,
+        text=True,
+    )
+
+
+def statuses(tmp_path) -> list:
+    with SqliteCandidateRepository(tmp_path / "candidates.db") as repository:
+        return [candidate.status.name for candidate in repository.get_all()]
+
+
+def test_batch_runs_commands_in_one_process(tmp_path):
+    script = "\n".join([
+        "# регистрация и принятие",
+        "add -f Иван -l Петров",
+        "add -f Анна -l 'Смирнова Иванова'",
+        "",
+        "accept --id 1",
+        "get --id 99",
+        "count --json",
+    ])
+
+    completed = run_hrm(tmp_path, "batch", script=script)
+
+    assert completed.returncode == 1
+    assert '{"total": 2}' in completed.stdout.splitlines()
+    assert "✗ код 1 get --id 99" in completed.stderr
+    assert "Выполнено команд: 5, успешно: 4, с ошибкой: 1" in completed.stderr
+    assert statuses(tmp_path) == ["APPROVED", "REGISTERED"]
+
+
+def test_batch_transaction_rolls_back_all_commands(tmp_path):
+    script = "add -f Иван -l Петров\nadd -f Анна -l Смирнова\nreject --id 3\nadd -f Олег -l Сидоров\n"
+
+    completed = run_hrm(tmp_path, "batch", "--transaction", script=script)
+
+    assert completed.returncode == 1
+    assert "Выполнено команд: 3" in completed.stderr
+    assert statuses(tmp_path) == []
+
+
+def test_batch_does_not_feed_script_to_confirmations(tmp_path):
+    script = "add -f Иван -l Петров\ndelete --id 1\ndelete --id 1 --force\n"
+
+    completed = run_hrm(tmp_path, "batch", script=script)
+
+    assert "успешно удален" in completed.stdout
+    assert "Выполнено команд: 3, успешно: 2, с ошибкой: 1" in completed.stderr
+    assert statuses(tmp_path) == []
+
+
+def test_shell_reads_commands_until_exit(tmp_path):
+    completed = run_hrm(tmp_path, "shell", script="add -f Иван -l Петров\nshell\ncount\nexit\ncount\n")
+
+    assert completed.returncode == 0
+    assert completed.stdout.count("Общее количество кандидатов") == 1
+    assert "команда shell недоступна" in completed.stderr
+    assert "Выполнено команд: 3, успешно: 2, с ошибкой: 1" in completed.stderr
+
+
+def failing_on(monkeypatch, command: str, error: BaseException):
+    """Команда command завершается исключением error, остальные выполняются как обычно"""
+    run_command = cli._run_command
+
+    def run_or_fail(app, args):
+        if args[0] == command:
+            raise error
+        return run_command(app, args)
+
+    monkeypatch.setattr(cli, "_run_command", run_or_fail)
+
+
+def run_in_process(tmp_path, *args: str, script: str):
+    with SqliteCandidateRepository(tmp_path / "candidates.db") as repository:
+        app = cli.create_cli_app(UseCases(repository))
+        return CliRunner().invoke(app, list(args), input=script, prog_name="hrm")
+
+
+def test_batch_continues_after_unexpected_error(tmp_path, monkeypatch):
+    failing_on(monkeypatch, "count", RuntimeError("диск [отключен]"))
+
+    result = run_in_process(tmp_path, "batch", script="add -f Иван -l Петров\ncount\nadd -f Анна -l Смирнова\n")
+
+    assert result.exit_code == 1
+    assert "✗ код 1 count: RuntimeError: диск [отключен]" in result.stderr
+    assert "Выполнено команд: 3, успешно: 2, с ошибкой: 1" in result.stderr
+    assert statuses(tmp_path) == ["REGISTERED", "REGISTERED"]
+
+
+def test_batch_interrupt_stops_script_and_reports_totals(tmp_path, monkeypatch):
+    failing_on(monkeypatch, "count", KeyboardInterrupt())
+
+    result = run_in_process(tmp_path, "batch", script="add -f Иван -l Петров\ncount\nadd -f Анна -l Смирнова\n")
+
+    assert result.exit_code == 130
+    assert "count: прервано" in result.stderr
+    assert "Выполнено команд: 2, успешно: 1, с ошибкой: 1" in result.stderr
+    assert statuses(tmp_path) == ["REGISTERED"]
+
+
+def test_shell_continues_after_interrupted_command(tmp_path, monkeypatch):
+    failing_on(monkeypatch, "count", KeyboardInterrupt())
+
+    result = run_in_process(tmp_path, "shell", script="count\nadd -f Иван -l Петров\nexit\n")
+
+    assert result.exit_code == 0
+    assert "count: прервано" in result.stderr
+    assert "Выполнено команд: 2, успешно: 1, с ошибкой: 1" in result.stderr
+    assert statuses(tmp_path) == ["REGISTERED"]
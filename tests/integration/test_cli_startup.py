@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+pytestmark = pytest.mark.integration
+
+
+def run_hrm(tmp_path, *args: str) -> subprocess.CompletedProcess:
+    """Запускает CLI в новом процессе и возвращает stdout и модули из `-X importtime`"""
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "hrm", *args],
+        env={**os.environ, "HRM_DB_PATH": str(tmp_path / "candidates.db")},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def imported_modules(completed: subprocess.CompletedProcess) -> set:
+    return {line.rsplit("|", 1)[-1].strip() for line in completed.stderr.splitlines() if line.startswith("import time:")}
+
+
+def test_importing_cli_loads_neither_rich_nor_storage():
+    completed = subprocess.run(
+        [sys.executable, "-c", "import sys, hrm.cli; print(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set(completed.stdout.split())
+
+    assert not {"rich", "pydantic", "sqlite3", "asyncio", "hrm.core.persistence"} & modules
+
+
+def test_help_does_not_open_database(tmp_path):
+    completed = run_hrm(tmp_path, "--help")
+
+    assert not {"pydantic", "sqlite3"} & imported_modules(completed)
+    assert not (tmp_path / "candidates.db").exists()
+
+
+def test_json_output_skips_rich(tmp_path):
+    completed = run_hrm(tmp_path, "count", "--by-status", "--json")
+
+    assert json.loads(completed.stdout) == {
+        "total": 0,
+        "by_status": {"REGISTERED": 0, "PROPOSED": 0, "APPROVED": 0, "REJECTED": 0},
+    }
+    assert "rich" not in imported_modules(completed)
@@ -0,0 +1,176 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from hrm import daemon
+from hrm.daemon import client
+
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(sys.platform == "win32", reason="Демон работает через Unix-сокет"),
+]
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """Окружение с отдельной базой данных и каталогом для сокета демона"""
+    values = {
+        "HRM_DB_PATH": str(tmp_path / "candidates.db"),
+        "XDG_RUNTIME_DIR": str(tmp_path),
+        "COLUMNS": "200",
+    }
+    for name, value in values.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("HRM_NO_DAEMON", raising=False)
+    monkeypatch.delenv("HRM_METRICS", raising=False)
+    return {**os.environ, **values}
+
+
+@pytest.fixture
+def running_daemon(env):
+    """Демон в отдельном процессе; останавливается после теста"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "hrm", "daemon", "start", "--foreground"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 15
+    while daemon.status() is None:
+        assert process.poll() is None, process.stderr.read()
+        assert time.monotonic() < deadline, "Демон не запустился"
+        time.sleep(0.05)
+    try:
+        yield process
+    finally:
+        daemon.stop()
+        process.wait(timeout=10)
+
+
+def run_hrm(env, *args: str, **extra_env: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "hrm", *args],
+        env={**env, **extra_env},
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_commands_are_forwarded_to_daemon(env, running_daemon):
+    added = run_hrm(env, "add", "-f", "Иван", "-l", "Петров")
+    missing = run_hrm(env, "get", "--id", "99")
+    counted = run_hrm(env, "count", "--json")
+
+    assert added.returncode == 0, added.stderr
+    assert "Иван" in added.stdout
+    assert missing.returncode == 1
+    assert json.loads(counted.stdout) == {"total": 1}
+
+    state = daemon.status()
+    assert state["requests"] == 3
+    assert state["failed"] == 1
+    assert state["commands"]["add"]["requests"] == 1
+    assert state["rate"] > 0
+
+
+def test_usage_errors_keep_exit_code_and_stderr(env, running_daemon):
+    completed = run_hrm(env, "get")
+
+    assert completed.returncode == 2
+    assert completed.stdout == ""
+    assert "Missing option" in completed.stderr
+
+
+def test_concurrent_clients(env, running_daemon):
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "hrm", "add", "-f", f"Имя{number}", "-l", "Фамилия"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        for number in range(8)
+    ]
+    assert all(process.wait(timeout=60) == 0 for process in processes)
+
+    assert json.loads(run_hrm(env, "count", "--json").stdout) == {"total": 8}
+    assert daemon.status()["commands"]["add"]["requests"] == 8
+
+
+def test_no_daemon_runs_in_process(env, running_daemon):
+    completed = run_hrm(env, "count", HRM_NO_DAEMON="1")
+
+    assert completed.returncode == 0
+    assert daemon.status()["requests"] == 0
+
+
+def test_other_database_is_not_forwarded(env, running_daemon, tmp_path):
+    completed = run_hrm(env, "count", "--json", HRM_DB_PATH=str(tmp_path / "other.db"))
+
+    assert json.loads(completed.stdout) == {"total": 0}
+    assert daemon.status()["requests"] == 0
+
+
+def test_daemon_rejects_other_database(env, running_daemon, tmp_path):
+    response = daemon.request({"op": "run", "argv": ["count"], "db": str(tmp_path / "other.db")})
+
+    assert "exit" not in response
+    assert "error" in response
+
+
+def test_status_without_daemon(env):
+    assert daemon.forward(["count"]) is None
+
+    completed = run_hrm(env, "daemon", "status")
+
+    assert completed.returncode == 1
+    assert "Демон не запущен" in completed.stdout
+
+
+def test_start_background_and_stop(env):
+    started = run_hrm(env, "daemon", "start")
+    try:
+        assert started.returncode == 0, started.stderr
+        assert daemon.status()["db"] == os.path.realpath(env["HRM_DB_PATH"])
+        assert "уже запущен" in run_hrm(env, "daemon", "start").stdout
+    finally:
+        stopped = run_hrm(env, "daemon", "stop")
+
+    assert "Демон остановлен" in stopped.stdout
+    assert daemon.status() is None
+    assert not os.path.exists(daemon.socket_path())
+
+
+def test_socket_with_foreign_permissions_is_not_used(env):
+    import socket
+
+    directory = client.prepare_socket_directory()
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(daemon.socket_path())
+    listener.listen()
+    try:
+        # Сокет, в который могут писать другие пользователи, мог быть создан не нашим демоном
+        os.chmod(daemon.socket_path(), 0o666)
+        assert daemon.forward(["count"]) is None
+
+        os.chmod(daemon.socket_path(), 0o600)
+        os.chmod(directory, 0o755)
+        assert daemon.forward(["count"]) is None
+    finally:
+        listener.close()
+        os.chmod(directory, 0o700)
+
+
+def test_daemon_refuses_foreign_socket_directory(env):
+    directory = client.socket_directory()
+    os.mkdir(directory, 0o777)
+    os.chmod(directory, 0o777)
+
+    with pytest.raises(PermissionError):
+        daemon.serve()
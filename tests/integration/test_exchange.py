@@ -0,0 +1,275 @@
+import csv
+import datetime
+import gzip
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from hrm.cli import create_cli_app
+from hrm.core.application import UseCases
+from hrm.core.exchange import (
+    RowError,
+    batched,
+    detect_format,
+    export_to_file,
+    parse_batch,
+    read_records,
+    record_to_candidate,
+)
+from hrm.core.model import Candidate, CandidateSex, CandidateStatus
+from hrm.core.persistence import SqliteCandidateRepository
+
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def backend():
+    return "sqlite"
+
+
+def run_cli(repository, *args: str):
+    """Выполняет команду CLI в текущем процессе поверх репозитория теста"""
+    return CliRunner().invoke(create_cli_app(UseCases(repository)), list(args), prog_name="hrm")
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("candidates.csv", "csv"),
+    ("candidates.CSV", "csv"),
+    ("candidates.jsonl", "jsonl"),
+    ("candidates.ndjson", "jsonl"),
+    ("candidates.csv.gz", "csv"),
+    ("candidates.jsonl.gz", "jsonl"),
+])
+def test_detect_format(tmp_path, name, expected):
+    assert detect_format(tmp_path / name) == expected
+
+
+def test_detect_format_rejects_unknown_suffix(tmp_path):
+    with pytest.raises(ValueError):
+        detect_format(tmp_path / "candidates.xlsx")
+
+
+def test_read_csv_with_bom_reports_file_line_numbers(tmp_path):
+    path = tmp_path / "candidates.csv"
+    path.write_text("\ufefffirst_name,last_name,comments\nИван,Петров,\"две\nстроки\"\nАнна,Смирнова,\n", encoding="utf-8")
+
+    records = list(read_records(path))
+
+    assert [line for line, _ in records] == [3, 4]
+    assert records[0][1]["first_name"] == "Иван"
+    assert records[0][1]["comments"] == "две\nстроки"
+
+
+def test_read_jsonl_skips_blank_lines_and_reports_broken_json(tmp_path):
+    path = tmp_path / "candidates.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write('{"first_name": "Иван", "last_name": "Петров"}\n\n{"first_name": \n')
+
+    records = list(read_records(path))
+
+    assert records[0] == (1, {"first_name": "Иван", "last_name": "Петров"})
+    line, error = records[1]
+    assert line == 3
+    assert isinstance(error, RowError) and error.line == 3
+    assert error.message.startswith("Некорректный JSON")
+
+
+def test_record_to_candidate_parses_columns():
+    candidate = record_to_candidate({
+        "id": "99",
+        "first_name": " Иван ",
+        "last_name": "Петров",
+        "phone": "",
+        "birth_date": "1990-05-15",
+        "sex": "f",
+        "status": "approved",
+        "comments": "  ",
+        "updated_at": "2024-01-02T03:04:05",
+    })
+
+    assert candidate.id is None
+    assert (candidate.first_name, candidate.phone, candidate.comments) == ("Иван", None, None)
+    assert candidate.birth_date == datetime.datetime(1990, 5, 15)
+    assert candidate.sex == CandidateSex.FEMALE
+    assert candidate.status == CandidateStatus.APPROVED
+    assert candidate.updated_at == datetime.datetime(2024, 1, 2, 3, 4, 5)
+
+
+@pytest.mark.parametrize("status, expected", [
+    (None, CandidateStatus.REGISTERED),
+    ("", CandidateStatus.REGISTERED),
+    ("REJECTED", CandidateStatus.REJECTED),
+    (str(CandidateStatus.APPROVED.value), CandidateStatus.APPROVED),
+])
+def test_record_to_candidate_status(status, expected):
+    assert record_to_candidate({"first_name": "Иван", "last_name": "Петров", "status": status}).status == expected
+
+
+@pytest.mark.parametrize("record, message", [
+    ({"first_name": "Иван", "last_name": "Петров", "birth_date": "15.05.1990"}, "birth_date"),
+    ({"first_name": "Иван", "last_name": "Петров", "sex": "X"}, "sex"),
+    ({"first_name": "Иван", "last_name": "Петров", "status": "HIRED"}, "status"),
+    (["Иван", "Петров"], "объектом"),
+])
+def test_record_to_candidate_rejects_invalid_values(record, message):
+    with pytest.raises(ValueError, match=message):
+        record_to_candidate(record)
+
+
+def test_parse_batch_separates_valid_rows_and_errors():
+    candidates, errors = parse_batch([
+        (2, {"first_name": "Иван", "last_name": "Петров"}),
+        (3, {"first_name": "Анна"}),
+        (4, {"first_name": "Олег", "last_name": "Сидоров", "sex": "X"}),
+        (5, RowError(5, "Некорректный JSON")),
+        (6, {"first_name": "Мария", "last_name": "Кузнецова"}),
+    ])
+
+    assert [candidate.last_name for candidate in candidates] == ["Петров", "Кузнецова"]
+    assert [error.line for error in errors] == [3, 4, 5]
+    assert "last_name" in errors[0].message
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched(range(4), 2)) == [[0, 1], [2, 3]]
+    assert list(batched([], 2)) == []
+
+
+def test_import_registers_valid_rows_in_batches_and_reports_errors(repository, tmp_path):
+    path = tmp_path / "candidates.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("first_name", "last_name", "sex", "status"))
+        writer.writerow(("Иван", "Петров", "M", ""))
+        writer.writerow(("Анна", "", "F", ""))
+        writer.writerow(("Олег", "Сидоров", "", "APPROVED"))
+        writer.writerow(("Мария", "Кузнецова", "", "HIRED"))
+        writer.writerow(("Пётр", "Орлов", "", ""))
+    errors_file = tmp_path / "errors.csv"
+
+    result = run_cli(repository, "import", "--file", str(path), "--batch-size", "2", "--errors", str(errors_file))
+
+    assert result.exit_code == 1
+    assert "Импортировано кандидатов: 3 из 5" in result.stdout
+    # Прогресс выводится после каждой пачки
+    assert result.stdout.count("Обработано:") == 3
+    assert "Строка 3:" in result.stdout and "Строка 5:" in result.stdout
+    with open(errors_file, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["line", "error"]
+    assert [row[0] for row in rows[1:]] == ["3", "5"]
+    assert sorted(
+        (candidate.last_name, candidate.status) for candidate in repository.get_all()
+    ) == [("Орлов", CandidateStatus.REGISTERED), ("Петров", CandidateStatus.REGISTERED),
+          ("Сидоров", CandidateStatus.APPROVED)]
+
+
+def test_import_without_errors_succeeds(repository, tmp_path):
+    path = tmp_path / "candidates.jsonl"
+    path.write_text('{"first_name": "Иван", "last_name": "Петров"}\n', encoding="utf-8")
+
+    result = run_cli(repository, "import", "--file", str(path))
+
+    assert result.exit_code == 0
+    assert repository.count() == 1
+
+
+def register(repository, last_name, status=CandidateStatus.REGISTERED, updated_at=None) -> int:
+    values = {"first_name": "Тест", "last_name": last_name, "status": status}
+    if updated_at is not None:
+        values["updated_at"] = updated_at
+    return repository.insert_or_update(Candidate(**values))
+
+
+def test_export_filters_by_status_and_update_time(repository, tmp_path):
+    register(repository, "Петров", CandidateStatus.APPROVED, datetime.datetime(2024, 1, 1))
+    register(repository, "Сидоров", CandidateStatus.APPROVED, datetime.datetime(2024, 3, 1))
+    register(repository, "Орлов", CandidateStatus.REJECTED, datetime.datetime(2024, 3, 1))
+    out = tmp_path / "approved.jsonl"
+
+    result = run_cli(
+        repository, "export", "--format", "jsonl", "--out", str(out), "--status", "APPROVED",
+        "--updated-since", "2024-02-01",
+    )
+
+    assert result.exit_code == 0, result.stdout
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [record["last_name"] for record in records] == ["Сидоров"]
+    assert records[0]["status"] == "APPROVED"
+
+
+def test_export_gzip_round_trips_through_import(repository, tmp_path):
+    register(repository, "Петров")
+    register(repository, "Сидоров", CandidateStatus.REJECTED)
+    out = tmp_path / "candidates.csv.gz"
+
+    assert run_cli(repository, "export", "--out", str(out)).exit_code == 0
+
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert next(csv.reader(f))[:3] == ["id", "first_name", "last_name"]
+    with SqliteCandidateRepository(tmp_path / "copy.db") as copy:
+        assert run_cli(copy, "import", "--file", str(out)).exit_code == 0
+        assert sorted((c.last_name, c.status) for c in copy.get_all()) == [
+            ("Петров", CandidateStatus.REGISTERED), ("Сидоров", CandidateStatus.REJECTED),
+        ]
+
+
+def test_export_rejects_unknown_format_and_date(repository, tmp_path):
+    out = tmp_path / "candidates.xml"
+
+    assert run_cli(repository, "export", "--format", "xml", "--out", str(out)).exit_code == 1
+    assert run_cli(repository, "export", "--out", str(out), "--updated-since", "вчера").exit_code == 1
+    assert not out.exists()
+
+
+def test_failed_export_keeps_previous_file(tmp_path):
+    out = tmp_path / "candidates.csv"
+    out.write_text("предыдущая выгрузка", encoding="utf-8")
+
+    def failing():
+        yield Candidate(first_name="Иван", last_name="Петров", status=CandidateStatus.REGISTERED)
+        raise RuntimeError("соединение потеряно")
+
+    with pytest.raises(RuntimeError):
+        export_to_file(failing(), out, "csv")
+
+    assert out.read_text(encoding="utf-8") == "предыдущая выгрузка"
+    assert list(tmp_path.iterdir()) == [out]
+
+
+def test_export_replaces_file_atomically(tmp_path):
+    out = tmp_path / "candidates.jsonl"
+    out.write_text("старое содержимое\n", encoding="utf-8")
+
+    written = export_to_file(
+        [Candidate(id=1, first_name="Иван", last_name="Петров", status=CandidateStatus.REGISTERED)], out, "jsonl"
+    )
+
+    assert written == 1
+    assert json.loads(out.read_text(encoding="utf-8"))["last_name"] == "Петров"
+    assert not (tmp_path / "candidates.jsonl.tmp").exists()
+
+
+def test_export_gzip_without_gz_suffix_can_be_imported(repository, tmp_path):
+    register(repository, "Петров")
+    out = tmp_path / "candidates.jsonl"
+
+    assert run_cli(repository, "export", "--format", "jsonl", "--gzip", "--out", str(out)).exit_code == 0
+
+    assert out.read_bytes()[:2] == b"\x1f\x8b"
+    assert [record["last_name"] for _, record in read_records(out)] == ["Петров"]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_snapshot_accepts_timezone_aware_updated_since(repository):
+    local = datetime.datetime(2024, 3, 1, 12, 0)
+    register(repository, "Раньше", updated_at=local - datetime.timedelta(minutes=1))
+    register(repository, "Позже", updated_at=local + datetime.timedelta(minutes=1))
+    # Тот же момент, записанный в UTC
+    since = local.astimezone(datetime.timezone.utc)
+
+    assert [c.last_name for c in repository.iter_snapshot(updated_since=since)] == ["Позже"]
+    assert [c.last_name for c in repository.find(updated_after=since)] == ["Позже"]
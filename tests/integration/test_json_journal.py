@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from hrm.core.model import CandidateStatus
+from hrm.core.persistence import JsonCandidateRepository
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+
+def last_names(repo):
+    return [candidate.last_name for candidate in repo.get_all()]
+
+
+def test_journal_replayed_after_reopen(tmp_path):
+    storage_file = tmp_path / "candidates.json"
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        first_id = repo.insert_or_update(make_candidate("Иванов"))
+        second_id = repo.insert_or_update(make_candidate("Петров"))
+        repo.set_status([first_id], CandidateStatus.APPROVED)
+        repo.delete(second_id)
+        repo.insert_many([make_candidate("Сидоров")])
+
+    assert not storage_file.exists()
+    assert len((tmp_path / "candidates.json.journal").read_text(encoding="utf-8").splitlines()) == 5
+
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        assert last_names(repo) == ["Иванов", "Сидоров"]
+        assert repo.get_by_id(first_id).status == CandidateStatus.APPROVED
+        assert repo.insert_or_update(make_candidate("Смирнов")) == 4
+
+
+def test_journal_compacted_into_snapshot_at_threshold(tmp_path):
+    storage_file = tmp_path / "candidates.json"
+    journal_file = tmp_path / "candidates.json.journal"
+    with JsonCandidateRepository(storage_file, journal=True, compact_threshold=3) as repo:
+        for last_name in ("Иванов", "Петров", "Сидоров"):
+            repo.insert_or_update(make_candidate(last_name))
+        assert not journal_file.exists()
+        assert len(json.loads(storage_file.read_text(encoding="utf-8"))["candidates"]) == 3
+
+        repo.insert_or_update(make_candidate("Смирнов"))
+        assert len(journal_file.read_text(encoding="utf-8").splitlines()) == 1
+
+    with JsonCandidateRepository(storage_file) as repo:
+        assert last_names(repo) == ["Иванов", "Петров", "Сидоров"]
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        assert last_names(repo) == ["Иванов", "Петров", "Сидоров", "Смирнов"]
+
+
+def test_torn_last_journal_line_is_ignored(tmp_path):
+    storage_file = tmp_path / "candidates.json"
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        repo.insert_or_update(make_candidate("Иванов"))
+    with open(tmp_path / "candidates.json.journal", "a", encoding="utf-8") as f:
+        f.write('{"op":"upsert","candidate":{"id":2,"first_na')
+
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        assert last_names(repo) == ["Иванов"]
+
+
+def test_interrupted_compaction_is_finished_on_startup(tmp_path):
+    storage_file = tmp_path / "candidates.json"
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        repo.insert_or_update(make_candidate("Иванов"))
+    (tmp_path / "candidates.json.journal").rename(tmp_path / "candidates.json.journal.old")
+
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        assert last_names(repo) == ["Иванов"]
+    assert not (tmp_path / "candidates.json.journal.old").exists()
+    assert len(json.loads(storage_file.read_text(encoding="utf-8"))["candidates"]) == 1
+
+
+def test_background_compaction(tmp_path):
+    storage_file = tmp_path / "candidates.json"
+    with JsonCandidateRepository(storage_file, journal=True, compact_threshold=10, background_compaction=True) as repo:
+        repo.insert_many(make_candidate(f"Кандидат{index}") for index in range(5))
+        for index in range(20):
+            repo.insert_or_update(make_candidate(f"Кандидат{index + 5}"))
+
+    with JsonCandidateRepository(storage_file, journal=True) as repo:
+        assert repo.count() == 25
+        assert repo.get_by_id(25).last_name == "Кандидат24"
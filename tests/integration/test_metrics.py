@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from hrm.core.application import UseCases
+from hrm.core.metrics import Metrics, backend_name, instrument
+from hrm.core.model import Candidate, CandidateStatus
+from hrm.core.persistence import JsonCandidateRepository, SqliteCandidateRepository
+
+
+pytestmark = pytest.mark.integration
+
+
+def test_use_cases_and_repository_calls_are_counted(tmp_path):
+    metrics = Metrics()
+    repository = JsonCandidateRepository(tmp_path / "candidates.json")
+    backend = backend_name(repository)
+    use_cases = instrument(UseCases(instrument(repository, metrics, "repository", backend)), metrics, "use_cases", backend)
+
+    candidate_id = use_cases.register_candidate(
+        Candidate(first_name="Иван", last_name="Петров", status=CandidateStatus.REGISTERED)
+    )
+    use_cases.accept_candidate(candidate_id)
+    with pytest.raises(ValueError):
+        use_cases.get_candidate(candidate_id + 1)
+
+    assert backend == "json"
+    assert metrics.calls("use_cases", "register_candidate", "json") == (1, 0)
+    assert metrics.calls("use_cases", "get_candidate", "json") == (1, 1)
+    assert metrics.calls("repository", "insert_or_update", "json") == (1, 0)
+    lines = metrics.render().splitlines()
+    labels = 'layer="use_cases",operation="accept_candidate",backend="json"'
+    assert f'hrm_operation_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in lines
+    assert f"hrm_operation_duration_seconds_count{{{labels}}} 1" in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for duration in (0.05, 0.5, 5.0):
+        metrics.observe("repository", "get_all", "sqlite", duration)
+
+    lines = metrics.render().splitlines()
+    labels = 'layer="repository",operation="get_all",backend="sqlite"'
+    assert [line.rsplit(" ", 1)[1] for line in lines if line.startswith("hrm_operation_duration_seconds_bucket")] == [
+        "1", "2", "3",
+    ]
+    assert f"hrm_operation_duration_seconds_sum{{{labels}}} 5.55" in lines
+
+
+def test_cli_collects_metrics_only_on_request(tmp_path):
+    env = {**os.environ, "HRM_DB_PATH": str(tmp_path / "candidates.db")}
+    metrics_file = tmp_path / "hrm.prom"
+
+    subprocess.run([sys.executable, "-m", "hrm", "--metrics-out", str(metrics_file), "count"], env=env, check=True)
+    text = metrics_file.read_text(encoding="utf-8")
+    assert 'hrm_operation_calls_total{layer="use_cases",operation="get_total_candidates",backend="sqlite"} 1' in text
+    assert 'hrm_operation_calls_total{layer="repository",operation="count",backend="sqlite"} 1' in text
+
+    # Без запроса метрик модуль метрик даже не импортируется
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "hrm", "count"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "hrm.core.metrics" not in completed.stderr
@@ -0,0 +1,126 @@
+import sqlite3
+
+import pytest
+
+from hrm.core import migrations
+from hrm.core.migrations import LATEST_VERSION, Migration, MigrationError
+from hrm.core.persistence import SqliteCandidateRepository
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+
+def create_legacy_database(db_file, rows: int) -> None:
+    """БД в формате первых версий приложения: без updated_at, version, индексов и user_version"""
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("""
+            CREATE TABLE candidates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL,
+                phone TEXT,
+                birth_date TEXT,
+                sex INTEGER,
+                status INTEGER NOT NULL,
+                comments TEXT
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO candidates (first_name, last_name, status) VALUES (?, ?, 1)",
+            [("Иван", f"Петров{index}") for index in range(rows)],
+        )
+
+
+def columns(db_file) -> list:
+    with sqlite3.connect(db_file) as conn:
+        return [column[1] for column in conn.execute("PRAGMA table_info(candidates)")]
+
+
+def test_new_database_gets_latest_schema(tmp_path):
+    with SqliteCandidateRepository(tmp_path / "candidates.db") as repository:
+        assert repository.schema_version() == LATEST_VERSION
+        assert repository.migrate() == []
+
+
+def test_legacy_database_is_migrated_with_batched_backfill(tmp_path):
+    db_file = tmp_path / "candidates.db"
+    create_legacy_database(db_file, rows=5)
+
+    with SqliteCandidateRepository(db_file, auto_migrate=False) as repository:
+        assert repository.schema_version() == 0
+        applied = repository.migrate(batch_size=2)
+
+        assert [migration.version for migration in applied] == [migration.version for migration in migrations.MIGRATIONS]
+        assert all(candidate.updated_at is not None for candidate in repository.get_all())
+        assert [hit.candidate.last_name for hit in repository.search("Петров3")] == ["Петров3"]
+        assert [candidate.last_name for candidate in repository.find(last_name_prefix="петров3")] == ["Петров3"]
+    with sqlite3.connect(db_file) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM candidates WHERE updated_at IS NULL").fetchone()[0] == 0
+
+
+def test_current_database_reads_only_user_version(tmp_path):
+    db_file = tmp_path / "candidates.db"
+    SqliteCandidateRepository(db_file).close()
+
+    conn = sqlite3.connect(db_file)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    assert migrations.migrate(conn) == []
+    conn.close()
+
+    assert statements == ["PRAGMA user_version"]
+
+
+def test_interrupted_backfill_is_completed_when_database_is_opened(tmp_path):
+    db_file = tmp_path / "candidates.db"
+    with SqliteCandidateRepository(db_file) as repository:
+        repository.insert_many([make_candidate("Петров"), make_candidate("Иванов")])
+    # Процесс остановлен во время заполнения: версия схемы уже последняя, часть ключей не заполнена
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("UPDATE candidates SET last_name_key = NULL, updated_at = NULL")
+
+    with SqliteCandidateRepository(db_file) as repository:
+        assert [candidate.last_name for candidate in repository.find(last_name_prefix="пет")] == ["Петров"]
+        assert all(candidate.updated_at is not None for candidate in repository.get_all())
+
+
+def test_current_database_opens_without_write_transaction(tmp_path):
+    db_file = tmp_path / "candidates.db"
+    SqliteCandidateRepository(db_file).close()
+
+    # Другой процесс держит блокировку записи: открытие актуальной БД ее не ждет
+    writer = sqlite3.connect(db_file, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        repository = SqliteCandidateRepository(db_file, pragmas={"busy_timeout": 0})
+    finally:
+        writer.rollback()
+        writer.close()
+    with repository:
+        assert repository.schema_version() == LATEST_VERSION
+
+
+def test_failed_migration_rolls_back_all_pending_changes(tmp_path, monkeypatch):
+    db_file = tmp_path / "candidates.db"
+    with SqliteCandidateRepository(db_file, auto_migrate=False) as repository:
+        repository.migrate(target=3)
+
+    def fail(cursor):
+        raise sqlite3.OperationalError("сбой миграции")
+
+    broken = [*migrations.MIGRATIONS, Migration(LATEST_VERSION + 1, "Сбой", fail)]
+    monkeypatch.setattr(migrations, "MIGRATIONS", broken)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", LATEST_VERSION + 1)
+
+    with SqliteCandidateRepository(db_file, auto_migrate=False) as repository:
+        with pytest.raises(sqlite3.OperationalError):
+            repository.migrate()
+        assert repository.schema_version() == 3
+    assert "version" not in columns(db_file)
+
+
+def test_schema_downgrade_is_rejected(tmp_path):
+    with SqliteCandidateRepository(tmp_path / "candidates.db") as repository:
+        with pytest.raises(MigrationError):
+            repository.migrate(target=1)
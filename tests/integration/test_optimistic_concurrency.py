@@ -0,0 +1,123 @@
+import pytest
+from typer.testing import CliRunner
+
+from hrm.cli import create_cli_app
+from hrm.core.application import UseCases, retry_on_conflict
+from hrm.core.model import Candidate, CandidateStatus, ConcurrentModificationError
+from hrm.core.persistence import SqliteCandidateRepository
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+
+def test_version_increments_on_every_write(repository):
+    candidate_id = repository.insert_or_update(make_candidate("Иванов"))
+    assert repository.get_by_id(candidate_id).version == 1
+
+    repository.insert_or_update(repository.get_by_id(candidate_id).model_copy(update={"phone": "123"}))
+    assert repository.get_by_id(candidate_id).version == 2
+
+    repository.set_status([candidate_id], CandidateStatus.APPROVED)
+    assert repository.get_by_id(candidate_id).version == 3
+
+
+def test_stale_version_is_rejected(repository):
+    candidate_id = repository.insert_or_update(make_candidate("Иванов"))
+    first = repository.get_by_id(candidate_id)
+    second = repository.get_by_id(candidate_id)
+
+    repository.insert_or_update(first.model_copy(update={"phone": "111"}))
+    with pytest.raises(ConcurrentModificationError):
+        repository.insert_or_update(second.model_copy(update={"phone": "222"}))
+
+    assert repository.get_by_id(candidate_id).phone == "111"
+
+
+def test_use_cases_detect_lost_updates(repository):
+    use_cases = UseCases(repository)
+    candidate_id = use_cases.register_candidate(make_candidate("Иванов"))
+    stale = use_cases.get_candidate(candidate_id)
+
+    use_cases.accept_candidate(candidate_id, expected_version=stale.version)
+    with pytest.raises(ConcurrentModificationError):
+        use_cases.reject_candidate(candidate_id, expected_version=stale.version)
+    with pytest.raises(ConcurrentModificationError):
+        use_cases.edit_candidate(stale.model_copy(update={"comments": "устарело"}))
+
+    assert use_cases.get_candidate(candidate_id).status == CandidateStatus.APPROVED
+
+
+def test_retry_on_conflict_rereads_and_succeeds(repository):
+    use_cases = UseCases(repository)
+    candidate_id = use_cases.register_candidate(make_candidate("Иванов"))
+    attempts = []
+
+    def change_phone() -> Candidate:
+        candidate = use_cases.get_candidate(candidate_id)
+        if not attempts:
+            # Параллельный писатель успевает изменить кандидата между чтением и записью
+            repository.insert_or_update(candidate.model_copy(update={"comments": "параллельно"}))
+        attempts.append(candidate.version)
+        return use_cases.edit_candidate(candidate.model_copy(update={"phone": "123"}))
+
+    edited = retry_on_conflict(change_phone, backoff=0)
+
+    assert attempts == [1, 2]
+    assert (edited.phone, edited.comments) == ("123", "параллельно")
+
+
+def test_conflict_between_processes_on_same_database(tmp_path):
+    db_file = tmp_path / "candidates.db"
+    with SqliteCandidateRepository(db_file) as first, SqliteCandidateRepository(db_file) as second:
+        candidate_id = first.insert_or_update(make_candidate("Иванов"))
+        mine = first.get_by_id(candidate_id)
+        theirs = second.get_by_id(candidate_id)
+
+        second.insert_or_update(theirs.model_copy(update={"phone": "222"}))
+        with pytest.raises(ConcurrentModificationError) as error:
+            first.insert_or_update(mine.model_copy(update={"phone": "111"}))
+
+        assert (error.value.expected_version, error.value.actual_version) == (1, 2)
+
+
+def test_versioned_update_of_missing_candidate_is_rejected(repository):
+    with pytest.raises(ConcurrentModificationError) as error:
+        repository.insert_or_update(make_candidate("Иванов").model_copy(update={"id": 42, "version": 3}))
+
+    assert (error.value.expected_version, error.value.actual_version) == (3, None)
+    assert repository.get_by_id(42) is None
+    assert repository.count() == 0
+
+
+def test_versioned_status_change_returns_stored_candidate(repository):
+    use_cases = UseCases(repository)
+    candidate_id = use_cases.register_candidate(make_candidate("Иванов"))
+
+    accepted = use_cases.accept_candidate(candidate_id, expected_version=1)
+
+    assert accepted == repository.get_by_id(candidate_id)
+    assert (accepted.status, accepted.version) == (CandidateStatus.APPROVED, 2)
+
+    result = repository.set_status([candidate_id], CandidateStatus.REJECTED, expected_version=1)
+    assert (result.changed, result.conflicting) == ([], [candidate_id])
+
+    repository.delete(candidate_id)
+    with pytest.raises(ValueError):
+        use_cases.reject_candidate(candidate_id, expected_version=2)
+
+
+def test_cli_changes_status_only_from_expected_status(repository):
+    repository.insert_many([make_candidate("Иванов"), make_candidate("Петров")])
+    repository.set_status([2], CandidateStatus.REJECTED)
+    app = create_cli_app(UseCases(repository))
+
+    result = CliRunner().invoke(app, ["accept", "--id", "1", "--id", "2", "--from-status", "registered"])
+
+    assert result.exit_code == 1
+    assert "Кандидат с ID 2 находится в другом статусе" in result.output
+    assert [candidate.status for candidate in repository.get_all()] == [CandidateStatus.APPROVED, CandidateStatus.REJECTED]
+
+    result = CliRunner().invoke(app, ["reject", "--id", "1", "--from-status", "unknown"])
+    assert result.exit_code == 1
+    assert repository.get_by_id(1).status == CandidateStatus.APPROVED
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from hrm.core.application import UseCases
+from hrm.core.persistence import SqliteCandidateRepository
+from hrm.core.profiling import StatementProfiler, fingerprint, parameters_shape
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+
+def test_fingerprint_and_parameters_hide_values():
+    assert fingerprint("SELECT *\n  FROM candidates WHERE id IN (?, ?, ?) AND status = 2 AND last_name = 'Иванов'") == (
+        "SELECT * FROM candidates WHERE id IN (...) AND status = ? AND last_name = ?"
+    )
+    assert parameters_shape((1, 2, 3, "Иванов", None)) == "(int×3, str, None)"
+    assert parameters_shape({"id": 1}) == "{id: int}"
+
+
+def test_summary_reveals_repeated_lookups(tmp_path):
+    profiler = StatementProfiler()
+    with SqliteCandidateRepository(tmp_path / "candidates.db", profiler=profiler) as repository:
+        repository.insert_many(make_candidate(f"Петров{index}") for index in range(20))
+        profiler.reset()
+        use_cases = UseCases(repository)
+        for candidate_id in range(1, 11):
+            candidate = use_cases.get_candidate(candidate_id)
+            use_cases.edit_candidate(candidate.model_copy(update={"comments": "Python"}))
+
+    by_fingerprint = {stats.fingerprint: stats for stats in profiler.summary()}
+    lookup = next(stats for key, stats in by_fingerprint.items() if key.startswith("SELECT") and "WHERE id = ?" in key)
+    assert (lookup.calls, lookup.rows) == (30, 30)
+    assert lookup.repeated_lookup
+    update = next(stats for key, stats in by_fingerprint.items() if key.startswith("UPDATE candidates SET"))
+    assert (update.calls, update.rows) == (10, 10)
+    assert not update.repeated_lookup
+
+
+def test_slow_statements_include_query_plan(tmp_path):
+    slow = []
+    profiler = StatementProfiler(slow_threshold=0, on_slow=slow.append)
+    with SqliteCandidateRepository(tmp_path / "candidates.db", profiler=profiler) as repository:
+        repository.insert_many(make_candidate(f"Петров{index}") for index in range(5))
+        slow.clear()
+        repository.get_by_id(3)
+        repository.get_all()
+
+    lookup, scan = [statement for statement in slow if statement.sql.startswith("SELECT")]
+    assert (lookup.parameters, lookup.rows) == ("(int)", 1)
+    assert any("USING INTEGER PRIMARY KEY" in line for line in lookup.plan)
+    assert scan.rows == 5
+    assert any(line.strip().startswith("SCAN candidates") for line in scan.plan)
+    assert lookup in profiler.slow_statements and scan in profiler.slow_statements
+
+
+def test_cli_profiles_nested_command(tmp_path):
+    completed = subprocess.run(
+        [sys.executable, "-m", "hrm", "db", "profile", "--slow-ms", "0", "--", "get", "--id", "1"],
+        env={**os.environ, "HRM_DB_PATH": str(tmp_path / "candidates.db"), "COLUMNS": "200"},
+        capture_output=True,
+        text=True,
+    )
+
+    assert completed.returncode == 1
+    assert "не найден" in completed.stdout
+    assert "Медленный запрос" in completed.stderr
+    assert "Запросы SQLite по шаблонам" in completed.stderr
+
+
+def test_cli_profile_shows_uncached_reads(tmp_path):
+    env = {**os.environ, "HRM_DB_PATH": str(tmp_path / "candidates.db"), "COLUMNS": "400", "HRM_NO_DAEMON": "1"}
+    subprocess.run([sys.executable, "-m", "hrm", "add", "-f", "Иван", "-l", "Петров"], env=env, check=True)
+
+    completed = subprocess.run(
+        [sys.executable, "-m", "hrm", "db", "profile", "--", "edit", "--id", "1", "--phone", "123"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    # Профилируется хранилище без кэша: видно, что edit читает кандидата трижды, и нет PRAGMA data_version
+    lookup = next(line for line in completed.stderr.splitlines() if "FROM candidates WHERE id" in line)
+    assert lookup.split("│")[1].strip() == "3"
+    assert "data_version" not in completed.stderr
@@ -0,0 +1,119 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from hrm.core.model import Candidate, CandidateStatus
+from hrm.core.persistence import JsonCandidateRepository, SqliteCandidateRepository
+from tests.integration import conftest
+
+
+pytestmark = pytest.mark.integration
+
+BASE_TIME = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+
+def make_candidate(last_name: str, status: CandidateStatus, minutes: int) -> Candidate:
+    return conftest.make_candidate(last_name, status=status, updated_at=BASE_TIME + datetime.timedelta(minutes=minutes))
+
+
+@pytest.fixture
+def repository(repository):
+    for index, (last_name, status) in enumerate([
+        ("Smith", CandidateStatus.REGISTERED),
+        ("smithson", CandidateStatus.APPROVED),
+        ("Иванов", CandidateStatus.REGISTERED),
+        ("Иванова", CandidateStatus.PROPOSED),
+        ("Петров", CandidateStatus.REGISTERED),
+    ]):
+        repository.insert_or_update(make_candidate(last_name, status, index))
+    return repository
+
+
+def last_names(candidates):
+    return [candidate.last_name for candidate in candidates]
+
+
+def test_find_by_status(repository):
+    found = repository.find(status=CandidateStatus.REGISTERED)
+    assert last_names(found) == ["Smith", "Иванов", "Петров"]
+
+
+def test_find_by_last_name_prefix_ignores_latin_case(repository):
+    found = repository.find(last_name_prefix="smi", order_by="last_name")
+    assert last_names(found) == ["Smith", "smithson"]
+
+
+def test_find_by_last_name_prefix_ignores_cyrillic_case(repository):
+    assert last_names(repository.find(last_name_prefix="петр")) == ["Петров"]
+    assert last_names(repository.find(last_name_prefix="ИВАНОВ", order_by="-last_name")) == ["Иванова", "Иванов"]
+    assert repository.find(last_name_prefix="петрова") == []
+
+
+def test_find_combines_conditions(repository):
+    found = repository.find(status=CandidateStatus.REGISTERED, last_name_prefix="Ив")
+    assert last_names(found) == ["Иванов"]
+
+
+def test_find_updated_after_sorted_descending_with_limit(repository):
+    found = repository.find(updated_after=BASE_TIME, order_by="-updated_at", limit=2)
+    assert last_names(found) == ["Петров", "Иванова"]
+
+
+def test_find_keyset_after_id(repository):
+    first_page = repository.find(limit=2)
+    second_page = repository.find(limit=2, after_id=first_page[-1].id)
+    assert last_names(first_page + second_page) == ["Smith", "smithson", "Иванов", "Иванова"]
+
+
+def test_find_rejects_unknown_order_field(repository):
+    with pytest.raises(ValueError):
+        repository.find(order_by="phone")
+
+
+def test_revisions_track_changes(repository):
+    candidate = repository.get_by_id(5)
+    assert repository.get_revision(5) == candidate.updated_at
+    assert repository.get_revision(100) is None
+    assert repository.get_collection_revision() == (5, 5, candidate.updated_at)
+
+    repository.delete(1)
+    assert repository.get_collection_revision() == (4, 5, candidate.updated_at)
+
+
+def test_json_indexes_follow_updates_and_deletes(tmp_path):
+    repo = JsonCandidateRepository(tmp_path / "candidates.json")
+    candidate_id = repo.insert_or_update(make_candidate("Сидоров", CandidateStatus.REGISTERED, 0))
+    candidate = repo.get_by_id(candidate_id)
+    repo.insert_or_update(candidate.model_copy(update={"last_name": "Кузнецов", "status": CandidateStatus.APPROVED}))
+
+    assert repo.find(last_name_prefix="Сид") == []
+    assert last_names(repo.find(last_name_prefix="Куз", status=CandidateStatus.APPROVED)) == ["Кузнецов"]
+
+    repo.delete(candidate_id)
+    assert repo.find(status=CandidateStatus.APPROVED) == []
+
+
+def query_plan(db_file, sql, params):
+    with sqlite3.connect(db_file) as conn:
+        return " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+@pytest.mark.parametrize("criteria, index_name, sorted_by_index", [
+    ({"status": CandidateStatus.PROPOSED}, "ix_candidates_status", True),
+    ({"last_name_prefix": "Ив"}, "ix_candidates_last_name", False),
+    ({"last_name_prefix": "Ив", "order_by": "last_name"}, "ix_candidates_last_name", True),
+    ({"order_by": "last_name", "limit": 10}, "ix_candidates_last_name", True),
+    ({"updated_after": BASE_TIME, "order_by": "updated_at"}, "ix_candidates_updated_at", True),
+    ({"order_by": "-updated_at", "limit": 10}, "ix_candidates_updated_at", True),
+])
+def test_find_uses_secondary_indexes(tmp_path, criteria, index_name, sorted_by_index):
+    db_file = tmp_path / "candidates.db"
+    with SqliteCandidateRepository(db_file) as repo:
+        sql, params = repo._build_find_query(**criteria)
+
+    plan = query_plan(db_file, sql, params)
+
+    assert index_name in plan, plan
+    if sorted_by_index:
+        assert "TEMP B-TREE" not in plan, plan
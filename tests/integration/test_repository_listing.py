@@ -0,0 +1,92 @@
+import pytest
+
+from hrm.core.model import CandidateStatus
+from hrm.core.persistence import SqliteCandidateRepository
+from hrm.core.profiling import StatementProfiler
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+
+def ids(candidates):
+    return [candidate.id for candidate in candidates]
+
+
+@pytest.fixture
+def repository(repository):
+    repository.insert_many(make_candidate(f"Кандидат{index}") for index in range(7))
+    # Пропуск в последовательности ID: страницы строятся по ID, а не по смещению
+    repository.delete(3)
+    return repository
+
+
+def test_iter_candidates_returns_all_pages_in_id_order(repository):
+    assert ids(repository.iter_candidates(page_size=2)) == [1, 2, 4, 5, 6, 7]
+    assert ids(repository.iter_candidates(page_size=100)) == [1, 2, 4, 5, 6, 7]
+
+
+@pytest.mark.parametrize("after_id, limit, expected", [
+    (2, None, [4, 5, 6, 7]),
+    (3, 2, [4, 5]),
+    (None, 3, [1, 2, 4]),
+    (7, None, []),
+    (None, 0, []),
+])
+def test_iter_candidates_after_id_and_limit(repository, after_id, limit, expected):
+    assert ids(repository.iter_candidates(after_id=after_id, limit=limit, page_size=2)) == expected
+
+
+def test_iter_candidates_rejects_empty_page(repository):
+    with pytest.raises(ValueError):
+        list(repository.iter_candidates(page_size=0))
+
+
+def test_count_and_count_by_status_include_empty_statuses(repository):
+    repository.set_status([1, 2], CandidateStatus.APPROVED)
+
+    assert repository.count() == 6
+    assert repository.count_by_status() == {
+        CandidateStatus.REGISTERED: 4,
+        CandidateStatus.PROPOSED: 0,
+        CandidateStatus.APPROVED: 2,
+        CandidateStatus.REJECTED: 0,
+    }
+
+
+def test_counts_of_empty_repository(tmp_path):
+    with SqliteCandidateRepository(tmp_path / "candidates.db") as repository:
+        assert repository.count() == 0
+        assert repository.count_by_status() == {status: 0 for status in CandidateStatus}
+
+
+def test_sqlite_iter_candidates_reads_pages_lazily(tmp_path):
+    profiler = StatementProfiler()
+    with SqliteCandidateRepository(tmp_path / "candidates.db", profiler=profiler) as repository:
+        repository.insert_many(make_candidate(f"Кандидат{index}") for index in range(5))
+
+        def page_queries() -> int:
+            return sum(stats.calls for stats in profiler.summary() if "WHERE id > ?" in stats.fingerprint)
+
+        profiler.reset()
+        candidates = repository.iter_candidates(page_size=2)
+        assert next(candidates).id == 1
+        assert page_queries() == 1
+
+        assert ids(candidates) == [2, 3, 4, 5]
+        assert page_queries() == 3
+
+
+def test_iter_candidates_sees_changes_between_pages(repository):
+    candidates = repository.iter_candidates(page_size=2)
+    assert ids([next(candidates), next(candidates)]) == [1, 2]
+
+    repository.delete(1)
+    repository.delete(5)
+    new_id = repository.insert_or_update(make_candidate("Новый"))
+    with pytest.raises(RuntimeError):
+        with repository.transaction():
+            repository.delete(6)
+            raise RuntimeError("откат")
+
+    assert ids(candidates) == [4, 6, 7, new_id]
@@ -0,0 +1,74 @@
+import pytest
+
+from hrm.core.model import Candidate, CandidateStatus
+
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(params=["sqlite", "sqlite-no-fts", "json"])
+def backend(request):
+    return request.param
+
+
+def register(repository, first_name, last_name, comments=None) -> int:
+    return repository.insert_or_update(Candidate(
+        first_name=first_name,
+        last_name=last_name,
+        comments=comments,
+        status=CandidateStatus.REGISTERED,
+    ))
+
+
+def found_ids(hits):
+    return [hit.candidate.id for hit in hits]
+
+
+def test_search_folds_cyrillic_case_and_matches_prefixes(repository):
+    developer_id = register(repository, "Иван", "Петров", "Опытный РАЗРАБОТЧИК Python")
+    register(repository, "Анна", "Сидорова", "Аналитик")
+
+    hits = repository.search("опытный разраб")
+
+    assert found_ids(hits) == [developer_id]
+    assert hits[0].snippet == "<mark>Опытный</mark> <mark>РАЗРАБОТЧИК</mark> Python"
+
+
+def test_search_ranks_name_matches_above_comments(repository):
+    in_comments_id = register(repository, "Олег", "Смирнов", "Рекомендация от Кузнецова")
+    in_name_id = register(repository, "Мария", "Кузнецова")
+
+    assert found_ids(repository.search("кузнецова")) == [in_name_id, in_comments_id]
+
+
+def test_search_follows_updates_and_deletes(repository):
+    candidate_id = register(repository, "Пётр", "Орлов", "Java")
+    candidate = repository.get_by_id(candidate_id)
+    repository.insert_or_update(candidate.model_copy(update={"comments": "Kotlin"}))
+
+    assert repository.search("java") == []
+    assert found_ids(repository.search("kotlin")) == [candidate_id]
+
+    repository.delete(candidate_id)
+    assert repository.search("kotlin") == []
+
+
+def test_search_ignores_query_syntax(repository):
+    candidate_id = register(repository, "Ольга", "Белова", "C++ и SQL")
+
+    assert found_ids(repository.search('"sql* (')) == [candidate_id]
+    assert repository.search("  ,;  ") == []
+
+
+def test_search_matches_word_prefixes_only(repository):
+    register(repository, "Иван", "Петров")
+
+    assert repository.search("тров") == []
+    assert found_ids(repository.search("ИВАН")) == [1]
+
+
+def test_search_ranks_before_limit(repository):
+    register(repository, "Олег", "Смирнов", "Знает Python")
+    register(repository, "Анна", "Python")
+
+    assert found_ids(repository.search("python", limit=1)) == [2]
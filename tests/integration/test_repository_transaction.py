@@ -0,0 +1,80 @@
+import pytest
+
+from hrm.core.application import UseCases
+from hrm.core.model import CandidateStatus
+from hrm.core.persistence import JsonCandidateRepository
+from tests.integration.conftest import make_candidate, open_repository
+
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(params=["sqlite", "json", "json-journal"])
+def backend(request):
+    return request.param
+
+
+def last_names(repo):
+    return [candidate.last_name for candidate in repo.get_all()]
+
+
+def test_transaction_commits_all_changes(backend, tmp_path):
+    with open_repository(backend, tmp_path) as repo:
+        existing_id = repo.insert_or_update(make_candidate("Иванов"))
+        use_cases = UseCases(repo)
+        with use_cases.transaction():
+            new_id = use_cases.register_candidate(make_candidate("Петров"))
+            use_cases.accept_candidate(new_id)
+            use_cases.delete_candidate(existing_id)
+
+    with open_repository(backend, tmp_path) as repo:
+        assert last_names(repo) == ["Петров"]
+        assert repo.get_by_id(new_id).status == CandidateStatus.APPROVED
+
+
+def test_transaction_rolls_back_on_exception(backend, tmp_path):
+    with open_repository(backend, tmp_path) as repo:
+        existing_id = repo.insert_or_update(make_candidate("Иванов"))
+        use_cases = UseCases(repo)
+        with pytest.raises(ValueError):
+            with use_cases.transaction():
+                use_cases.register_candidate(make_candidate("Петров"))
+                use_cases.reject_candidate(existing_id)
+                use_cases.clear_all_candidates()
+                use_cases.delete_candidate(100)
+
+        assert last_names(repo) == ["Иванов"]
+        assert repo.get_by_id(existing_id).status == CandidateStatus.REGISTERED
+        assert repo.find(status=CandidateStatus.REJECTED) == []
+        assert repo.insert_or_update(make_candidate("Сидоров")) == existing_id + 1
+
+    with open_repository(backend, tmp_path) as repo:
+        assert last_names(repo) == ["Иванов", "Сидоров"]
+
+
+def test_nested_transaction_rolls_back_only_inner_block(backend, tmp_path):
+    with open_repository(backend, tmp_path) as repo:
+        with repo.transaction():
+            repo.insert_or_update(make_candidate("Иванов"))
+            with pytest.raises(RuntimeError):
+                with repo.transaction():
+                    repo.insert_or_update(make_candidate("Петров"))
+                    raise RuntimeError()
+            with repo.transaction():
+                repo.insert_or_update(make_candidate("Сидоров"))
+
+    with open_repository(backend, tmp_path) as repo:
+        assert last_names(repo) == ["Иванов", "Сидоров"]
+
+
+def test_json_transaction_writes_file_once(tmp_path, monkeypatch):
+    repo = JsonCandidateRepository(tmp_path / "candidates.json")
+    writes = []
+    monkeypatch.setattr(repo, "_save_data", lambda: writes.append(len(repo.get_all())))
+
+    with repo.transaction():
+        for last_name in ("Иванов", "Петров", "Сидоров"):
+            repo.insert_or_update(make_candidate(last_name))
+        repo.set_status([1, 2], CandidateStatus.APPROVED)
+
+    assert writes == [3]
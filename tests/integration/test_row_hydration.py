@@ -0,0 +1,58 @@
+import datetime
+import sqlite3
+
+import pytest
+from pydantic import ValidationError
+
+from hrm.core.model import Candidate, CandidateSex, CandidateStatus
+from hrm.core.persistence import SqliteCandidateRepository
+from tests.integration.conftest import make_candidate, open_repository
+
+
+pytestmark = pytest.mark.integration
+
+
+def make_full_candidate(last_name: str) -> Candidate:
+    return make_candidate(
+        last_name,
+        first_name="Иван",
+        phone="+79001234567",
+        birth_date=datetime.datetime(1990, 5, 17),
+        sex=CandidateSex.MALE,
+        comments="Python",
+    )
+
+
+def test_trusted_and_strict_reads_return_equal_candidates(tmp_path, backend):
+    def open_with(strict):
+        return open_repository(backend, tmp_path, strict_reads=strict)
+
+    with open_with(False) as repository:
+        repository.insert_many([make_full_candidate("Петров"), make_full_candidate("Сидоров")])
+
+    with open_with(False) as trusted, open_with(True) as strict:
+        trusted_candidates = trusted.get_all()
+        assert trusted_candidates == strict.get_all()
+
+    candidate = trusted_candidates[0]
+    assert (candidate.sex, candidate.status, candidate.version) == (CandidateSex.MALE, CandidateStatus.REGISTERED, 1)
+    assert candidate.model_copy(update={"phone": "123"}).phone == "123"
+    assert Candidate.model_validate(candidate.model_dump()) == candidate
+
+
+def test_strict_reads_detect_invalid_stored_data(tmp_path, monkeypatch):
+    db_file = tmp_path / "candidates.db"
+    with SqliteCandidateRepository(db_file) as repository:
+        repository.insert_or_update(make_full_candidate("Петров"))
+    with sqlite3.connect(db_file) as conn:
+        # Запись в обход приложения нарушает ограничение длины фамилии
+        conn.execute("UPDATE candidates SET last_name = ?", ("Ы" * 150,))
+
+    with SqliteCandidateRepository(db_file) as trusted:
+        assert len(trusted.get_all()[0].last_name) == 150
+
+    monkeypatch.setenv("HRM_STRICT_READS", "1")
+    with SqliteCandidateRepository(db_file) as strict:
+        with pytest.raises(ValidationError):
+            strict.get_all()
+
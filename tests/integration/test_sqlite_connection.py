@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+from hrm.core.persistence import SqliteCandidateRepository
+from tests.integration.conftest import make_candidate
+
+
+pytestmark = pytest.mark.integration
+
+
+def test_sqlite_connection_is_opened_once_with_pragmas(tmp_path, monkeypatch):
+    connections = []
+    connect = sqlite3.connect
+
+    def counting_connect(*args, **kwargs):
+        connections.append(args[0])
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, "connect", counting_connect)
+    with SqliteCandidateRepository(tmp_path / "candidates.db", pragmas={"mmap_size": None}) as repository:
+        conn = repository._conn
+        repository.insert_or_update(make_candidate("Иванов"))
+        repository.get_all()
+        repository.count()
+
+        assert repository._conn is conn
+        assert len(connections) == 1
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64000
+        # None отключает PRAGMA: остается значение SQLite по умолчанию
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 0
+
+    assert repository._conn is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        repository.count()
@@ -0,0 +1,97 @@
+import datetime
+import random
+
+import pytest
+
+from hrm.core.application import UseCases
+from hrm.core.model import Candidate, CandidateSex, CandidateStatus
+from tests.integration import conftest
+from tests.integration.conftest import open_repository
+
+
+pytestmark = pytest.mark.integration
+
+AS_OF = datetime.date(2026, 10, 14)
+
+
+def make_candidate(
+    status: CandidateStatus,
+    updated_at: datetime.datetime,
+    birth_date: datetime.datetime = None,
+    sex: CandidateSex = None,
+) -> Candidate:
+    return conftest.make_candidate(status=status, updated_at=updated_at, birth_date=birth_date, sex=sex)
+
+
+def test_funnel_aggregates(repository):
+    monday = datetime.datetime(2026, 10, 5, 9, 0)
+    repository.insert_many([
+        # Ровно 20 лет на дату расчета и на день меньше
+        make_candidate(CandidateStatus.APPROVED, monday, datetime.datetime(2006, 10, 14), CandidateSex.MALE),
+        make_candidate(CandidateStatus.APPROVED, monday + datetime.timedelta(days=6), datetime.datetime(2006, 10, 15), CandidateSex.FEMALE),
+        make_candidate(CandidateStatus.REJECTED, monday + datetime.timedelta(days=7), datetime.datetime(1960, 1, 1), CandidateSex.MALE),
+        make_candidate(CandidateStatus.REGISTERED, monday),
+    ])
+
+    statistics = repository.statistics(as_of=AS_OF)
+
+    assert statistics.total == 4
+    assert statistics.by_status == {"REGISTERED": 1, "PROPOSED": 0, "APPROVED": 2, "REJECTED": 1}
+    assert statistics.by_sex == {"MALE": 2, "FEMALE": 1, "UNKNOWN": 1}
+    assert statistics.by_age == {
+        "<20": 1, "20-29": 1, "30-39": 0, "40-49": 0, "50-59": 0, "60+": 1, "UNKNOWN": 1,
+    }
+    assert [(week.week, week.approved, week.rejected) for week in statistics.decisions_by_week] == [
+        (datetime.date(2026, 10, 5), 2, 0),
+        (datetime.date(2026, 10, 12), 0, 1),
+    ]
+
+
+def test_window_filters_by_updated_at(repository):
+    repository.insert_many([
+        make_candidate(CandidateStatus.APPROVED, datetime.datetime(2026, 1, day)) for day in range(1, 11)
+    ])
+
+    statistics = repository.statistics(
+        since=datetime.datetime(2026, 1, 3),
+        until=datetime.datetime(2026, 1, 8),
+        as_of=AS_OF,
+    )
+
+    assert statistics.total == 5
+    assert sum(week.approved for week in statistics.decisions_by_week) == 5
+
+
+def test_sqlite_and_json_agree(tmp_path):
+    rng = random.Random(7)
+    candidates = [
+        make_candidate(
+            rng.choice(list(CandidateStatus)),
+            datetime.datetime(2026, 1, 1) + datetime.timedelta(hours=rng.randrange(24 * 300)),
+            rng.choice([None, datetime.datetime(1950, 1, 1) + datetime.timedelta(days=rng.randrange(25000))]),
+            rng.choice([None, *CandidateSex]),
+        )
+        for _ in range(500)
+    ]
+    with open_repository("sqlite", tmp_path) as sqlite_repository:
+        sqlite_repository.insert_many(candidates)
+        expected = sqlite_repository.statistics(as_of=AS_OF)
+    with open_repository("json", tmp_path) as json_repository:
+        json_repository.insert_many(candidates)
+
+        assert json_repository.statistics(as_of=AS_OF) == expected
+
+
+def test_window_accepts_timezone_aware_moments(repository):
+    repository.insert_many([
+        make_candidate(CandidateStatus.APPROVED, datetime.datetime(2026, 1, day)) for day in range(1, 11)
+    ])
+    # Те же моменты, записанные в другом часовом поясе
+    moscow = datetime.timezone(datetime.timedelta(hours=3))
+
+    statistics = UseCases(repository).get_statistics(
+        since=datetime.datetime(2026, 1, 3).astimezone(moscow),
+        until=datetime.datetime(2026, 1, 8),
+    )
+
+    assert statistics.total == 5